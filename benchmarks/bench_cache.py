@@ -0,0 +1,43 @@
+"""SaveFileのParquetキャッシュのベンチマーク
+
+全ノードの温度・熱入力（T+Q）の読み込み時間を、キャッシュ無し（cold）とキャッシュ有り（warm）で比較する。
+
+使い方:
+    python benchmarks/bench_cache.py ./sample/td_model/<run_dir>/<sav_name>.sav
+"""
+
+import sys
+import time
+
+import pyopentd as pt
+
+
+def load_all(sav_path):
+    savefile = pt.SaveFile(sav_path, cache=True)
+    df_temp = savefile.get_all_temperature()
+    df_heat = savefile.get_all_heatrate()
+    return savefile, df_temp.shape[1] + df_heat.shape[1] - 2
+
+
+def main(sav_path, repeat=3):
+    savefile, _ = load_all(sav_path)
+    savefile.cache.clear()
+
+    start = time.perf_counter()
+    _, n_columns = load_all(sav_path)
+    cold = time.perf_counter() - start
+
+    warm = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load_all(sav_path)
+        warm = min(warm, time.perf_counter() - start)
+
+    print(f"columns: {n_columns}")
+    print(f"cold: {cold:.3f} s")
+    print(f"warm: {warm:.3f} s (best of {repeat})")
+    print(f"speedup: {cold / warm:.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
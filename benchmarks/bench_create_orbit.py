@@ -0,0 +1,108 @@
+"""create_orbitの軌道データの変換（.NETへの受け渡し）のベンチマーク
+
+従来の iterrows() による1行ずつの変換と、create_orbitで使っている列ごとの変換（NumPy + AddRange）を比較する。
+OpenTDの代替（fake_opentd）を使うので、Windows・Thermal Desktopは不要（Python側の変換処理の時間を測る）。
+
+使い方:
+    python benchmarks/bench_create_orbit.py [行数]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import fake_opentd
+
+fake_opentd.install()
+
+import pyopentd as pt
+from pyopentd.main import (
+    List,
+    otd,
+    System,
+    _to_vector3d_array,
+    _ORBIT_VECTOR_SCALE,
+)
+
+
+def make_orbit(n_rows, period=5400.0):
+    times = np.linspace(0, period, n_rows)
+    theta = 2 * np.pi * times / period
+    return pd.DataFrame(
+        {
+            "Times": times,
+            "sun_x": np.zeros(n_rows),
+            "sun_y": np.zeros(n_rows),
+            "sun_z": np.ones(n_rows),
+            "planet_x": np.zeros(n_rows),
+            "planet_y": np.sin(theta),
+            "planet_z": -np.cos(theta),
+            "radius": np.full(n_rows, 1.078),
+        }
+    )
+
+
+def marshal_rows(df_orbit):
+    """従来のcreate_orbitの変換処理"""
+    solar_vector_list = List[otd.Vector3d]()
+    planet_vector_list = List[otd.Vector3d]()
+    radius_list = List[float]()
+    for index, row in df_orbit.iterrows():
+        solar_vector_list.Add(
+            otd.Vector3d(
+                row["sun_x"] / 1000, row["sun_y"] / 1000, row["sun_z"] / 1000
+            )
+        )
+        planet_vector_list.Add(
+            otd.Vector3d(
+                row["planet_x"] / 1000,
+                row["planet_y"] / 1000,
+                row["planet_z"] / 1000,
+            )
+        )
+        radius_list.Add(row["radius"])
+    return solar_vector_list, planet_vector_list, radius_list
+
+
+def marshal_columns(df_orbit, chunksize=None):
+    """現在のcreate_orbitの変換処理"""
+    values = df_orbit[pt.ORBIT_COLUMNS].to_numpy(dtype=np.float64)
+    solar_vector_list = List[otd.Vector3d]()
+    planet_vector_list = List[otd.Vector3d]()
+    radius_list = List[float]()
+    times = List[float]()
+    chunksize = chunksize or max(len(values), 1)
+    for start in range(0, len(values), chunksize):
+        chunk = values[start : start + chunksize]
+        solar_vector_list.AddRange(
+            _to_vector3d_array(chunk[:, 1:4] / _ORBIT_VECTOR_SCALE)
+        )
+        planet_vector_list.AddRange(
+            _to_vector3d_array(chunk[:, 4:7] / _ORBIT_VECTOR_SCALE)
+        )
+        radius_list.AddRange(System.Array[float](chunk[:, 7].tolist()))
+        times.AddRange(System.Array[float](chunk[:, 0].tolist()))
+    return solar_vector_list, planet_vector_list, radius_list, times
+
+
+def timeit(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main(n_rows=100000):
+    df_orbit = make_orbit(n_rows)
+    t_rows = timeit(marshal_rows, df_orbit)
+    t_columns = timeit(marshal_columns, df_orbit)
+    t_chunked = timeit(marshal_columns, df_orbit, 10000)
+    print(f"rows: {n_rows}")
+    print(f"iterrows        : {t_rows:.3f} s")
+    print(f"columns         : {t_columns:.3f} s ({t_rows / t_columns:.1f}x)")
+    print(f"columns (10000) : {t_chunked:.3f} s ({t_rows / t_chunked:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
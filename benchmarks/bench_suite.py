@@ -0,0 +1,284 @@
+"""pyopentdの主な処理のベンチマーク（OpenTDの代替を使うので、Windows・Thermal Desktopは不要）
+
+fake_opentd でモデルと.savファイルを合成し、get_data、get_all_temperature、query（区間ごとの集計）、get_node、create_heater、
+create_orbit、update_symbols、一覧のDataFrame作成（get_nodes、get_heaters、get_geometries）の処理時間と処理量を測る。
+import pyopentdの時間は、新しいPythonプロセスでのimportにかかる時間（プロセスの起動を含む）を、全サブモジュールをimportする場合と比べる。
+--outputで結果をJSONに保存し、--baselineで以前の結果と比較できる（CIでの性能劣化の検出用）。
+
+使い方:
+    python benchmarks/bench_suite.py [--scale small|medium|large] [--repeat 5] [--output result.json]
+    python benchmarks/bench_suite.py --baseline result.json --threshold 1.5
+"""
+
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+import fake_opentd
+
+fake_opentd.install()
+
+import pyopentd as pt
+
+
+SCALES = {
+    "small": dict(n_submodels=5, nodes_per_submodel=100, n_times=200),
+    "medium": dict(n_submodels=10, nodes_per_submodel=500, n_times=1000),
+    "large": dict(n_submodels=20, nodes_per_submodel=2500, n_times=2000),
+}
+
+
+def make_orbit(n_rows, period=5400.0):
+    times = np.linspace(0, period, n_rows)
+    theta = 2 * np.pi * times / period
+    return pd.DataFrame(
+        {
+            "Times": times,
+            "sun_x": np.zeros(n_rows),
+            "sun_y": np.zeros(n_rows),
+            "sun_z": np.ones(n_rows),
+            "planet_x": np.zeros(n_rows),
+            "planet_y": np.sin(theta),
+            "planet_z": -np.cos(theta),
+            "radius": np.full(n_rows, 1.078),
+        }
+    )
+
+
+def bench_get_data(td, savefile):
+    node_list = savefile.get_node_names(option="T")[:1000]
+    return len(node_list) * len(savefile.times), lambda: savefile.get_data(
+        node_list
+    )
+
+
+def bench_get_data_legacy(td, savefile):
+    node_list = savefile.get_node_names(option="T")[:1000]
+    return len(node_list) * len(savefile.times), lambda: savefile.get_data(
+        node_list, bulk=False
+    )
+
+
+def bench_get_all_temperature(td, savefile):
+    n = len(savefile.get_node_names(option="T")) * len(savefile.times)
+    return n, savefile.get_all_temperature
+
+
+def bench_query_window(td, savefile):
+    node_list = savefile.get_node_names(option="T")
+    period = (savefile.times[-1] - savefile.times[0]) / 10
+    return len(node_list) * len(savefile.times), lambda: savefile.query(
+        node_list, window=period, agg=["min", "max", "mean"]
+    )
+
+
+def bench_get_node(td, savefile):
+    keys = [(node.Submodel.Name, node.Id) for node in td.GetNodes()][::7]
+
+    def run():
+        for submodel, id in keys:
+            td.get_node(submodel, id)
+
+    return len(keys), run
+
+
+def bench_create_heater(td, savefile):
+    nodes = td.GetNodes()[:200]
+
+    def run():
+        for node in nodes:
+            td.create_heater(
+                node.Submodel.Name, node.Id, node.Submodel.Name, node.Id, 1, 0, 5
+            )
+
+    return len(nodes), run
+
+
+def bench_create_heaters(td, savefile):
+    nodes = td.GetNodes()[:200]
+    df = pd.DataFrame(
+        {
+            "apply_node_sub": [node.Submodel.Name for node in nodes],
+            "apply_node_id": [node.Id for node in nodes],
+            "sensor_node_sub": [node.Submodel.Name for node in nodes],
+            "sensor_node_id": [node.Id for node in nodes],
+            "value": 1.0,
+            "on_temp": 0.0,
+            "off_temp": 5.0,
+        }
+    )
+    return len(df), lambda: td.create_heaters(df)
+
+
+def bench_create_orbit(td, savefile):
+    df_orbit = make_orbit(10000)
+    return len(df_orbit), lambda: td.create_orbit(df_orbit, "bench_orbit")
+
+
+def bench_get_orbit(td, savefile):
+    n = len(td.GetOrbit("orbit").HrTimeArray)
+    return n, lambda: td.get_orbit("orbit", use_cache=False)
+
+
+def bench_update_symbols(td, savefile):
+    case = td.create_caseset("bench", "bench", 1, 0, force_reset=True)
+    df_symbol = pd.DataFrame(
+        {
+            "name": [f"BENCH_{i}" for i in range(1000)],
+            "value": np.arange(1000),
+        }
+    )
+    return len(df_symbol), lambda: case.update_symbols(td, df_symbol)
+
+
+def bench_get_nodes(td, savefile):
+    def run():
+        td.get_nodes(refresh=True)
+
+    return len(td.GetNodes()), run
+
+
+def bench_get_heaters(td, savefile):
+    def run():
+        td.get_heaters(refresh=True)
+
+    return len(td.GetHeaters()), run
+
+
+def bench_get_geometries(td, savefile):
+    def run():
+        td.get_geometries(refresh=True)
+
+    return sum(len(td.snapshot[m]) for m, _ in pt.GEOMETRY_TYPES.values()), run
+
+
+def bench_get_geometries_handles(td, savefile):
+    def run():
+        td.get_geometries(fields=["handle"], refresh=True)
+
+    return sum(len(td.snapshot[m]) for m, _ in pt.GEOMETRY_TYPES.values()), run
+
+
+def _run_python(statement):
+    code = (
+        f"import sys; sys.path[:0] = {sys.path!r}; "
+        f"import fake_opentd; fake_opentd.install(); {statement}"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def bench_import(td, savefile):
+    return 1, lambda: _run_python("import pyopentd")
+
+
+def bench_import_savefile(td, savefile):
+    return 1, lambda: _run_python("import pyopentd; pyopentd.SaveFile")
+
+
+def bench_import_all(td, savefile):
+    return 1, lambda: _run_python("from pyopentd import *")
+
+
+BENCHMARKS = {
+    "get_data": bench_get_data,
+    "get_data (bulk=False)": bench_get_data_legacy,
+    "get_all_temperature": bench_get_all_temperature,
+    "query (window)": bench_query_window,
+    "get_node": bench_get_node,
+    "create_heater": bench_create_heater,
+    "create_heaters": bench_create_heaters,
+    "create_orbit": bench_create_orbit,
+    "get_orbit": bench_get_orbit,
+    "update_symbols": bench_update_symbols,
+    "get_nodes": bench_get_nodes,
+    "get_heaters": bench_get_heaters,
+    "get_geometries": bench_get_geometries,
+    "get_geometries (handle)": bench_get_geometries_handles,
+    "import pyopentd": bench_import,
+    "import pyopentd (SaveFile)": bench_import_savefile,
+    "import pyopentd (all modules)": bench_import_all,
+}
+
+
+def run_benchmarks(scale="small", repeat=5, names=None, latency=0.0):
+    """ベンチマークの実行
+
+    Args:
+        scale (str): SCALESのキー
+        repeat (int): 各ベンチマークの繰り返し回数（最小値を採用）
+        names (list): 実行するベンチマーク。Noneの場合は全て。
+        latency (float): OpenTDの呼び出し1回ごとの待ち時間[s]（fake_opentd.FakeModel）
+    Returns:
+        pandas.core.frame.DataFrame: カラムは['name', 'items', 'best', 'mean', 'items_per_s']
+    """
+    fake_opentd.set_model(fake_opentd.FakeModel(latency=latency, **SCALES[scale]))
+    td = pt.ThermalDesktop("bench.dwg", visible=False)
+    savefile = pt.SaveFile("bench.sav")
+    rows = []
+    for name, bench in BENCHMARKS.items():
+        if names is not None and name not in names:
+            continue
+        n_items, func = bench(td, savefile)
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        best = min(times)
+        rows.append(
+            {
+                "name": name,
+                "items": n_items,
+                "best": best,
+                "mean": sum(times) / len(times),
+                "items_per_s": n_items / best if best > 0 else float("inf"),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def compare(df, baseline_path, threshold):
+    """以前の結果との比較。bestがthreshold倍より遅くなったベンチマークの名前のリストを返す。"""
+    with open(baseline_path) as f:
+        baseline = pd.DataFrame(json.load(f)["results"])
+    df = df.merge(baseline[["name", "best"]], on="name", suffixes=("", "_base"))
+    df["ratio"] = df["best"] / df["best_base"]
+    print(df[["name", "best", "best_base", "ratio"]].to_string(index=False))
+    return df.loc[df["ratio"] > threshold, "name"].tolist()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", default="small", choices=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--only", nargs="*", default=None)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--threshold", type=float, default=1.5)
+    args = parser.parse_args(argv)
+
+    df = run_benchmarks(args.scale, args.repeat, args.only, args.latency)
+    print(df.to_string(index=False))
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"scale": args.scale, "results": df.to_dict(orient="records")},
+                f,
+                indent=1,
+            )
+    if args.baseline is not None:
+        slower = compare(df, args.baseline, args.threshold)
+        if slower != []:
+            print(f"slower than baseline: {slower}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,569 @@
+"""ベンチマーク用のOpenTDの代替（プロセス内で動く模擬バックエンド）
+
+install()で clr、System、OpenTDv62 などの代替モジュールを sys.modules に登録する。pyopentdをimportする前に呼ぶ。
+モデル（ノード・ヒーター・ヒートロード・形状・軌道・ケースセット）と.savファイルの中身は、FakeModelで指定した規模で合成する。
+Windows・Thermal Desktop・pythonnetの無い環境（LinuxのCIなど）でpyopentd側の処理時間を測るためのもので、
+OpenTDの挙動を再現するものではない。latencyを指定すると、OpenTDの呼び出し1回ごとにその時間だけ待つ（COMの往復の模擬）。
+
+使い方:
+    import fake_opentd
+    fake_opentd.install(fake_opentd.FakeModel(n_submodels=10, nodes_per_submodel=1000))
+    import pyopentd as pt
+"""
+
+import sys
+import time
+import types
+import ctypes
+
+import numpy as np
+
+
+class FakeModel:
+    """FakeModel Class
+
+    合成するモデルと.savファイルの規模。
+
+    Args:
+        n_submodels (int): サブモデル数
+        nodes_per_submodel (int): サブモデルあたりのノード数
+        n_times (int): .savファイルの時刻数
+        n_heaters (int): ヒーター数
+        n_heatloads (int): ヒートロード数
+        n_geometries (int): 形状の種類ごとの数
+        n_orbit_points (int): 既存の軌道の点数
+        n_symbols (int): ケースセットのシンボル数
+        latency (float): OpenTDの呼び出し1回ごとの待ち時間[s]
+
+    """
+
+    def __init__(
+        self,
+        n_submodels=10,
+        nodes_per_submodel=100,
+        n_times=1000,
+        n_heaters=100,
+        n_heatloads=100,
+        n_geometries=100,
+        n_orbit_points=500,
+        n_symbols=100,
+        latency=0.0,
+    ):
+        self.n_submodels = n_submodels
+        self.nodes_per_submodel = nodes_per_submodel
+        self.n_times = n_times
+        self.n_heaters = n_heaters
+        self.n_heatloads = n_heatloads
+        self.n_geometries = n_geometries
+        self.n_orbit_points = n_orbit_points
+        self.n_symbols = n_symbols
+        self.latency = latency
+
+    @property
+    def submodels(self):
+        return [f"SUB{i:03d}" for i in range(self.n_submodels)]
+
+    @property
+    def n_nodes(self):
+        return self.n_submodels * self.nodes_per_submodel
+
+
+_model = FakeModel()
+
+
+def _roundtrip():
+    if _model.latency > 0:
+        time.sleep(_model.latency)
+
+
+# ---------------------------------------------------------------- System
+
+
+class NetList(list):
+    """System.Collections.Generic.List[T]"""
+
+    def Add(self, item):
+        self.append(item)
+
+    def AddRange(self, items):
+        self.extend(items)
+
+    @property
+    def Count(self):
+        return len(self)
+
+
+class _Generic:
+    def __init__(self, factory):
+        self.factory = factory
+
+    def __getitem__(self, item_type):
+        return self.factory
+
+
+class Array:
+    """System.Array（doubleの配列はNumPy配列で持つ）"""
+
+    def __init__(self, values, item_type=None):
+        if item_type is float:
+            self.values = np.ascontiguousarray(values, dtype=np.float64)
+        else:
+            self.values = list(values)
+
+    def __class_getitem__(cls, item_type):
+        return lambda values: cls(values, item_type)
+
+    @property
+    def Length(self):
+        return len(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+
+class Marshal:
+    """System.Runtime.InteropServices.Marshal"""
+
+    @staticmethod
+    def Copy(source, start, destination, length):
+        values = source.values
+        ctypes.memmove(
+            destination,
+            values.ctypes.data + start * values.itemsize,
+            length * values.itemsize,
+        )
+
+
+class String:
+    pass
+
+
+def IntPtr(address):
+    return address
+
+
+# ---------------------------------------------------------------- OpenTDv62
+
+
+class _Dimensional(float):
+    def GetValueSI(self):
+        return float(self)
+
+
+class _Expression:
+    def __init__(self, value=""):
+        self.Value = value
+        self.expression = None
+
+    def ToString(self):
+        return str(self.Value)
+
+    def __str__(self):
+        return str(self.Value)
+
+
+class _Submodel:
+    def __init__(self, name):
+        self.Name = name
+
+    def ToString(self):
+        return self.Name
+
+    def __str__(self):
+        return self.Name
+
+
+class _Updatable:
+    def Update(self):
+        _roundtrip()
+
+
+class Vector3d:
+    def __init__(self, x, y, z):
+        self.X = _Dimensional(x)
+        self.Y = _Dimensional(y)
+        self.Z = _Dimensional(z)
+
+
+class Connection:
+    def __init__(self, item):
+        self.Handle = item.Handle
+
+
+class RadiationTaskData:
+    def __init__(self, orbit_name=""):
+        self.OrbitName = orbit_name
+
+
+class _Node:
+    def __init__(self, submodel, id, handle):
+        self.Submodel = _Submodel(submodel)
+        self.Id = id
+        self.Handle = handle
+
+
+class _Heater(_Updatable):
+    def __init__(self, handle, apply, sensor):
+        self.Handle = handle
+        self.Name = handle
+        self.Submodel = _Submodel("MAIN")
+        self.ApplyConnections = NetList(apply)
+        self.SensorConnections = NetList(sensor)
+        self.Value = 1.0
+        self.ValueExp = _Expression("1.0")
+        self.OnTemp = 0.0
+        self.OnTempExp = _Expression("0.0")
+        self.OffTemp = 5.0
+        self.OffTempExp = _Expression("5.0")
+        self.EnabledExp = _Expression("1")
+
+
+class _HeatLoad(_Updatable):
+    def __init__(self, handle, apply):
+        self.Handle = handle
+        self.Name = handle
+        self.Submodel = _Submodel("MAIN")
+        self.ApplyConnections = NetList(apply)
+        self.Value = 1.0
+        self.ValueExp = _Expression("1.0")
+        self.HeatLoadTransientType = 0
+        self.TimeArrayExp = _Expression()
+        self.ValueArrayExp = _Expression()
+        self.EnabledExp = _Expression("1")
+
+
+class _Geometry:
+    """形状（プロパティは全種類分を持つ）"""
+
+    def __init__(self, handle, submodel):
+        self.Handle = handle
+        self.Comment = ""
+        for name in ["StartSubmodel", "TopStartSubmodel", "BotStartSubmodel"]:
+            setattr(self, name, _Submodel(submodel))
+        self.CondSubmodel = _Submodel(submodel)
+        for name in ["NodeNames", "TopNodeNames", "BotNodeNames"]:
+            setattr(self, name, NetList())
+        self.AttachedNodeHandles = NetList()
+        self._AttachedNodeHandles = NetList()
+        self.OutsideOpticalProperties = "DEFAULT"
+        self.TopOpticalProp = "DEFAULT"
+        self.BotOpticalProp = "DEFAULT"
+        for name in [
+            "XMax",
+            "YMax",
+            "ZMax",
+            "Height",
+            "Rmin",
+            "Rmax",
+            "Radius",
+            "StartAngle",
+            "EndAngle",
+            "TopThickness",
+            "BotThickness",
+        ]:
+            setattr(self, name, 1.0)
+
+
+class _Symbol(_Updatable):
+    def __init__(self, name, value="0"):
+        self.Name = name
+        self.Value = value
+        self.Description = ""
+        self.Group = ""
+        self.Type = 0
+
+
+class _Orbit(_Updatable):
+    def __init__(self, name, n_points=0):
+        self.Name = name
+        self.OrbitType = 0
+        times = np.linspace(0, 5400.0, n_points)
+        theta = 2 * np.pi * times / 5400.0
+        self.HrTimeArray = NetList(_Dimensional(t) for t in times)
+        self.HrSunVecArray = NetList(
+            Vector3d(0.0, 0.0, 0.001) for _ in range(n_points)
+        )
+        self.HrPlanetVecArray = NetList(
+            Vector3d(0.0, np.sin(a) / 1000, -np.cos(a) / 1000) for a in theta
+        )
+        self.HrOrbitRadiusArray = NetList([1.078] * n_points)
+        self.SolarFluxExp = _Expression()
+        self.AlbedoExp = _Expression()
+
+
+class _CaseSet(_Updatable):
+    def __init__(self, name, group, n_symbols=0):
+        self.Name = name
+        self.GroupName = group
+        self.SymbolNames = NetList(f"SYM{i}" for i in range(n_symbols))
+        self.SymbolValues = NetList("0" for _ in range(n_symbols))
+        self.SymbolComments = NetList("" for _ in range(n_symbols))
+        self.RadiationTasks = NetList([RadiationTaskData("orbit")])
+        self.SindaOptions = types.SimpleNamespace(SaveFilename=f"{name}.sav")
+        self.SindaControl = types.SimpleNamespace(timendExp=_Expression())
+        self.UseUserDirectory = 0
+        self.UserDirectory = ""
+        self.SubmodelsNotBuilt = None
+
+    def Run(self):
+        _roundtrip()
+
+
+class ThermalDesktop:
+    """OpenTDv62.ThermalDesktop"""
+
+    def __init__(self):
+        self.ConnectConfig = types.SimpleNamespace()
+        self._handle = 0
+        model = _model
+        self._nodes = [
+            _Node(submodel, i + 1, self._new_handle())
+            for submodel in model.submodels
+            for i in range(model.nodes_per_submodel)
+        ]
+        self._nodes_by_handle = {node.Handle: node for node in self._nodes}
+        n_nodes = max(len(self._nodes), 1)
+        self._heaters = [
+            _Heater(
+                self._new_handle(),
+                [Connection(self._nodes[i % n_nodes])],
+                [Connection(self._nodes[(i + 1) % n_nodes])],
+            )
+            for i in range(model.n_heaters)
+        ]
+        self._heatloads = [
+            _HeatLoad(self._new_handle(), [Connection(self._nodes[i % n_nodes])])
+            for i in range(model.n_heatloads)
+        ]
+        self._geometries = {
+            name: [
+                _Geometry(self._new_handle(), model.submodels[0])
+                for _ in range(model.n_geometries)
+            ]
+            for name in [
+                "SolidBricks",
+                "SolidCylinders",
+                "Rectangles",
+                "Polygons",
+                "Cylinders",
+            ]
+        }
+        self._orbits = {"orbit": _Orbit("orbit", model.n_orbit_points)}
+        self._casesets = {}
+        self._symbols = [_Symbol(f"SYM{i}") for i in range(model.n_symbols)]
+
+    def _new_handle(self):
+        self._handle += 1
+        return f"{self._handle:X}"
+
+    def Connect(self):
+        _roundtrip()
+
+    def GetNodes(self):
+        _roundtrip()
+        return NetList(self._nodes)
+
+    def GetNode(self, handle):
+        _roundtrip()
+        return self._nodes_by_handle[handle]
+
+    def GetHeaters(self):
+        _roundtrip()
+        return NetList(self._heaters)
+
+    def GetHeater(self, handle):
+        _roundtrip()
+        return [h for h in self._heaters if h.Handle == handle][0]
+
+    def GetHeatLoads(self):
+        _roundtrip()
+        return NetList(self._heatloads)
+
+    def CreateHeater(self, apply, sensor):
+        _roundtrip()
+        heater = _Heater(self._new_handle(), apply, sensor)
+        self._heaters.append(heater)
+        return heater
+
+    def CreateHeatLoad(self, connection):
+        _roundtrip()
+        heatload = _HeatLoad(self._new_handle(), [connection])
+        self._heatloads.append(heatload)
+        return heatload
+
+    def GetSolidBricks(self):
+        _roundtrip()
+        return NetList(self._geometries["SolidBricks"])
+
+    def GetSolidCylinders(self):
+        _roundtrip()
+        return NetList(self._geometries["SolidCylinders"])
+
+    def GetRectangles(self):
+        _roundtrip()
+        return NetList(self._geometries["Rectangles"])
+
+    def GetPolygons(self):
+        _roundtrip()
+        return NetList(self._geometries["Polygons"])
+
+    def GetCylinders(self):
+        _roundtrip()
+        return NetList(self._geometries["Cylinders"])
+
+    def GetSymbols(self):
+        _roundtrip()
+        return NetList(self._symbols)
+
+    def GetOrbits(self):
+        _roundtrip()
+        return NetList(self._orbits.values())
+
+    def GetOrbit(self, name):
+        _roundtrip()
+        return self._orbits[name]
+
+    def CreateOrbit(self, name):
+        _roundtrip()
+        orbit = _Orbit(name)
+        self._orbits[name] = orbit
+        return orbit
+
+    def DeleteOrbit(self, name):
+        _roundtrip()
+        self._orbits.pop(name, None)
+
+    def GetCaseSets(self):
+        _roundtrip()
+        return NetList(self._casesets.values())
+
+    def GetCaseSet(self, name, group):
+        _roundtrip()
+        return self._casesets.get((group, name))
+
+    def CreateCaseSet(self, name, group, filename):
+        _roundtrip()
+        case = _CaseSet(name, group, _model.n_symbols)
+        self._casesets[(group, name)] = case
+        return case
+
+    def DeleteCaseSet(self, name, group):
+        _roundtrip()
+        self._casesets.pop((group, name), None)
+
+
+# ---------------------------------------------------------------- OpenTDv62.Results
+
+
+class _DataArray:
+    def __init__(self, values):
+        self._values = values
+
+    def GetValues(self):
+        return Array(self._values, float)
+
+
+class SaveFile:
+    """OpenTDv62.Results.Dataset.SaveFile（ノードごとに正弦波の温度・熱入力を合成する）"""
+
+    def __init__(self, path):
+        _roundtrip()
+        self.path = path
+        model = _model
+        self._times = np.linspace(0, 54000.0, model.n_times)
+        self._submodels = model.submodels
+        self._node_ids = list(range(1, model.nodes_per_submodel + 1))
+        self._positions = {s: i for i, s in enumerate(self._submodels)}
+
+    def GetTimes(self):
+        _roundtrip()
+        return _DataArray(self._times)
+
+    def GetThermalSubmodels(self):
+        _roundtrip()
+        return NetList(self._submodels)
+
+    def GetNodeIds(self, submodel):
+        _roundtrip()
+        return NetList(self._node_ids)
+
+    def GetData(self, names):
+        _roundtrip()
+        out = NetList()
+        phase = 2 * np.pi * self._times / 5400.0
+        for name in names:
+            submodel, rest = str(name).split(".")
+            k = self._positions[submodel] * len(self._node_ids) + int(rest[1:])
+            if rest[0] == "T":
+                values = 293.15 + 10.0 * np.sin(phase + k)
+            else:
+                values = 5.0 + np.cos(phase + k)
+            out.Add(_DataArray(values))
+        return out
+
+
+# ---------------------------------------------------------------- install
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def set_model(model):
+    """合成するモデルの規模の変更（以降に作成するThermalDesktop・SaveFileに反映）"""
+    global _model
+    _model = model
+
+
+def install(model=None):
+    """代替モジュールをsys.modulesに登録する（pyopentdをimportする前に呼ぶ）"""
+    if model is not None:
+        set_model(model)
+    _module("clr", AddReference=lambda name: None)
+    system = _module(
+        "System",
+        Array=Array,
+        String=String,
+        Double=float,
+        IntPtr=IntPtr,
+    )
+    system.Collections = _module("System.Collections")
+    system.Collections.Generic = _module(
+        "System.Collections.Generic", List=_Generic(NetList)
+    )
+    system.Runtime = _module("System.Runtime")
+    system.Runtime.InteropServices = _module(
+        "System.Runtime.InteropServices", Marshal=Marshal
+    )
+    dimension = _module(
+        "OpenTDv62.Dimension",
+        DimensionalList=_Generic(
+            lambda values: NetList(_Dimensional(v) for v in values)
+        ),
+        Time=float,
+    )
+    dataset = _module("OpenTDv62.Results.Dataset", SaveFile=SaveFile)
+    results = _module("OpenTDv62.Results", Dataset=dataset)
+    orbit_types = types.SimpleNamespace(TRAJECTORY=1)
+    _module(
+        "OpenTDv62",
+        ThermalDesktop=ThermalDesktop,
+        Vector3d=Vector3d,
+        Connection=Connection,
+        RadiationTaskData=RadiationTaskData,
+        Utility=types.SimpleNamespace(RootedPathname=lambda path: path),
+        RadCAD=types.SimpleNamespace(
+            Orbit=types.SimpleNamespace(OrbitTypes=orbit_types)
+        ),
+        Dimension=dimension,
+        Results=results,
+    )
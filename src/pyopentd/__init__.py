@@ -1,5 +1,64 @@
-from .main import *
-from .result import *
-from .utils import *
+from .backend import configure, get_loaded_assemblies
 
 __version__ = "0.1"
+
+# サブモジュールは、名前を初めて使うときにimportする（import pyopentdではpandasもOpenTDも読み込まない）。
+# OpenTDのアセンブリが必要なモジュール（main、result、utils）も同様で、importだけならOpenTDが無くてもよい。
+# 結果の読み込み（SaveFileなど）だけであれば、OpenTDv62.Resultsのみを読み込む。
+# 各モジュールの__all__と同じ名前を並べる（tests/test_import.pyで一致を確認している）。
+_LAZY_MODULES = {
+    "result": ["SaveFile", "NodeIndex", "get_data_bulk"],
+    "main": [
+        "ThermalDesktop",
+        "Case",
+        "SymbolEditor",
+        "NodeLookup",
+        "ORBIT_COLUMNS",
+        "GEOMETRY_TYPES",
+        "GEOMETRY_FIELDS",
+    ],
+    "utils": ["get_properties", "to_net_list"],
+    "cache": ["ResultCache"],
+    "lazy": ["LazyResult"],
+    "runner": ["BatchRunner", "connect_thermal_desktop", "run_caseset"],
+    "aio": [
+        "set_max_workers",
+        "get_executor",
+        "run_blocking",
+        "run_case_async",
+        "as_completed_cases",
+        "load_savefile_async",
+        "get_data_async",
+    ],
+    "orbit": ["interpolate_orbit", "align_orbit", "align_orbits"],
+    "sweep": ["Sweep", "SweepStore", "full_factorial", "latin_hypercube"],
+    "runcache": ["RunCache"],
+    "stream": ["SaveFileReader", "StreamingRun", "tail_results"],
+    "dataset": ["SaveFileDataset"],
+    "export": ["export_savefile", "export_dataset", "get_node_metadata"],
+    "downsample": ["select_rows", "get_windows", "aggregate_windows"],
+    "snapshot": ["ModelSnapshot", "EntityTable"],
+    "instrument": ["Instrumentation"],
+    "pool": ["SessionPool", "Session"],
+    "server": ["JobServer", "JobClient"],
+}
+_LAZY_ATTRS = {
+    name: module for module, names in _LAZY_MODULES.items() for name in names
+}
+
+__all__ = ["configure", "get_loaded_assemblies"] + list(_LAZY_ATTRS)
+
+
+def __getattr__(name):
+    # 一覧にない名前は、OpenTDを読み込まずにAttributeErrorとする（hasattrなどで読み込みが起きないように）
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f".{_LAZY_ATTRS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -0,0 +1,115 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+__all__ = [
+    "set_max_workers",
+    "get_executor",
+    "run_blocking",
+    "run_case_async",
+    "as_completed_cases",
+    "load_savefile_async",
+    "get_data_async",
+]
+
+# OpenTDのブロッキングな呼び出しを実行するスレッドプール（同時実行数の上限）
+_executor = None
+_max_workers = 4
+
+
+def set_max_workers(max_workers):
+    """async APIが使うスレッドプールの同時実行数の変更
+
+    既に作成されているスレッドプールは、実行中の処理が終わり次第破棄される。
+    """
+    global _executor, _max_workers
+    _max_workers = max_workers
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=_max_workers, thread_name_prefix="pyopentd"
+        )
+    return _executor
+
+
+async def run_blocking(func, *args, timeout=None, executor=None, **kwargs):
+    """ブロッキングな関数をスレッドプールで実行し、完了を待つ
+
+    Args:
+        func (callable): 実行する関数
+        timeout (float): タイムアウト[s]。超えた場合はasyncio.TimeoutError。
+        executor (concurrent.futures.Executor): Noneの場合はpyopentdのスレッドプール。
+    Note:
+        キャンセル・タイムアウト時は待機を打ち切るだけで、実行中のOpenTDの処理（SINDA/FLUINTの実行など）自体は止まらない。
+        スレッドはその処理が終わるまで占有される。
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(
+        executor or get_executor(), functools.partial(func, *args, **kwargs)
+    )
+    return await asyncio.wait_for(future, timeout)
+
+
+async def run_case_async(case, timeout=None, executor=None):
+    """Case.run()の非同期版。完了したらcaseを返す。"""
+    await run_blocking(case.run, timeout=timeout, executor=executor)
+    return case
+
+
+async def _run_case_captured(case, timeout, executor):
+    try:
+        await run_case_async(case, timeout, executor)
+        return case, None
+    except asyncio.CancelledError:
+        raise
+    except Exception as error:
+        return case, error
+
+
+async def as_completed_cases(cases, timeout=None, executor=None):
+    """複数のケースを同時に実行し、終わった順にケースを返す非同期イテレータ
+
+    同時に実行される数はスレッドプールの同時実行数（set_max_workers）で制限される。
+
+    Args:
+        cases (list): pyopentd.Caseのリスト
+        timeout (float): 1ケースあたりのタイムアウト[s]
+    Yields:
+        tuple: (case, error)。正常終了の場合errorはNone。
+    Examples:
+        >>> async for case, error in pt.as_completed_cases(cases):
+        ...     print(case.origin.Name, error)
+    """
+    tasks = [
+        asyncio.ensure_future(_run_case_captured(case, timeout, executor))
+        for case in cases
+    ]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        # 途中でイテレーションを抜けた場合、未完了の待機はキャンセルする
+        for task in tasks:
+            task.cancel()
+
+
+async def load_savefile_async(sav_path, timeout=None, executor=None, **kwargs):
+    """SaveFile(sav_path, **kwargs)の非同期版"""
+    from .result import SaveFile
+
+    return await run_blocking(
+        SaveFile, sav_path, timeout=timeout, executor=executor, **kwargs
+    )
+
+
+async def get_data_async(savefile, node_list, timeout=None, executor=None):
+    """SaveFile.get_data(node_list)の非同期版"""
+    return await run_blocking(
+        savefile.get_data, node_list, timeout=timeout, executor=executor
+    )
@@ -0,0 +1,83 @@
+import os
+import sys
+
+__all__ = ["configure", "get_loaded_assemblies"]
+
+
+# アセンブリのあるディレクトリ（既定値）。環境変数またはconfigure()で変更できる。
+ASSEMBLY_DIRS = {
+    "OpenTDv62": "C:/Windows/Microsoft.NET/assembly/GAC_MSIL/OpenTDv62/v4.0_6.2.0.7__65e6d95ed5c2e178/",
+    "OpenTDv62.Results": "C:/Windows/Microsoft.NET/assembly/GAC_64/OpenTDv62.Results/v4.0_6.2.0.0__b62f614be6a1e14a/",
+}
+ENV_VARS = {
+    "OpenTDv62": "PYOPENTD_OPENTD_DIR",
+    "OpenTDv62.Results": "PYOPENTD_RESULTS_DIR",
+}
+
+_loaded = set()
+
+
+def configure(opentd_dir=None, results_dir=None):
+    """アセンブリのあるディレクトリの指定
+
+    環境変数（PYOPENTD_OPENTD_DIR、PYOPENTD_RESULTS_DIR）より優先する。
+    pyopentd.ThermalDesktopやpyopentd.SaveFileを最初に使う（アセンブリを読み込む）前に呼ぶ。
+
+    Args:
+        opentd_dir (str): OpenTDv62.dllのあるディレクトリ
+        results_dir (str): OpenTDv62.Results.dllのあるディレクトリ
+    Examples:
+        >>> import pyopentd as pt
+        >>> pt.configure(opentd_dir="C:/.../OpenTDv62/v4.0_6.2.0.7__65e6d95ed5c2e178/")
+    """
+    for name, path in [("OpenTDv62", opentd_dir), ("OpenTDv62.Results", results_dir)]:
+        if path is None:
+            continue
+        if name in _loaded:
+            print(f"MYWARNING (in pyopentd.backend.configure): {name}は読み込み済みのため、指定は反映されません。")
+        ASSEMBLY_DIRS[name] = path
+        os.environ[ENV_VARS[name]] = path
+
+
+def get_assembly_dir(name):
+    """アセンブリのあるディレクトリ（環境変数、無ければ既定値）"""
+    return os.environ.get(ENV_VARS[name], ASSEMBLY_DIRS[name])
+
+
+def load_assembly(name):
+    """アセンブリの読み込み（プロセスで1回だけ）"""
+    if name in _loaded:
+        return
+    try:
+        import clr
+    except ImportError as e:
+        raise ImportError(
+            "pythonnet（clr）が見つかりません。ThermalDesktop・SaveFileなどOpenTDを使う機能には、pythonnetとOpenTDが必要です。"
+        ) from e
+
+    assembly_dir = get_assembly_dir(name)
+    if assembly_dir not in sys.path:
+        sys.path.append(assembly_dir)
+    try:
+        clr.AddReference(name)
+    except Exception as e:
+        # .NETの例外（FileNotFoundExceptionなど）はImportErrorとして扱う
+        raise ImportError(
+            f"{name}を読み込めません（{assembly_dir}）。configure()または環境変数{ENV_VARS[name]}でディレクトリを指定してください。"
+        ) from e
+    _loaded.add(name)
+
+
+def load_opentd():
+    """ThermalDesktopの操作用（OpenTDv62とOpenTDv62.Results）"""
+    load_assembly("OpenTDv62")
+    load_assembly("OpenTDv62.Results")
+
+
+def load_results():
+    """結果（.savファイル）の読み込み用（OpenTDv62.Resultsのみ）"""
+    load_assembly("OpenTDv62.Results")
+
+
+def get_loaded_assemblies():
+    return sorted(_loaded)
@@ -0,0 +1,102 @@
+import os
+import glob
+import hashlib
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+__all__ = ["ResultCache"]
+
+
+class ResultCache:
+    """ResultCache Class
+
+    .savファイルの結果を列指向（Parquet）のサイドカーファイルにキャッシュするクラス。
+    キャッシュのキーは.savファイルのパス・サイズ・更新時刻で、.savファイルが更新されると古いキャッシュは使われない。
+    Parquetの読み書きにはpyarrowが必要。
+
+    """
+
+    def __init__(self, sav_path, cache_dir=None):
+        if pq is None:
+            raise ImportError(
+                "ResultCacheを使用するにはpyarrowをインストールしてください。"
+            )
+        self.sav_path = os.path.abspath(sav_path)
+        if cache_dir is None:
+            cache_dir = f"{self.sav_path}.pyopentd_cache"
+        self.cache_dir = cache_dir
+        # cache_dirを複数の.savファイルで共有しても混ざらないように、ファイル名の先頭にパスのハッシュを付ける
+        self.prefix = hashlib.sha1(self.sav_path.encode("utf-8")).hexdigest()[
+            :16
+        ]
+        self.key = self.make_key(self.sav_path)
+        self.path = os.path.join(
+            self.cache_dir, f"{self.prefix}_{self.key}.parquet"
+        )
+
+    @staticmethod
+    def make_key(sav_path):
+        stat = os.stat(sav_path)
+        text = f"{os.path.abspath(sav_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+    def get_columns(self):
+        """キャッシュ済みの列名の取得"""
+        if not os.path.exists(self.path):
+            return []
+        return pq.read_schema(self.path).names
+
+    def load(self, node_list):
+        """キャッシュからの読み込み
+
+        Args:
+            node_list (list): ノードのリスト（"AAA.T1"や"AAA.Q1"の形式）
+        Returns:
+            tuple: (キャッシュにあった列と"Times"のDataFrame（無ければNone）, キャッシュに無かったノードのリスト)
+        """
+        cached = set(self.get_columns())
+        hit = [node for node in node_list if node in cached]
+        missing = [node for node in node_list if node not in cached]
+        if not hit:
+            return None, missing
+        df = pd.read_parquet(self.path, columns=["Times"] + hit)
+        return df, missing
+
+    def store(self, df):
+        """キャッシュへの書き込み
+
+        既存のキャッシュに無い列だけを追加して書き直す。同じ.savファイルの古いキーのキャッシュは削除する。
+
+        Args:
+            df (pandas.core.frame.DataFrame): 先頭列が"Times"の時系列データ
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for old_path in self._get_paths():
+            if old_path != self.path:
+                os.remove(old_path)
+        if os.path.exists(self.path):
+            df_cached = pd.read_parquet(self.path)
+            new_columns = [c for c in df.columns if c not in df_cached.columns]
+            df = pd.concat([df_cached, df[new_columns]], axis=1)
+        tmp_path = f"{self.path}.tmp"
+        pq.write_table(
+            pa.Table.from_pandas(df, preserve_index=False), tmp_path
+        )
+        os.replace(tmp_path, self.path)
+
+    def _get_paths(self):
+        """この.savファイルのキャッシュ（古いキーのものを含む）のパス"""
+        return glob.glob(
+            os.path.join(self.cache_dir, f"{self.prefix}_*.parquet")
+        )
+
+    def clear(self):
+        """この.savファイルのキャッシュの削除"""
+        for path in self._get_paths():
+            os.remove(path)
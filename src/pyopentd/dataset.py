@@ -0,0 +1,162 @@
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+from .downsample import select_rows
+from .export import export_dataset
+
+__all__ = ["SaveFileDataset"]
+
+
+def open_savefile(path):
+    """SaveFileDatasetのデフォルトのopener"""
+    from .result import SaveFile
+
+    return SaveFile(path)
+
+
+class SaveFileDataset:
+    """SaveFileDataset Class
+
+    複数の.savファイル（スイープの各ケースなど）をまとめて扱うクラス。
+    .savファイルはスレッドプールで同時に開き、ノード名は全ファイルの和集合として扱う。
+    結果はselect()などを呼んだときに、指定したケース・ノード・時間範囲の分だけ読み込む。
+
+    Args:
+        sav_paths (dict or list): ケース名をキー、.savファイルのパスを値とする辞書。リストの場合はパスをケース名にする。
+        max_workers (int): 同時に開く・読み込むファイル数
+        opener (callable): opener(path) -> SaveFile。テスト時の差し替え用。
+
+    Examples:
+        >>> ds = pt.SaveFileDataset({"hot": "./hot.sav", "cold": "./cold.sav"})
+        >>> df = ds.select(pattern="PANEL_*.T*", time_range=(t_end - period, None))
+
+    """
+
+    def __init__(self, sav_paths, max_workers=8, opener=open_savefile):
+        if not isinstance(sav_paths, dict):
+            sav_paths = {path: path for path in sav_paths}
+        self.sav_paths = dict(sav_paths)
+        self.max_workers = max_workers
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            savefiles = list(executor.map(opener, self.sav_paths.values()))
+        self.savefiles = dict(zip(self.sav_paths.keys(), savefiles))
+
+    @property
+    def cases(self):
+        return list(self.savefiles.keys())
+
+    def get_node_names(self, option="T", pattern=None, submodels=None):
+        """全ファイルのノード名の和集合（最初に現れた順）"""
+        names = {}
+        for savefile in self.savefiles.values():
+            for name in savefile.node_index.select(
+                submodels, pattern, option=option
+            ):
+                names[name] = None
+        return list(names.keys())
+
+    def _read_case(self, case, option, pattern, submodels, nodes, time_range):
+        savefile = self.savefiles[case]
+        node_list = savefile.node_index.select(
+            submodels, pattern, option=option
+        )
+        if nodes is not None:
+            nodes = set(nodes)
+            node_list = [node for node in node_list if node in nodes]
+        if time_range is None:
+            return savefile.get_data(node_list)
+        rows = select_rows(savefile.times, time_range)
+        if getattr(savefile, "cache", None) is not None:
+            # キャッシュは全行を持っているので、読み込んでから切り出す
+            df = savefile.get_data(node_list)
+            return df.iloc[rows].reset_index(drop=True)
+        # 時間範囲外の行は.NETの配列からコピーしない
+        from .result import get_data_bulk
+
+        return get_data_bulk(savefile, node_list, rows)
+
+    def iter_cases(
+        self,
+        cases=None,
+        option="T",
+        pattern=None,
+        submodels=None,
+        nodes=None,
+        time_range=None,
+    ):
+        """ケースごとに結果を読み込んで返すジェネレータ（メモリには常に数ケース分しか持たない）
+
+        Args:
+            cases (list): 読み込むケース。Noneの場合は全ケース。
+            option (str): ノード名の接頭辞（"T"や"Q"）
+            pattern (str): ノード名のワイルドカード（例: "PANEL_*.T*"）
+            submodels (list): サブモデル名のリスト（ワイルドカード可）
+            nodes (list): ノード名のリスト（"AAA.T1"の形式）
+            time_range (tuple): (開始時刻, 終了時刻)。両端を含む。
+        Yields:
+            tuple: (ケース名, 先頭列が"Times"のDataFrame)
+        """
+        if cases is None:
+            cases = self.cases
+        args = (option, pattern, submodels, nodes, time_range)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # 先読みはmax_workers件まで
+            futures = []
+            for case in cases:
+                futures.append(
+                    (case, executor.submit(self._read_case, case, *args))
+                )
+                if len(futures) >= self.max_workers:
+                    case_done, future = futures.pop(0)
+                    yield case_done, future.result()
+            for case_done, future in futures:
+                yield case_done, future.result()
+
+    def select(
+        self,
+        cases=None,
+        option="T",
+        pattern=None,
+        submodels=None,
+        nodes=None,
+        time_range=None,
+        long=True,
+    ):
+        """条件に合う結果の取得
+
+        引数はiter_casesと同じ。ケース・ノード・時間範囲の条件は読み込み時に適用するので、条件外のデータはメモリに載らない。
+
+        Args:
+            long (bool): Trueの場合は縦持ち（['case', 'Times', 'node', 'value']）、Falseの場合は(case, Times)をインデックス、ノードをカラムとする横持ち。
+        Returns:
+            pandas.core.frame.DataFrame
+        """
+        frames = []
+        for case, df in self.iter_cases(
+            cases, option, pattern, submodels, nodes, time_range
+        ):
+            if long:
+                df = df.melt(id_vars="Times", var_name="node")
+            df.insert(0, "case", case)
+            frames.append(df)
+        if frames == []:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        if not long:
+            df = df.set_index(["case", "Times"])
+        return df
+
+    def to_series(self, **kwargs):
+        """(case, Times, node)のMultiIndexを持つSeriesの取得（引数はselectと同じ）"""
+        df = self.select(long=True, **kwargs)
+        return df.set_index(["case", "Times", "node"])["value"]
+
+    def export(self, path, cases=None, option="T", **kwargs):
+        """全ケースの結果の圧縮ファイル（Parquet・HDF5）への書き出し
+
+        引数はpyopentd.export_datasetと同じ。Parquetは先頭列"case"を付けた1つのファイル、HDF5はケースごとのgroupに書き出す。
+
+        Examples:
+            >>> ds.export("./sweep.h5", pattern="PANEL_*.T*", dtype="float32")
+        """
+        return export_dataset(self, path, cases=cases, option=option, **kwargs)
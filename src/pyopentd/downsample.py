@@ -0,0 +1,80 @@
+import numpy as np
+
+__all__ = ["select_rows", "get_windows", "aggregate_windows"]
+
+
+AGGREGATIONS = ["min", "max", "mean", "first", "last"]
+
+
+def select_rows(times, time=None, last=None, stride=None):
+    """時間範囲・間引きに対応する行番号の選択
+
+    Args:
+        times (numpy.ndarray): 時刻の配列（昇順）
+        time (tuple): (開始時刻, 終了時刻)。どちらもNoneで端を表す。両端を含む。
+        last (float): 最後のlast秒間（例えば最後の1周回）。timeより優先する。
+        stride (int): stride行ごとに1行を残す。Noneの場合は間引かない。
+    Returns:
+        slice: 行のスライス
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if last is not None:
+        time = (times[-1] - last, None) if len(times) > 0 else None
+    i_start, i_end = 0, len(times)
+    if time is not None:
+        start, end = time
+        if start is not None:
+            i_start = np.searchsorted(times, start, side="left")
+        if end is not None:
+            i_end = np.searchsorted(times, end, side="right")
+    if stride is not None and stride < 1:
+        raise ValueError(f"strideは1以上を指定してください: {stride}")
+    return slice(int(i_start), int(max(i_end, i_start)), stride)
+
+
+def get_windows(times, window, origin=None):
+    """時刻を幅windowの区間に分けたときの、各区間の先頭の行番号と開始時刻
+
+    Args:
+        times (numpy.ndarray): 時刻の配列（昇順）
+        window (float): 区間の幅[s]（軌道周期など）
+        origin (float): 区間の基準時刻。Noneの場合はtimesの最初の時刻。
+    Returns:
+        tuple: (区間の先頭の行番号の配列, 区間の開始時刻の配列)
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if window <= 0:
+        raise ValueError(f"windowは正の値を指定してください: {window}")
+    if len(times) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    if origin is None:
+        origin = times[0]
+    bins = np.floor((times - origin) / window).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    return starts, origin + bins[starts] * window
+
+
+def aggregate_windows(values, starts, agg="mean"):
+    """区間ごとの集計（行方向、numpyのreduceatで一括計算する）
+
+    Args:
+        values (numpy.ndarray): (時刻数, ノード数)の配列
+        starts (numpy.ndarray): 各区間の先頭の行番号（get_windows）
+        agg (str): "min"、"max"、"mean"、"first"、"last"のいずれか
+    Returns:
+        numpy.ndarray: (区間数, ノード数)の配列
+    """
+    if len(starts) == 0:
+        return np.zeros((0, values.shape[1]))
+    if agg == "min":
+        return np.minimum.reduceat(values, starts, axis=0)
+    if agg == "max":
+        return np.maximum.reduceat(values, starts, axis=0)
+    if agg == "mean":
+        counts = np.diff(np.r_[starts, len(values)])
+        return np.add.reduceat(values, starts, axis=0) / counts[:, None]
+    if agg == "first":
+        return values[starts]
+    if agg == "last":
+        return values[np.r_[starts[1:], len(values)] - 1]
+    raise ValueError(f"aggは{AGGREGATIONS}のいずれかを指定してください: {agg}")
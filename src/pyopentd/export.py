@@ -0,0 +1,391 @@
+import os
+import json
+import tempfile
+import numpy as np
+import pandas as pd
+
+from .downsample import select_rows
+from .lazy import _release
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+__all__ = ["export_savefile", "export_dataset", "get_node_metadata"]
+
+
+# ノード名の接頭辞ごとの単位（Qはモデルの単位系がSIの場合）。export_savefileのunitsで上書きできる。
+UNITS = {"Times": "s", "T": "degC", "Q": "W"}
+
+EXPORT_FORMATS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".h5": "hdf5",
+    ".hdf5": "hdf5",
+}
+
+
+def _get_format(path, format):
+    if format is not None:
+        return format
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in EXPORT_FORMATS:
+        raise ValueError(
+            f"拡張子{ext}から形式を判定できません。formatに'parquet'または'hdf5'を指定してください。"
+        )
+    return EXPORT_FORMATS[ext]
+
+
+def _split_node(name):
+    """ノード名を(サブモデル名, 接頭辞, ノード番号)に分ける（"AAA.T1" -> ("AAA", "T", 1)）"""
+    submodel, node = name.rsplit(".", 1)
+    option = node.rstrip("0123456789")
+    return submodel, option, int(node[len(option) :])
+
+
+def get_node_metadata(node_list, units=None):
+    """ノードのメタデータ（サブモデル名・ノード番号・単位）
+
+    Args:
+        node_list (list): ノード名のリスト（"AAA.T1"の形式）
+        units (dict): 接頭辞（"T"や"Q"）をキー、単位を値とする辞書。UNITSより優先する。
+    Returns:
+        pandas.core.frame.DataFrame: カラムは['node', 'submodel', 'id', 'unit']
+    """
+    units = dict(UNITS, **(units or {}))
+    rows = []
+    for name in node_list:
+        submodel, option, id = _split_node(name)
+        rows.append([name, submodel, id, units.get(option, "")])
+    return pd.DataFrame(rows, columns=["node", "submodel", "id", "unit"])
+
+
+class _ParquetWriter:
+    """時間方向のチャンクごとに、Parquetのrow groupとして書き込む。"""
+
+    def __init__(self, path, meta, dtype, compression, case_column, source):
+        if pq is None:
+            raise ImportError(
+                "Parquetで書き出すにはpyarrowをインストールしてください。"
+            )
+        if compression is None:
+            compression = "zstd"
+        fields = [pa.field("Times", pa.float64(), metadata={"unit": UNITS["Times"]})]
+        if case_column:
+            fields.insert(0, pa.field("case", pa.string()))
+        value_type = pa.from_numpy_dtype(np.dtype(dtype))
+        for row in meta.itertuples():
+            fields.append(
+                pa.field(
+                    row.node,
+                    value_type,
+                    metadata={
+                        "submodel": row.submodel,
+                        "id": str(row.id),
+                        "unit": row.unit,
+                    },
+                )
+            )
+        metadata = {
+            "pyopentd": json.dumps(
+                {
+                    "source": source,
+                    "submodels": list(dict.fromkeys(meta["submodel"])),
+                    "nodes": meta[["node", "submodel", "id", "unit"]].values.tolist(),
+                },
+                ensure_ascii=False,
+            )
+        }
+        self.schema = pa.schema(fields, metadata=metadata)
+        self.dtype = dtype
+        self.writer = pq.ParquetWriter(path, self.schema, compression=compression)
+
+    def write(self, df, case=None):
+        arrays = []
+        for field in self.schema:
+            if field.name == "case":
+                arrays.append(pa.array([case] * len(df), pa.string()))
+            elif field.name == "Times":
+                arrays.append(pa.array(df["Times"].to_numpy(np.float64)))
+            else:
+                arrays.append(pa.array(df[field.name].to_numpy(self.dtype)))
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class _HDF5Writer:
+    """groupの下に、times（n_times）とvalues（n_times × n_nodes）をノード方向のチャンクごとに書き込む。"""
+
+    def __init__(
+        self,
+        h5,
+        group,
+        meta,
+        n_rows,
+        dtype,
+        compression,
+        time_chunk,
+        node_chunk,
+        source,
+    ):
+        if compression is None:
+            compression = "gzip"
+        group = h5.require_group(group)
+        group.attrs["source"] = source
+        n_nodes = len(meta)
+        self.times = group.create_dataset("times", shape=(n_rows,), dtype=np.float64)
+        self.times.attrs["unit"] = UNITS["Times"]
+        if n_rows == 0 or n_nodes == 0:
+            # 空の場合はチャンク・圧縮を指定できない
+            options = {}
+        else:
+            options = dict(
+                chunks=(min(time_chunk, n_rows), min(node_chunk, n_nodes)),
+                compression=compression,
+                shuffle=True,
+            )
+        self.values = group.create_dataset(
+            "values", shape=(n_rows, n_nodes), dtype=dtype, **options
+        )
+        text = h5py.string_dtype()
+        group.create_dataset(
+            "nodes", data=np.array(meta["node"], dtype=object), dtype=text
+        )
+        group.create_dataset(
+            "submodels", data=np.array(meta["submodel"], dtype=object), dtype=text
+        )
+        group.create_dataset("ids", data=meta["id"].to_numpy(np.int64))
+        group.create_dataset(
+            "units", data=np.array(meta["unit"], dtype=object), dtype=text
+        )
+
+    def write(self, savefile, node_list, rows, node_chunk):
+        self.times[:] = np.asarray(savefile.times, dtype=np.float64)[rows]
+        for start, values in _iter_columns(savefile, node_list, rows, node_chunk):
+            columns = slice(start, start + values.shape[1])
+            self.values[:, columns] = values.astype(self.values.dtype)
+
+
+def _open_hdf5(path):
+    if h5py is None:
+        raise ImportError("HDF5で書き出すにはh5pyをインストールしてください。")
+    return h5py.File(path, "w")
+
+
+def _iter_columns(savefile, node_list, rows, node_chunk):
+    """node_listのrows行を、node_chunk列ずつget_data_bulkで読み込む。
+
+    Yields:
+        tuple: (先頭の列番号, (行数, 列数)の配列)
+    """
+    from .result import get_data_bulk
+
+    for i in range(0, len(node_list), node_chunk):
+        df = get_data_bulk(savefile, node_list[i : i + node_chunk], rows)
+        yield i, df.values[:, 1:]
+
+
+def _iter_savefile(savefile, node_list, time, time_chunk, node_chunk, dtype):
+    """node_listの時系列を、time_chunk行ずつのDataFrameとして返す。
+
+    選択した時間範囲・ノードだけを、node_chunk列ずつget_data_bulkで読み込んでdtypeの一時ファイル（メモリマップ）に置き、
+    そこから時間方向に切り出すので、全体を一度にメモリに載せることはない。
+    """
+    times = np.asarray(savefile.times, dtype=np.float64)
+    rows = select_rows(times, time)
+    times = times[rows]
+    shape = (len(times), len(node_list))
+    if 0 in shape:
+        staged, path = np.zeros(shape, dtype=dtype), None
+    else:
+        fd, path = tempfile.mkstemp(suffix=".dat", prefix="pyopentd_")
+        os.close(fd)
+        staged = np.memmap(path, dtype=dtype, mode="w+", shape=shape, order="F")
+    try:
+        for start, values in _iter_columns(savefile, node_list, rows, node_chunk):
+            staged[:, start : start + values.shape[1]] = values
+        for i in range(0, len(times), time_chunk):
+            chunk = slice(i, i + time_chunk)
+            df = pd.DataFrame(np.array(staged[chunk]), columns=node_list)
+            df.insert(0, "Times", times[chunk])
+            yield df
+    finally:
+        if path is not None:
+            _release([staged], path)
+
+
+def _count_rows(savefile, time):
+    rows = select_rows(savefile.times, time)
+    return len(range(*rows.indices(len(savefile.times))))
+
+
+def _select_nodes(savefile, option, pattern, submodels, nodes):
+    if isinstance(option, str):
+        option = [option]
+    node_list = []
+    for o in option:
+        node_list += savefile.node_index.select(submodels, pattern, option=o)
+    if nodes is not None:
+        nodes = set(nodes)
+        node_list = [node for node in node_list if node in nodes]
+    return node_list
+
+
+def export_savefile(
+    savefile,
+    path,
+    option="T",
+    pattern=None,
+    submodels=None,
+    nodes=None,
+    time=None,
+    format=None,
+    dtype="float32",
+    compression=None,
+    time_chunk=10000,
+    node_chunk=256,
+    units=None,
+):
+    """結果の圧縮ファイル（Parquet・HDF5）への書き出し
+
+    .savファイルから選択した時間範囲・ノードだけをnode_chunk個ずつ読み込むので、全ノード×全時刻の配列をメモリに載せることはない。
+    HDF5は読み込んだ列をそのまま書き込み、Parquetは選択した範囲だけをメモリマップの一時ファイルに置いてtime_chunk行ずつ書き出す。
+    サブモデル名・ノード番号・単位はメタデータとして書き込む。
+
+    - Parquet: 列は"Times"とノード名。time_chunk行ごとにrow groupを作る。スキーマのメタデータ"pyopentd"と各列のメタデータにサブモデル名・ノード番号・単位を持つ。
+    - HDF5: times（n_times）、values（n_times × n_nodes、チャンク・圧縮あり）、nodes、submodels、ids、unitsのデータセット。
+
+    Args:
+        savefile (pyopentd.SaveFile): 書き出し元
+        path (str): 書き出し先（.parquet、.h5など）
+        option (str or list): ノード名の接頭辞（"T"や"Q"、["T", "Q"]）
+        pattern (str): ノード名のワイルドカード（例: "PANEL_*.T*"）
+        submodels (list): サブモデル名のリスト（ワイルドカード可）
+        nodes (list): ノード名のリスト（"AAA.T1"の形式）
+        time (tuple): (開始時刻, 終了時刻)。両端を含む。
+        format (str): "parquet"または"hdf5"。Noneの場合は拡張子から判定する。
+        dtype (str): 値の型。"float32"にするとサイズは約半分になる（時刻は常にfloat64）。
+        compression (str): 圧縮方式。Noneの場合はParquetは"zstd"、HDF5は"gzip"。
+        time_chunk (int): 1回に書き込む行数（Parquetのrow group、HDF5のチャンクの大きさ）
+        node_chunk (int): .savファイルから一度に読み込むノード数
+        units (dict): 接頭辞をキー、単位を値とする辞書（UNITSより優先）
+    Returns:
+        pandas.core.frame.DataFrame: 書き出したノードのメタデータ（get_node_metadata）
+    Examples:
+        >>> pt.export_savefile(savefile, "./result.parquet", option=["T", "Q"], time=(t_end - period, None))
+    """
+    format = _get_format(path, format)
+    node_list = _select_nodes(savefile, option, pattern, submodels, nodes)
+    meta = get_node_metadata(node_list, units)
+    source = os.path.abspath(savefile.sav_path)
+    if format == "parquet":
+        writer = _ParquetWriter(path, meta, dtype, compression, False, source)
+        try:
+            for df in _iter_savefile(
+                savefile, node_list, time, time_chunk, node_chunk, dtype
+            ):
+                writer.write(df)
+        finally:
+            writer.close()
+    elif format == "hdf5":
+        with _open_hdf5(path) as h5:
+            writer = _HDF5Writer(
+                h5,
+                "/",
+                meta,
+                _count_rows(savefile, time),
+                dtype,
+                compression,
+                time_chunk,
+                node_chunk,
+                source,
+            )
+            rows = select_rows(savefile.times, time)
+            writer.write(savefile, node_list, rows, node_chunk)
+    else:
+        raise ValueError(f"formatは'parquet'または'hdf5'を指定してください: {format}")
+    return meta
+
+
+def export_dataset(
+    dataset,
+    path,
+    cases=None,
+    option="T",
+    pattern=None,
+    submodels=None,
+    nodes=None,
+    time=None,
+    format=None,
+    dtype="float32",
+    compression=None,
+    time_chunk=10000,
+    node_chunk=256,
+    units=None,
+):
+    """複数ケース（SaveFileDataset）の結果の書き出し
+
+    - Parquet: 1つのファイルに、先頭列"case"を付けて全ケースを順に書き出す。列は全ケースのノード名の和集合で、無いノードはNaN。
+    - HDF5: ケースごとのgroup（/<ケース名>）に、export_savefileと同じ形式で書き出す。
+
+    引数はexport_savefileと同じ（casesは書き出すケース。Noneの場合は全ケース）。
+
+    Returns:
+        pandas.core.frame.DataFrame: 書き出したノードのメタデータ（全ケースの和集合）
+    Examples:
+        >>> ds = pt.SaveFileDataset({"hot": "./hot.sav", "cold": "./cold.sav"})
+        >>> ds.export("./sweep.parquet", pattern="PANEL_*.T*")
+    """
+    format = _get_format(path, format)
+    if cases is None:
+        cases = dataset.cases
+    node_lists = {
+        case: _select_nodes(dataset.savefiles[case], option, pattern, submodels, nodes)
+        for case in cases
+    }
+    all_nodes = list(
+        dict.fromkeys(n for node_list in node_lists.values() for n in node_list)
+    )
+    meta = get_node_metadata(all_nodes, units)
+    if format == "parquet":
+        writer = _ParquetWriter(path, meta, dtype, compression, True, "")
+        try:
+            for case in cases:
+                savefile = dataset.savefiles[case]
+                for df in _iter_savefile(
+                    savefile, node_lists[case], time, time_chunk, node_chunk, dtype
+                ):
+                    writer.write(df.reindex(columns=["Times"] + all_nodes), case)
+        finally:
+            writer.close()
+    elif format == "hdf5":
+        with _open_hdf5(path) as h5:
+            for case in cases:
+                savefile = dataset.savefiles[case]
+                source = os.path.abspath(str(dataset.sav_paths[case]))
+                writer = _HDF5Writer(
+                    h5,
+                    str(case),
+                    get_node_metadata(node_lists[case], units),
+                    _count_rows(savefile, time),
+                    dtype,
+                    compression,
+                    time_chunk,
+                    node_chunk,
+                    source,
+                )
+                rows = select_rows(savefile.times, time)
+                writer.write(savefile, node_lists[case], rows, node_chunk)
+    else:
+        raise ValueError(f"formatは'parquet'または'hdf5'を指定してください: {format}")
+    return meta
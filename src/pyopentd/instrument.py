@@ -0,0 +1,291 @@
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+import pandas as pd
+
+__all__ = ["Instrumentation"]
+
+
+# 計測するOpenTDのメソッド（クラスに無いものは飛ばす）
+TD_METHODS = [
+    "GetNodes",
+    "GetNode",
+    "GetHeaters",
+    "GetHeater",
+    "GetHeatLoads",
+    "GetOrbits",
+    "GetOrbit",
+    "GetCaseSets",
+    "GetCaseSet",
+    "GetSolidBricks",
+    "GetSolidCylinders",
+    "GetRectangles",
+    "GetPolygons",
+    "GetCylinders",
+    "CreateHeater",
+    "CreateHeatLoad",
+    "CreateOrbit",
+    "CreateCaseSet",
+]
+SAVEFILE_METHODS = [
+    "GetTimes",
+    "GetData",
+    "GetThermalSubmodels",
+    "GetNodeIds",
+]
+# Caseは.NETのCaseSetを継承していないので、Update()・Run()を呼ぶメソッドを計測する
+CASE_METHODS = {"update": "CaseSet.Update", "run": "CaseSet.Run"}
+# 差し替えるクラス（モジュールごと）。importされていないモジュールは、importされたときに差し替える。
+# ヒーター・軌道などのエンティティのUpdate()は.NETのオブジェクトなので、呼び出し側で_spanを使って記録する。
+TARGETS = {
+    "pyopentd.main": [
+        ("ThermalDesktop", {name: name for name in TD_METHODS}),
+        ("Case", CASE_METHODS),
+    ],
+    "pyopentd.result": [
+        ("SaveFile", {name: name for name in SAVEFILE_METHODS}),
+    ],
+}
+# 1要素あたりのバイト数の推定値（数値1つ、または.NETのオブジェクトへの参照1つ分）
+ELEMENT_BYTES = 8
+
+_active = None
+
+
+def _count_elements(value):
+    """やり取りした要素数（リスト・配列の長さ）の推定。長さの無いものは0。"""
+    if value is None or isinstance(value, (str, bytes, int, float)):
+        return 0
+    for attr in ("Length", "Count"):
+        n = getattr(value, attr, None)
+        if isinstance(n, int):
+            return n
+    try:
+        return len(value)
+    except TypeError:
+        return 0
+
+
+def _estimate_bytes(value):
+    """やり取りしたバイト数の推定。文字列はUTF-16（.NETの文字列）、リスト・配列は要素数×ELEMENT_BYTES。"""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return 2 * len(value)
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, (bool, int, float)):
+        return ELEMENT_BYTES
+    return _count_elements(value) * ELEMENT_BYTES
+
+
+def _patch_if_active(module):
+    """モジュールのimport時に呼ぶ。計測中であれば、そのモジュールのクラスのメソッドを差し替える。"""
+    if _active is not None:
+        _active._patch_module(module)
+
+
+def _get_caller():
+    """呼び出し元のpyopentdのメソッド（利用者から見て最も外側のもの）の名前"""
+    caller = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        code = frame.f_code
+        if (
+            module.startswith("pyopentd.")
+            and module != __name__
+            and not code.co_name.startswith("<")
+        ):
+            owner = frame.f_locals.get("self")
+            if owner is not None:
+                caller = f"{type(owner).__name__}.{code.co_name}"
+            else:
+                caller = code.co_name
+        frame = frame.f_back
+    return caller
+
+
+class Instrumentation:
+    """Instrumentation Class
+
+    OpenTDの呼び出し（GetNodes、GetData、Update、Runなど）の回数・時間・やり取りした要素数を記録するクラス。
+    start()からstop()までの間（withブロックの中）だけ、ThermalDesktop・SaveFile・Caseのメソッドを計測用に差し替える。
+    各呼び出しは、それを呼んだpyopentdのメソッド（get_heatersなど）に紐づけて集計する。
+
+    Note:
+        計測はこのプロセスの中だけ。BatchRunnerなどのワーカープロセスでの呼び出しは記録されない。
+        bytesは推定値（数値・参照は1つ8byte、文字列はUTF-16）。
+
+    Examples:
+        >>> with pt.Instrumentation() as prof:
+        ...     td.get_heaters()
+        ...     savefile.get_all_temperature()
+        >>> prof.get_summary()
+        >>> prof.to_chrome_trace("trace.json")  # chrome://tracing や Perfetto で開く
+
+    """
+
+    def __init__(self):
+        self.records = []
+        self._patches = []
+        self._t0 = time.perf_counter()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """計測の開始"""
+        global _active
+        if _active is not None:
+            raise RuntimeError("他のInstrumentationが計測中です。")
+        # ここでimportすると、結果の読み込みだけの場合にもOpenTDv62を読み込むことになるので、
+        # import済みのモジュールだけを差し替え、残りはimportされたときに差し替える（_patch_if_active）
+        _active = self
+        for module_name in TARGETS:
+            module = sys.modules.get(module_name)
+            if module is not None:
+                self._patch_module(module)
+        return self
+
+    def stop(self):
+        """計測の終了（差し替えたメソッドを元に戻す）"""
+        global _active
+        for cls, name, original in reversed(self._patches):
+            if original is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+        self._patches = []
+        if _active is self:
+            _active = None
+
+    def _patch_module(self, module):
+        for class_name, methods in TARGETS[module.__name__]:
+            cls = getattr(module, class_name)
+            for name, call in methods.items():
+                self._patch(cls, name, call)
+
+    def _patch(self, cls, name, call):
+        if not hasattr(cls, name):
+            return
+        func = getattr(cls, name)
+
+        def wrapper(obj, *args, **kwargs):
+            with self.span(call) as record:
+                result = func(obj, *args, **kwargs)
+                values = (result,) + args + tuple(kwargs.values())
+                record["elements"] += sum(_count_elements(v) for v in values)
+                record["bytes"] += sum(_estimate_bytes(v) for v in values)
+            return result
+
+        wrapper.__name__ = name
+        self._patches.append((cls, name, cls.__dict__.get(name)))
+        setattr(cls, name, wrapper)
+
+    @contextmanager
+    def span(self, call):
+        """1回の呼び出しの記録。with内でrecord["elements"]、record["bytes"]に加算できる。"""
+        record = {
+            "call": call,
+            "caller": _get_caller(),
+            "elements": 0,
+            "bytes": 0,
+            "thread": threading.get_ident(),
+            "error": None,
+        }
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["error"] = repr(e)
+            raise
+        finally:
+            record["start"] = start - self._t0
+            record["duration"] = time.perf_counter() - start
+            self.records.append(record)
+
+    def clear(self):
+        self.records = []
+
+    def get_records(self):
+        """全呼び出しの記録"""
+        columns = [
+            "call",
+            "caller",
+            "start",
+            "duration",
+            "elements",
+            "bytes",
+            "thread",
+            "error",
+        ]
+        return pd.DataFrame(self.records, columns=columns)
+
+    def get_summary(self, by=("caller", "call")):
+        """呼び出しの集計
+
+        Args:
+            by (tuple): 集計の単位。("caller",)とすればpyopentdのメソッドごとの合計になる。
+        Returns:
+            pandas.core.frame.DataFrame: count, total_time, mean_time, max_time, elements, bytes。total_timeの降順。
+        """
+        df = self.get_records()
+        df["caller"] = df["caller"].fillna("(user)")
+        df = df.groupby(list(by)).agg(
+            count=("duration", "size"),
+            total_time=("duration", "sum"),
+            mean_time=("duration", "mean"),
+            max_time=("duration", "max"),
+            elements=("elements", "sum"),
+            bytes=("bytes", "sum"),
+        )
+        return df.sort_values("total_time", ascending=False).reset_index()
+
+    def to_chrome_trace(self, path=None):
+        """Chromeのトレース形式（Trace Event Format）での出力
+
+        Args:
+            path (str): 保存先のJSONファイル。Noneの場合は保存せずに返すだけ。
+        Returns:
+            dict: {"traceEvents": [...]}
+        """
+        events = []
+        for record in self.records:
+            events.append(
+                {
+                    "name": record["call"],
+                    "cat": record["caller"] or "(user)",
+                    "ph": "X",
+                    "ts": record["start"] * 1e6,
+                    "dur": record["duration"] * 1e6,
+                    "pid": 0,
+                    "tid": record["thread"],
+                    "args": {
+                        "caller": record["caller"],
+                        "elements": record["elements"],
+                        "bytes": record["bytes"],
+                        "error": record["error"],
+                    },
+                }
+            )
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        if path is not None:
+            with open(path, "w") as f:
+                json.dump(trace, f)
+        return trace
+
+
+@contextmanager
+def _span(call):
+    """計測中であれば1回分の記録を作る（pyopentd内部で、メソッドの差し替えでは捉えられない処理に使う）"""
+    if _active is None:
+        yield {"elements": 0, "bytes": 0}
+    else:
+        with _active.span(call) as record:
+            yield record
@@ -0,0 +1,225 @@
+import os
+import weakref
+import tempfile
+import numpy as np
+import pandas as pd
+
+from .downsample import select_rows
+
+__all__ = ["LazyResult"]
+
+
+def _close_map(data):
+    """メモリマップを閉じる"""
+    mm = getattr(data, "_mmap", None)
+    if mm is not None:
+        try:
+            mm.close()
+        except (BufferError, ValueError):
+            pass
+
+
+def _release(maps, path):
+    """メモリマップを閉じ、pathがあればファイルを削除する（LazyResultのclose・ガベージコレクション時）"""
+    while maps:
+        _close_map(maps.pop())
+    if path is not None and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class LazyResult:
+    """LazyResult Class
+
+    .savファイルの結果を必要な部分だけ読み込むクラス。SaveFile.get_lazy()で作成する。
+    読み込んだノードの系列はメモリマップされたディスク上の配列にキャッシュし、同じノードを再度.savファイルから読むことはない。
+    ファイルには読み込んだ列だけを追記していくので、ディスク使用量は全ノード分ではなく、要求した列の分だけになる。
+    返すDataFrameは指定したサブモデル・ノード・時間範囲の分だけなので、巨大な.savファイルでもメモリ使用量は切り出した範囲程度に収まる。
+
+    Args:
+        savefile (pyopentd.SaveFile): 読み込み元のSaveFile
+        option (str): "T"（温度）や"Q"（熱入力）など、ノード名の接頭辞
+        mmap_path (str): メモリマップファイルのパス。Noneの場合は一時ファイルを作成する。
+        chunk_size (int): .savファイルから一度に読み込むノード数
+
+    一時ファイルはclose()（withブロックを抜けたとき）か、オブジェクトが破棄されたときに削除する。
+
+    Examples:
+        >>> with savefile.get_lazy("T") as lazy:
+        ...     df = lazy.last(orbit_period, pattern="PANEL_*.T*")
+
+    """
+
+    def __init__(self, savefile, option="T", mmap_path=None, chunk_size=256):
+        self.savefile = savefile
+        self.option = option
+        self.chunk_size = chunk_size
+        self.times = np.asarray(savefile.times, dtype=np.float64)
+        self.node_index = savefile.node_index
+        self.node_names = self.node_index.select(option=option)
+        temporary = mmap_path is None
+        if temporary:
+            fd, mmap_path = tempfile.mkstemp(suffix=".dat", prefix="pyopentd_")
+            os.close(fd)
+        else:
+            open(mmap_path, "wb").close()
+        self.mmap_path = mmap_path
+        # 列番号 -> ファイル上の列の位置（未読み込みは-1）
+        self._slots = np.full(len(self.node_names), -1, dtype=np.int64)
+        self._n_loaded = 0
+        self._maps = []
+        self._finalizer = weakref.finalize(
+            self, _release, self._maps, mmap_path if temporary else None
+        )
+
+    @property
+    def _loaded(self):
+        return self._slots >= 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def shape(self):
+        return (len(self.times), len(self.node_names))
+
+    def select_columns(self, submodels=None, nodes=None, pattern=None):
+        """列番号の選択
+
+        Args:
+            submodels (list): サブモデル名のリスト。"PANEL_*"のようなワイルドカードも使用可。
+            nodes (list): ノード名のリスト（"AAA.T1"の形式）
+            pattern (str): ノード名のワイルドカード（例: "PANEL_*.T*"）
+        Returns:
+            numpy.ndarray: 列番号の配列
+        """
+        columns = self.node_index.positions(
+            submodels, pattern, option=self.option
+        )
+        if nodes is not None:
+            selected = [self.node_index.position(node) for node in nodes]
+            columns = np.intersect1d(
+                columns, [c for c in selected if c is not None]
+            )
+        return np.asarray(columns, dtype=np.int64)
+
+    def select_times(self, time=None):
+        """時間範囲の選択
+
+        Args:
+            time (tuple): (開始時刻, 終了時刻)。どちらもNoneで端を表す。両端を含む。
+        Returns:
+            slice: 行のスライス
+        """
+        return select_rows(self.times, time)
+
+    def _load(self, columns):
+        """未読み込みの列だけを.savファイルから読み込み、ファイルの末尾に追記してメモリマップし直す。"""
+        from .result import get_data_bulk
+
+        missing = [c for c in columns if self._slots[c] < 0]
+        if not missing:
+            return
+        _release(self._maps, None)
+        with open(self.mmap_path, "ab") as f:
+            for i in range(0, len(missing), self.chunk_size):
+                chunk = missing[i : i + self.chunk_size]
+                df = get_data_bulk(
+                    self.savefile, [self.node_names[c] for c in chunk]
+                )
+                # 列ごとに連続した（Fortran順の）並びで書き込む
+                np.ascontiguousarray(df.values[:, 1:].T).tofile(f)
+                self._slots[chunk] = np.arange(
+                    self._n_loaded, self._n_loaded + len(chunk)
+                )
+                self._n_loaded += len(chunk)
+        if len(self.times) > 0:
+            self._maps.append(
+                np.memmap(
+                    self.mmap_path,
+                    dtype=np.float64,
+                    mode="r+",
+                    shape=(len(self.times), self._n_loaded),
+                    order="F",
+                )
+            )
+
+    def _read(self, rows, columns):
+        """読み込み済みの列から、rows行・columns列の配列を取り出す（コピー）。"""
+        if not self._maps:
+            n_rows = len(range(*rows.indices(len(self.times))))
+            return np.zeros((n_rows, len(columns)))
+        return self._maps[0][rows, self._slots[columns]]
+
+    def sel(self, submodels=None, nodes=None, time=None, pattern=None):
+        """結果の切り出し
+
+        Args:
+            submodels (list): サブモデル名のリスト。"PANEL_*"のようなワイルドカードも使用可。
+            nodes (list): ノード名のリスト（"AAA.T1"の形式）
+            time (tuple): (開始時刻, 終了時刻)
+            pattern (str): ノード名のワイルドカード（例: "PANEL_*.T*"）
+        Returns:
+            pandas.core.frame.DataFrame: 先頭列が"Times"の時系列データ
+        """
+        columns = self.select_columns(submodels, nodes, pattern)
+        rows = self.select_times(time)
+        self._load(columns)
+        df = pd.DataFrame(
+            self._read(rows, columns),
+            columns=[self.node_names[c] for c in columns],
+        )
+        df.insert(0, "Times", self.times[rows])
+        return df
+
+    def iter_chunks(
+        self,
+        submodels=None,
+        nodes=None,
+        pattern=None,
+        time=None,
+        time_chunk=10000,
+    ):
+        """時間方向に分割した切り出し（書き出しなどで、全体を一度にメモリに載せないために使う）
+
+        選択した列はまずメモリマップに読み込み、そこからtime_chunk行ずつ返す。
+
+        Args:
+            time_chunk (int): 1回に返す行数
+            その他の引数はsel、select_columnsと同じ。
+        Yields:
+            pandas.core.frame.DataFrame: 先頭列が"Times"の時系列データ（time_chunk行ずつ）
+        """
+        columns = self.select_columns(submodels, nodes, pattern)
+        rows = self.select_times(time)
+        self._load(columns)
+        names = [self.node_names[c] for c in columns]
+        start, stop, _ = rows.indices(len(self.times))
+        for i in range(start, stop, time_chunk):
+            chunk = slice(i, min(i + time_chunk, stop))
+            df = pd.DataFrame(self._read(chunk, columns), columns=names)
+            df.insert(0, "Times", self.times[chunk])
+            yield df
+
+    def last(self, duration, submodels=None, nodes=None, pattern=None):
+        """最後のduration秒間（例えば最後の1周回）の切り出し"""
+        return self.sel(
+            submodels,
+            nodes,
+            time=(self.times[-1] - duration, None),
+            pattern=pattern,
+        )
+
+    def close(self, remove=True):
+        """メモリマップの解放
+
+        Args:
+            remove (bool): Trueの場合はメモリマップのファイルも削除する。
+        """
+        self._finalizer.detach()
+        _release(self._maps, self.mmap_path if remove else None)
@@ -1,17 +1,14 @@
+import os
 import sys
-import clr
+from contextlib import contextmanager
+from operator import attrgetter
 import numpy as np
 import pandas as pd
 from argparse import ArgumentParser
 
-sys.path.append(
-    "C:/Windows/Microsoft.NET/assembly/GAC_MSIL/OpenTDv62/v4.0_6.2.0.7__65e6d95ed5c2e178/"
-)
-clr.AddReference("OpenTDv62")
-sys.path.append(
-    "C:/Windows/Microsoft.NET/assembly/GAC_64/OpenTDv62.Results/v4.0_6.2.0.0__b62f614be6a1e14a/"
-)
-clr.AddReference("OpenTDv62.Results")
+from .backend import load_opentd
+
+load_opentd()
 
 # from System import *
 from System.Collections.Generic import List
@@ -19,6 +16,158 @@ import OpenTDv62 as otd
 import System
 from OpenTDv62 import Dimension
 
+from .aio import run_case_async
+from .utils import to_net_list
+from .snapshot import ModelSnapshot
+from .instrument import _span, _patch_if_active
+
+__all__ = [
+    "ThermalDesktop",
+    "Case",
+    "SymbolEditor",
+    "NodeLookup",
+    "ORBIT_COLUMNS",
+    "GEOMETRY_TYPES",
+    "GEOMETRY_FIELDS",
+]
+
+
+ORBIT_COLUMNS = [
+    "Times",
+    "sun_x",
+    "sun_y",
+    "sun_z",
+    "planet_x",
+    "planet_y",
+    "planet_z",
+    "radius",
+]
+
+
+# 形状の種類ごとの(取得メソッド, 分類)
+GEOMETRY_TYPES = {
+    "solid_brick": ("GetSolidBricks", "solid"),
+    "solid_cylinder": ("GetSolidCylinders", "solid"),
+    "rectangle": ("GetRectangles", "thin_shell"),
+    "polygon": ("GetPolygons", "thin_shell"),
+    "cylinder": ("GetCylinders", "thin_shell"),
+}
+
+_SOLID_FIELDS = {
+    "start_submodel": "StartSubmodel",
+    "cond_submodel": "CondSubmodel",
+    "node_names": "NodeNames",
+    "attached_node_handles": "AttachedNodeHandles",
+    "outside_optical_properties": "OutsideOpticalProperties",
+    "handle": "Handle",
+    "comment": "Comment",
+}
+_THIN_SHELL_FIELDS = {
+    "top_start_submodel": "TopStartSubmodel",
+    "bot_start_submodel": "BotStartSubmodel",
+    "cond_submodel": "CondSubmodel",
+    "top_node_names": "TopNodeNames",
+    "bot_node_names": "BotNodeNames",
+    "_attached_node_handles": "_AttachedNodeHandles",
+    "top_optical_prop": "TopOpticalProp",
+    "bot_optical_prop": "BotOpticalProp",
+    "handle": "Handle",
+    "comment": "Comment",
+}
+
+# 形状の種類ごとの抽出項目（列名: OpenTDのプロパティ名）
+# TODO: 抽出する項目は要検討
+GEOMETRY_FIELDS = {
+    "solid_brick": {
+        **_SOLID_FIELDS,
+        "x_max": "XMax",
+        "y_max": "YMax",
+        "z_max": "ZMax",
+    },
+    "solid_cylinder": {
+        **_SOLID_FIELDS,
+        "height": "Height",
+        "r_min": "Rmin",
+        "r_max": "Rmax",
+        "start_angle": "StartAngle",
+        "end_angle": "EndAngle",
+    },
+    "rectangle": {
+        **_THIN_SHELL_FIELDS,
+        "x_max": "XMax",
+        "y_max": "YMax",
+        "top_thickness": "TopThickness",
+        "bot_thickness": "BotThickness",
+    },
+    "polygon": {
+        **_THIN_SHELL_FIELDS,
+        "top_thickness": "TopThickness",
+        "bot_thickness": "BotThickness",
+    },
+    "cylinder": {
+        **_THIN_SHELL_FIELDS,
+        "height": "Height",
+        "radius": "Radius",
+        "start_angle": "StartAngle",
+        "end_angle": "EndAngle",
+    },
+}
+
+# create_orbitは軌道のベクトルの各成分をこの値で割ってVector3dを作成し、get_orbitは掛けて戻す。
+_ORBIT_VECTOR_SCALE = 1000
+
+# get_solid_bricksなど種類ごとのメソッドで使っていた列名
+_LEGACY_GEOMETRY_COLUMNS = {"solid_brick": {"y_max": "y_mMax", "z_max": "z_mMax"}}
+
+
+def _to_vector3d_array(xyz):
+    """(n, 3)のNumPy配列を.NETのVector3d配列に変換する"""
+    return System.Array[otd.Vector3d](
+        [otd.Vector3d(x, y, z) for x, y, z in xyz.tolist()]
+    )
+
+
+def _vector3d_to_array(vectors):
+    """Vector3dのリストを、各成分のGetValueSIの値を並べた(n, 3)のNumPy配列に変換する（1回の走査で取り出す）"""
+    xyz = np.fromiter(
+        (
+            value
+            for vector in vectors
+            for value in (
+                vector.X.GetValueSI(),
+                vector.Y.GetValueSI(),
+                vector.Z.GetValueSI(),
+            )
+        ),
+        dtype=np.float64,
+    ).reshape(-1, 3)
+    return xyz
+
+
+class NodeLookup:
+    """NodeLookup Class
+
+    モデルのノードの索引。(サブモデル名, ID)とハンドルの両方からノードを引ける。
+    ThermalDesktop.node_lookupで1度だけGetNodes()を呼んで作成し、get_node、get_heaters、get_heatloads、create_heaterなどで共有する。
+
+    """
+
+    def __init__(self, nodes):
+        self.by_key = {}
+        self.by_handle = {}
+        for node in nodes:
+            self.by_key[(node.Submodel.ToString(), int(node.Id))] = node
+            self.by_handle[node.Handle] = node
+
+    def __len__(self):
+        return len(self.by_handle)
+
+    def get(self, submodel, id):
+        return self.by_key.get((str(submodel), int(id)))
+
+    def get_by_handle(self, handle):
+        return self.by_handle.get(handle)
+
 
 class ThermalDesktop(otd.ThermalDesktop):
     """ThermalDesktop Class
@@ -29,10 +178,62 @@ class ThermalDesktop(otd.ThermalDesktop):
 
     def __init__(self, dwg_path, visible=True):
         super().__init__()
+        self.dwg_path = dwg_path
         dwg_path_obj = otd.Utility.RootedPathname(dwg_path)
         self.ConnectConfig.DwgPathname = dwg_path_obj
         self.ConnectConfig.AcadVisible = visible
         self.Connect()
+        self.snapshot = ModelSnapshot(self)
+        self._node_lookup = None
+        self._node_lookup_retried = False
+        self._orbit_cache = {}
+
+    @property
+    def node_lookup(self):
+        """ノードの索引（pyopentd.NodeLookup）。snapshotのノード一覧から初回アクセス時に1度だけ作成する。"""
+        if self._node_lookup is None:
+            self._node_lookup = NodeLookup(self.snapshot["GetNodes"].objects)
+            self._node_lookup_retried = False
+        return self._node_lookup
+
+    def invalidate_node_lookup(self):
+        """ノードの索引の破棄
+
+        pyopentdを経由せずにノードを追加・削除した場合などに呼ぶ。次回アクセス時に作り直される。
+        （get_nodeはノードが見つからない場合に索引を作り直すが、作り直すのは索引1つにつき1回だけ。）
+        """
+        self._node_lookup = None
+        self.snapshot.refresh("GetNodes")
+
+    def refresh(self):
+        """snapshot・ノードの索引・軌道データなど、保持している全ての情報の破棄
+
+        pyopentdを経由せずにモデルを変更した場合に呼ぶ。
+        """
+        self.snapshot.refresh()
+        self._node_lookup = None
+        self.invalidate_orbit_cache()
+
+    def _get_node_name(self, handle):
+        """ハンドルから"サブモデル名.ID"を取得"""
+        node = self.node_lookup.get_by_handle(handle)
+        if node is None:
+            node = self.GetNode(handle)
+        return f"{node.Submodel}.{node.Id}"
+
+    def _get_connection_node(self, connections, message):
+        """接続先のノード名（1つ目のみ）の取得。2つ以上ある場合はmessageを表示する。"""
+        if len(connections) >= 2:
+            print(message)
+        if len(connections) == 0:
+            return None
+        return self._get_node_name(connections[0].Handle)
+
+    def _get_entities(self, method_name, spec, columns, refresh):
+        """snapshotからの一覧の取得（get_heatersなどの共通処理）"""
+        if refresh:
+            self.snapshot.refresh(method_name)
+        return self.snapshot[method_name].to_frame(spec, columns)
 
     def get_casesets(self):
         cases_td = self.GetCaseSets()
@@ -59,190 +260,166 @@ class ThermalDesktop(otd.ThermalDesktop):
     def get_caseset(self, caseset_name, group_name):
         return Case(self.GetCaseSet(caseset_name, group_name))
 
-    def get_heatloads(self):
+    def get_heatloads(self, columns=None, refresh=False):
+        """ヒートロードの一覧
+
+        一覧はsnapshotに保持し、プロパティはcolumnsで指定した列の分だけ取得する。
+
+        Args:
+            columns (list): 取得する列。Noneの場合は全列。
+            refresh (bool): Trueの場合は保持している一覧を使わずに取得し直す。
+        Returns:
+            pandas.core.frame.DataFrame
+        """
         # * アプライ先、センサー先のノードは1つであると仮定。
         # * ノードヒーターであると仮定。
         # TODO 色々なタイプのノードに対応させる。
-        heatloads = self.GetHeatLoads()
-        heatloads_list = []
-        for heatload in heatloads:
-            apply_node = None
-            name = heatload.Name
-            submodel = heatload.Submodel.ToString()
-            handle = heatload.Handle
-            value = heatload.Value
-            value_exp = heatload.ValueExp
-            transient_type = heatload.HeatLoadTransientType
-            enabled_exp = heatload.EnabledExp.ToString()
-            if heatload.ApplyConnections != []:
-                node = self.GetNode(heatload.ApplyConnections[0].Handle)
-                apply_node = f"{node.Submodel}.{node.Id}"
-            if len(heatload.ApplyConnections) >= 2:
-                print("MYWARNING: 1つのヒーターが2つ以上のノードに適用されています。")
-            heatloads_list.append(
-                [
-                    name,
-                    submodel,
-                    handle,
-                    apply_node,
-                    transient_type,
-                    value,
-                    value_exp,
-                    enabled_exp,
-                    heatload,
-                ]
-            )
-        header = [
-            "Name",
-            "submodel",
-            "handle",
-            "apply_node",
-            "transient_type",
-            "value",
-            "value_exp",
-            "enabled_exp",
-            "original_object",
+        spec = [
+            ("Name", lambda h: h.Name),
+            ("submodel", lambda h: h.Submodel.ToString()),
+            ("handle", lambda h: h.Handle),
+            (
+                "apply_node",
+                lambda h: self._get_connection_node(
+                    h.ApplyConnections,
+                    "MYWARNING: 1つのヒーターが2つ以上のノードに適用されています。",
+                ),
+            ),
+            ("transient_type", lambda h: h.HeatLoadTransientType),
+            ("value", lambda h: h.Value),
+            ("value_exp", lambda h: h.ValueExp),
+            ("enabled_exp", lambda h: h.EnabledExp.ToString()),
+            ("original_object", lambda h: h),
         ]
-        df_heatloads = pd.DataFrame(heatloads_list, columns=header)
-        return df_heatloads
+        return self._get_entities("GetHeatLoads", spec, columns, refresh)
+
+    def get_heaters(self, columns=None, refresh=False):
+        """ヒーターの一覧
+
+        一覧はsnapshotに保持し、プロパティはcolumnsで指定した列の分だけ取得する。
 
-    def get_heaters(self):
+        Args:
+            columns (list): 取得する列。Noneの場合は全列。
+            refresh (bool): Trueの場合は保持している一覧を使わずに取得し直す。
+        Returns:
+            pandas.core.frame.DataFrame
+        """
         # * アプライ先、センサー先のノードは1つであると仮定。
         # * ノードヒーターであると仮定。
         # TODO 色々なタイプのノードに対応させる。
-        heaters = self.GetHeaters()
-        heaters_list = []
-        for heater in heaters:
-            apply_node = None
-            sensor_node = None
-            name = heater.Name
-            submodel = heater.Submodel
-            handle = heater.Handle
-            value = heater.Value
-            value_exp = heater.ValueExp
-            on_temp = heater.OnTemp
-            on_temp_exp = heater.OnTempExp
-            off_temp = heater.OffTemp
-            off_temp_exp = heater.OffTempExp
-            enabled_exp = heater.EnabledExp.ToString()
-            if heater.ApplyConnections != []:
-                node = self.GetNode(heater.ApplyConnections[0].Handle)
-                apply_node = f"{node.Submodel}.{node.Id}"
-            if len(heater.ApplyConnections) >= 2:
-                print("MYWARNING: 1つのヒーターが2つ以上のノードに適用されています。")
-            if heater.SensorConnections != []:
-                node = self.GetNode(heater.SensorConnections[0].Handle)
-                sensor_node = f"{node.Submodel}.{node.Id}"
-            if len(heater.SensorConnections) >= 2:
-                print("MYWARNING: 1つのヒーターが2つ以上のノードの温度を監視してます。")
-            heaters_list.append(
-                [
-                    name,
-                    submodel,
-                    handle,
-                    apply_node,
-                    sensor_node,
-                    value,
-                    value_exp,
-                    on_temp,
-                    on_temp_exp,
-                    off_temp,
-                    off_temp_exp,
-                    enabled_exp,
-                    heater,
-                ]
-            )
-        header = [
-            "Name",
-            "submodel",
-            "handle",
-            "apply_node",
-            "sensor_node",
-            "value",
-            "value_exp",
-            "on_temp",
-            "on_temp_exp",
-            "off_temp",
-            "off_temp_exp",
-            "enabled_exp",
-            "original_object",
+        spec = [
+            ("Name", lambda h: h.Name),
+            ("submodel", lambda h: h.Submodel),
+            ("handle", lambda h: h.Handle),
+            (
+                "apply_node",
+                lambda h: self._get_connection_node(
+                    h.ApplyConnections,
+                    "MYWARNING: 1つのヒーターが2つ以上のノードに適用されています。",
+                ),
+            ),
+            (
+                "sensor_node",
+                lambda h: self._get_connection_node(
+                    h.SensorConnections,
+                    "MYWARNING: 1つのヒーターが2つ以上のノードの温度を監視してます。",
+                ),
+            ),
+            ("value", lambda h: h.Value),
+            ("value_exp", lambda h: h.ValueExp),
+            ("on_temp", lambda h: h.OnTemp),
+            ("on_temp_exp", lambda h: h.OnTempExp),
+            ("off_temp", lambda h: h.OffTemp),
+            ("off_temp_exp", lambda h: h.OffTempExp),
+            ("enabled_exp", lambda h: h.EnabledExp.ToString()),
+            ("original_object", lambda h: h),
         ]
-        df_heaters = pd.DataFrame(heaters_list, columns=header)
-        return df_heaters
+        return self._get_entities("GetHeaters", spec, columns, refresh)
 
     def get_heater(self, handle):
         return self.GetHeater(handle)
 
-    def get_orbits(td):
-        orbits_list = []
-        orbits = td.GetOrbits()
-        for orbit in orbits:
-            orbits_list.append([orbit.Name, orbit.OrbitType, orbit])
-        df_orbits = pd.DataFrame(
-            orbits_list, columns=["Name", "OrbitType", "original_object"]
-        )
-        return df_orbits
+    def get_orbits(self, columns=None, refresh=False):
+        spec = [
+            ("Name", lambda o: o.Name),
+            ("OrbitType", lambda o: o.OrbitType),
+            ("original_object", lambda o: o),
+        ]
+        return self._get_entities("GetOrbits", spec, columns, refresh)
+
+    def get_orbit(self, orbit_name, use_cache=True):
+        """軌道データの所得
+
+        太陽方向・惑星方向のベクトルは、各成分のGetValueSIの値を1回の走査でNumPy配列に取り出し、
+        create_orbitの逆変換として1000倍する（惑星方向のm→kmの換算は以前と同じ）。
+        以前の版の、値の大きさから1000倍・1/1000を推定する換算は行わず、長さ1への正規化もしない。
+        結果は軌道名ごとに保持し、create_orbitで同名の軌道を作成するかinvalidate_orbit_cacheを呼ぶまで再利用する。
 
-    def get_orbit(self, orbit_name):
-        """軌道データの所得"""
+        Args:
+            orbit_name (str): 軌道の名前
+            use_cache (bool): Falseの場合は保持している結果を使わずに取得し直す。
+        Returns:
+            pandas.core.frame.DataFrame: カラムは['Times', 'sun_x', 'sun_y', 'sun_z', 'planet_x', 'planet_y', 'planet_z', 'radius']
+        """
+        if use_cache and orbit_name in self._orbit_cache:
+            return self._orbit_cache[orbit_name].copy()
         orbit = self.GetOrbit(orbit_name)
-        # 太陽方向vec
-        sun_vecs = []
-        for HrSunVec in orbit.HrSunVecArray:
-            x = HrSunVec.X.GetValueSI()
-            y = HrSunVec.Y.GetValueSI()
-            z = HrSunVec.Z.GetValueSI()
-            sun_vecs.append([x, y, z])
-        df_sun = pd.DataFrame(sun_vecs, columns=["sun_x", "sun_y", "sun_z"])
-        if df_sun.max().max() < 0.0011:
-            df_sun *= 1000
-        if df_sun.max().max() > 1.1:
-            df_sun /= 1000
-        # 惑星（地球）方向vec
-        planet_vecs = []
-        for HrPlanetVec in orbit.HrPlanetVecArray:
-            x = HrPlanetVec.X.GetValueSI()
-            y = HrPlanetVec.Y.GetValueSI()
-            z = HrPlanetVec.Z.GetValueSI()
-            planet_vecs.append([x, y, z])
-        df_planet = (
-            pd.DataFrame(
-                planet_vecs, columns=["planet_x", "planet_y", "planet_z"]
-            )
-            * 1000
+        times = np.fromiter(
+            (t.GetValueSI() for t in orbit.HrTimeArray), dtype=np.float64
         )
-        if df_planet.abs().max().max() < 0.0011:
-            df_planet *= 1000
-        if df_planet.abs().max().max() > 1.1:
-            df_planet /= 1000
-        # 時間列
-        times = []
-        for HrTime in orbit.HrTimeArray:
-            t = HrTime.GetValueSI()
-            times.append(t)
-        df_times = pd.DataFrame(times, columns=["Times"])
-        # 距離時系列
-        radiuses = orbit.HrOrbitRadiusArray
-        df_radiuses = pd.DataFrame(radiuses, columns=["radius"])
-        return pd.concat([df_times, df_sun, df_planet, df_radiuses], axis=1)
-
-    def get_nodes(self):
-        nodes = self.GetNodes()
-        nodes_list = []
-        for node in nodes:
-            nodes_list.append([node.Submodel, node.Id, node.Handle, node])
-        header = ["submodel", "id", "handle", "original_object"]
-        df_nodes = pd.DataFrame(nodes_list, columns=header)
-        return df_nodes
+        sun = _vector3d_to_array(orbit.HrSunVecArray)  # 太陽方向vec
+        planet = _vector3d_to_array(orbit.HrPlanetVecArray)  # 惑星方向vec
+        sun *= _ORBIT_VECTOR_SCALE
+        planet *= _ORBIT_VECTOR_SCALE
+        radiuses = np.fromiter(orbit.HrOrbitRadiusArray, dtype=np.float64)
+        df = pd.DataFrame(
+            np.column_stack([times, sun, planet, radiuses]),
+            columns=ORBIT_COLUMNS,
+        )
+        self._orbit_cache[orbit_name] = df
+        return df.copy()
+
+    def invalidate_orbit_cache(self, orbit_name=None):
+        """get_orbitで保持している軌道データの破棄
+
+        Args:
+            orbit_name (str): 破棄する軌道の名前。Noneの場合は全て破棄する。
+        """
+        if orbit_name is None:
+            self._orbit_cache.clear()
+        else:
+            self._orbit_cache.pop(orbit_name, None)
+
+    def get_nodes(self, columns=None, refresh=False):
+        """ノードの一覧
+
+        一覧はsnapshotに保持し（ノードの索引と共有）、プロパティはcolumnsで指定した列の分だけ取得する。
+
+        Args:
+            columns (list): 取得する列。Noneの場合は全列。
+            refresh (bool): Trueの場合は保持している一覧を使わずに取得し直す。
+        Returns:
+            pandas.core.frame.DataFrame
+        """
+        if refresh:
+            self.invalidate_node_lookup()
+        spec = [
+            ("submodel", lambda n: n.Submodel),
+            ("id", lambda n: n.Id),
+            ("handle", lambda n: n.Handle),
+            ("original_object", lambda n: n),
+        ]
+        return self._get_entities("GetNodes", spec, columns, False)
 
     def get_node(self, submodel, id, printif=False):
-        nodes = self.GetNodes()
-        node = 0
-        for node_i in nodes:
-            if node_i.Submodel.ToString() == submodel and node_i.Id == int(id):
-                node = self.GetNode(node_i.Handle)
-                break
-        if node == 0:
+        node = self.node_lookup.get(submodel, id)
+        if node is None and not self._node_lookup_retried:
+            # 索引作成後に追加されたノードの可能性があるので、作り直して再検索する。
+            # 作り直すのは索引1つにつき1回だけ（見つからないノードが続いてもGetNodes()を繰り返さない）。
+            self.invalidate_node_lookup()
+            node = self.node_lookup.get(submodel, id)
+            self._node_lookup_retried = True
+        if node is None:
             print("MYERROR (in pyopentd.main.get_node): 指定したnodeが見つかりませんでした。")
             return
         if printif:
@@ -252,211 +429,95 @@ class ThermalDesktop(otd.ThermalDesktop):
             print("Id: ", node.Id)
         return node
 
-    # TODO: get_solidsやget_thin_shellsでまとめる関数があるとよさそう。現状抽出してる項目同じなので。
+    def get_geometries(self, types=None, fields=None, refresh=False):
+        """形状（ソリッド・薄板）の一覧を1つの表で取得
 
-    # TODO: 抽出する項目は要検討
-    def get_solid_bricks(self):
-        solid_bricks = self.GetSolidBricks()
-        solid_bricks_list = []
-        for solid_brick in solid_bricks:
-            solid_bricks_list.append(
-                [
-                    solid_brick.StartSubmodel,
-                    solid_brick.CondSubmodel,
-                    solid_brick.NodeNames,
-                    solid_brick.AttachedNodeHandles,
-                    solid_brick.OutsideOpticalProperties,
-                    solid_brick.Handle,
-                    solid_brick.Comment,
-                    solid_brick.XMax,
-                    solid_brick.YMax,
-                    solid_brick.ZMax,
-                    solid_brick,
-                ]
-            )
-        header = [
-            "start_submodel",
-            "cond_submodel",
-            "node_names",
-            "attached_node_handles",
-            "outside_optical_properties",
-            "handle",
-            "comment",
-            "x_max",
-            "y_mMax",
-            "z_mMax",
-            "original_object",
-        ]
-        df_solid_bricks = pd.DataFrame(solid_bricks_list, columns=header)
-        return df_solid_bricks
-
-    # TODO: 抽出する項目は要検討
-    def get_solid_cylinders(self):
-        solid_cylinders = self.GetSolidCylinders()
-        solid_cylinders_list = []
-        for solid_cylinder in solid_cylinders:
-            solid_cylinders_list.append(
-                [
-                    solid_cylinder.StartSubmodel,
-                    solid_cylinder.CondSubmodel,
-                    solid_cylinder.NodeNames,
-                    solid_cylinder.AttachedNodeHandles,
-                    solid_cylinder.OutsideOpticalProperties,
-                    solid_cylinder.Handle,
-                    solid_cylinder.Comment,
-                    solid_cylinder.Height,
-                    solid_cylinder.Rmin,
-                    solid_cylinder.Rmax,
-                    solid_cylinder.StartAngle,
-                    solid_cylinder.EndAngle,
-                    solid_cylinder,
-                ]
-            )
-        header = [
-            "start_submodel",
-            "cond_submodel",
-            "node_names",
-            "attached_node_handles",
-            "outside_optical_properties",
-            "handle",
-            "comment",
-            "height",
-            "r_min",
-            "r_max",
-            "start_angle",
-            "end_angle",
-            "original_object",
-        ]
-        df_solid_cylinders = pd.DataFrame(solid_cylinders_list, columns=header)
-        return df_solid_cylinders
-
-    # TODO: 抽出する項目は要検討
-    def get_rectangles(self):
-        rectangles = self.GetRectangles()
-        rectangles_list = []
-        for rectangle in rectangles:
-            rectangles_list.append(
-                [
-                    rectangle.TopStartSubmodel,
-                    rectangle.BotStartSubmodel,
-                    rectangle.CondSubmodel,
-                    rectangle.TopNodeNames,
-                    rectangle.BotNodeNames,
-                    rectangle._AttachedNodeHandles,
-                    rectangle.TopOpticalProp,
-                    rectangle.BotOpticalProp,
-                    rectangle.Handle,
-                    rectangle.Comment,
-                    rectangle.XMax,
-                    rectangle.YMax,
-                    rectangle.TopThickness,
-                    rectangle.BotThickness,
-                    rectangle,
-                ]
-            )
-        header = [
-            "top_start_submodel",
-            "bot_start_submodel",
-            "cond_submodel",
-            "top_node_names",
-            "bot_node_names",
-            "_attached_node_handles",
-            "top_optical_prop",
-            "bot_optical_prop",
-            "handle",
-            "comment",
-            "x_max",
-            "y_max",
-            "top_thickness",
-            "bot_thickness",
-            "original_object",
+        種類ごとの抽出項目はGEOMETRY_FIELDSで定義する。一覧・プロパティはsnapshotに保持し、
+        fieldsで指定した項目の分だけ取得する（handleだけ必要な場合に光学特性などを読まずに済む）。
+        その種類に無い項目は欠損値になる。
+
+        Args:
+            types (list): 形状の種類（GEOMETRY_TYPESのキー）。Noneの場合は全種類。
+            fields (list): 取得する項目。Noneの場合は全項目と'original_object'。
+            refresh (bool): Trueの場合は保持している一覧を使わずに取得し直す。
+        Returns:
+            pandas.core.frame.DataFrame: 先頭列が'type'（形状の種類）
+        Examples:
+            >>> df = td.get_geometries(fields=["handle", "comment"])
+        """
+        if types is None:
+            types = list(GEOMETRY_TYPES.keys())
+        unknown = [t for t in types if t not in GEOMETRY_TYPES]
+        if unknown != []:
+            print(f"MYERROR (in pyopentd.main.get_geometries): 不明な形状の種類です: {unknown}")
+            return
+        if fields is None:
+            fields = {}
+            for geometry_type in types:
+                fields.update(GEOMETRY_FIELDS[geometry_type])
+            fields = list(fields.keys()) + ["original_object"]
+        frames = []
+        for geometry_type in types:
+            df = self._get_geometry(geometry_type, fields, refresh)
+            if len(df) > 0:
+                df.insert(0, "type", geometry_type)
+                frames.append(df)
+        columns = ["type"] + list(fields)
+        if frames == []:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True).reindex(columns=columns)
+
+    def _get_geometry(self, geometry_type, fields, refresh):
+        """1種類の形状のうち、fieldsのうちその種類にある項目の取得"""
+        method_name, _ = GEOMETRY_TYPES[geometry_type]
+        spec = [
+            (name, attrgetter(prop))
+            for name, prop in GEOMETRY_FIELDS[geometry_type].items()
         ]
-        df_rectangles = pd.DataFrame(rectangles_list, columns=header)
-        return df_rectangles
-
-    # TODO: 抽出する項目は要検討
-    def get_polygons(self):
-        polygons = self.GetPolygons()
-        polygons_list = []
-        for polygon in polygons:
-            polygons_list.append(
-                [
-                    polygon.TopStartSubmodel,
-                    polygon.BotStartSubmodel,
-                    polygon.CondSubmodel,
-                    polygon.TopNodeNames,
-                    polygon.BotNodeNames,
-                    polygon._AttachedNodeHandles,
-                    polygon.TopOpticalProp,
-                    polygon.BotOpticalProp,
-                    polygon.Handle,
-                    polygon.Comment,
-                    polygon.TopThickness,
-                    polygon.BotThickness,
-                    polygon,
-                ]
-            )
-        header = [
-            "top_start_submodel",
-            "bot_start_submodel",
-            "cond_submodel",
-            "top_node_names",
-            "bot_node_names",
-            "_attached_node_handles",
-            "top_optical_prop",
-            "bot_optical_prop",
-            "handle",
-            "comment",
-            "top_thickness",
-            "bot_thickness",
-            "original_object",
+        spec.append(("original_object", lambda s: s))
+        columns = [name for name, _ in spec if name in fields]
+        return self._get_entities(method_name, spec, columns, refresh)
+
+    def get_solids(self, fields=None, refresh=False):
+        """ソリッド（solid_brick, solid_cylinder）の一覧。引数はget_geometriesと同じ。"""
+        types = [t for t, (_, kind) in GEOMETRY_TYPES.items() if kind == "solid"]
+        return self.get_geometries(types, fields, refresh)
+
+    def get_thin_shells(self, fields=None, refresh=False):
+        """薄板（rectangle, polygon, cylinder）の一覧。引数はget_geometriesと同じ。"""
+        types = [
+            t for t, (_, kind) in GEOMETRY_TYPES.items() if kind == "thin_shell"
         ]
-        df_polygons = pd.DataFrame(polygons_list, columns=header)
-        return df_polygons
-
-    # TODO: 抽出する項目は要検討
-    def get_cylinders(self):
-        cylinders = self.GetCylinders()
-        cylinders_list = []
-        for cylinder in cylinders:
-            cylinders_list.append(
-                [
-                    cylinder.TopStartSubmodel,
-                    cylinder.BotStartSubmodel,
-                    cylinder.CondSubmodel,
-                    cylinder.TopNodeNames,
-                    cylinder.BotNodeNames,
-                    cylinder._AttachedNodeHandles,
-                    cylinder.TopOpticalProp,
-                    cylinder.BotOpticalProp,
-                    cylinder.Handle,
-                    cylinder.Comment,
-                    cylinder.Height,
-                    cylinder.Radius,
-                    cylinder.StartAngle,
-                    cylinder.EndAngle,
-                    cylinder,
-                ]
-            )
-        header = [
-            "top_start_submodel",
-            "bot_start_submodel",
-            "cond_submodel",
-            "top_node_names",
-            "bot_node_names",
-            "_attached_node_handles",
-            "top_optical_prop",
-            "bot_optical_prop",
-            "handle",
-            "comment",
-            "height",
-            "radius",
-            "start_angle",
-            "end_angle",
-            "original_object",
-        ]
-        df_cylinders = pd.DataFrame(cylinders_list, columns=header)
-        return df_cylinders
+        return self.get_geometries(types, fields, refresh)
+
+    def get_solid_bricks(self, columns=None, refresh=False):
+        return self._get_geometry_legacy("solid_brick", columns, refresh)
+
+    def get_solid_cylinders(self, columns=None, refresh=False):
+        return self._get_geometry_legacy("solid_cylinder", columns, refresh)
+
+    def get_rectangles(self, columns=None, refresh=False):
+        return self._get_geometry_legacy("rectangle", columns, refresh)
+
+    def get_polygons(self, columns=None, refresh=False):
+        return self._get_geometry_legacy("polygon", columns, refresh)
+
+    def get_cylinders(self, columns=None, refresh=False):
+        return self._get_geometry_legacy("cylinder", columns, refresh)
+
+    def _get_geometry_legacy(self, geometry_type, columns, refresh):
+        """種類ごとのget_*の共通処理（以前の列名のまま、columnsの順に並べて返す）"""
+        legacy_names = _LEGACY_GEOMETRY_COLUMNS.get(geometry_type, {})
+        if columns is None:
+            columns = [
+                legacy_names.get(name, name)
+                for name in GEOMETRY_FIELDS[geometry_type]
+            ]
+            columns.append("original_object")
+        to_field = {v: k for k, v in legacy_names.items()}
+        fields = [to_field.get(c, c) for c in columns]
+        df = self._get_geometry(geometry_type, fields, refresh)
+        return df.rename(columns=legacy_names)[columns]
 
     def create_caseset(
         self,
@@ -532,44 +593,63 @@ class ThermalDesktop(otd.ThermalDesktop):
         enable_exp="",
     ):
         node = self.get_node(apply_node_sub, apply_node_id)  # ノードの取得
+        if transient_type == 0 and value == -1:
+            print(
+                "MYWARNING (in pyopentd.main.create_heatload): ヒートロードのvalueが指定されていません。"
+            )
+        error = self._check_heatload(transient_type, time_array, value_array)
+        if error != "":
+            print(f"MYERROR (in pyopentd.main.create_heatload): {error}")
+        return self._build_heatload(
+            node,
+            submodel,
+            transient_type,
+            value,
+            time_array,
+            value_array,
+            name,
+            layer,
+            enable_exp,
+        )
+
+    @staticmethod
+    def _check_heatload(transient_type, time_array, value_array):
+        if transient_type not in [0, 1]:
+            return "transient_typeが正しくありません。"
+        if transient_type == 1 and len(time_array) != len(value_array):
+            return "time_arrayとvalue_arrayの長さが異なります。"
+        return ""
+
+    def _build_heatload(
+        self,
+        node,
+        submodel,
+        transient_type,
+        value=-1,
+        time_array=[],
+        value_array=[],
+        name="",
+        layer="",
+        enable_exp="",
+    ):
         heatload = self.CreateHeatLoad(otd.Connection(node))  # heatloadの作成
 
         if transient_type == 0:  # constant heatload の作成
             # typeの変更
             heatload.HeatLoadTransientType = 0
             heatload.TimeDependentSteadyStateType = 0
-            if value == -1:
-                print(
-                    "MYWARNING (in pyopentd.main.create_heatload): ヒートロードのvalueが指定されていません。"
-                )
             # valueの変更
             if type(value) == str:
                 heatload.ValueExp.Value = value
             else:
                 heatload.Value = value
         elif transient_type == 1:  # time dependent heatload の作成
-            # チェック
-            if len(time_array) != len(value_array):
-                print(
-                    "MYERROR (in pyopentd.main.create_heatload): time_arrayとvalue_arrayの長さが異なります。"
-                )
             # typeの変更
             heatload.HeatLoadTransientType = 1
             heatload.TimeDependentSteadyStateType = 1
-            # time arrayの変更
-            TimeArray = List[System.String]()
-            for time in time_array:
-                TimeArray.Add(str(time))
-            heatload.TimeArrayExp.expression = TimeArray
-            # value arrayの変更
-            ValueArray = List[System.String]()
-            for val in value_array:
-                ValueArray.Add(str(val))
-            heatload.ValueArrayExp.expression = ValueArray
-        else:
-            print(
-                "MYERROR (in pyopentd.main.create_heatload): transient_typeが正しくありません。"
-            )
+            # time array, value arrayの変更
+            heatload.TimeArrayExp.expression = to_net_list(time_array)
+            heatload.ValueArrayExp.expression = to_net_list(value_array)
 
         heatload.Submodel.Name = submodel  # hwatloadのSubmodelを変更
         if name != "":
@@ -579,9 +659,60 @@ class ThermalDesktop(otd.ThermalDesktop):
         if enable_exp != "":
             heatload.EnabledExp.Value = enable_exp
 
-        heatload.Update()
+        with _span("HeatLoad.Update"):
+            heatload.Update()
+        self.snapshot.refresh("GetHeatLoads")
         return heatload
 
+    def create_heatloads(self, df_heatloads):
+        """複数ヒートロードの一括作成
+
+        ノードの検索は索引（node_lookup）で1回にまとめ、全行を事前にチェックしてから作成する。
+        チェックで問題のあった行、作成に失敗した行は作成せずに結果に記録する。
+
+        Args:
+            df_heatloads (pandas.core.frame.DataFrame): 1行が1ヒートロード。カラム名はcreate_heatloadの引数名と同じ。
+                必須カラムは['submodel', 'apply_node_sub', 'apply_node_id', 'transient_type']。
+        Returns:
+            pandas.core.frame.DataFrame: 入力に'status'（"success"/"failed"）、'error'、'handle'、'original_object'を加えたもの。
+        """
+        required = [
+            "submodel",
+            "apply_node_sub",
+            "apply_node_id",
+            "transient_type",
+        ]
+        optional = [
+            "value",
+            "time_array",
+            "value_array",
+            "name",
+            "layer",
+            "enable_exp",
+        ]
+
+        def check(spec):
+            return self._check_heatload(
+                spec["transient_type"],
+                spec.get("time_array", []),
+                spec.get("value_array", []),
+            )
+
+        def build(nodes, submodel, transient_type, **kwargs):
+            return self._build_heatload(
+                nodes[0], submodel, transient_type, **kwargs
+            )
+
+        return self._create_batch(
+            df_heatloads,
+            [("apply_node_sub", "apply_node_id")],
+            required,
+            optional,
+            check,
+            build,
+            "create_heatloads",
+        )
+
     def create_heater(
         self,
         apply_node_sub,
@@ -603,9 +734,45 @@ class ThermalDesktop(otd.ThermalDesktop):
     ):
         # ヒーターの作成
         apply_node = self.get_node(apply_node_sub, apply_node_id)  # ノードの取得
+        sensor_node = self.get_node(sensor_node_sub, sensor_node_id)  # ノードの取得
+        return self._build_heater(
+            apply_node,
+            sensor_node,
+            value,
+            on_temp,
+            off_temp,
+            name,
+            submodel,
+            enabled_exp,
+            layer,
+            time_list,
+            scale_list,
+        )
+
+    @staticmethod
+    def _check_heater(time_list, scale_list):
+        if (time_list is None) != (scale_list is None):
+            return "time_listとscale_listは両方指定してください。"
+        if time_list is not None and len(time_list) != len(scale_list):
+            return "time_listとscale_listの長さが異なります。"
+        return ""
+
+    def _build_heater(
+        self,
+        apply_node,
+        sensor_node,
+        value,
+        on_temp,
+        off_temp,
+        name="",
+        submodel="MAIN",
+        enabled_exp="",
+        layer=None,
+        time_list=None,
+        scale_list=None,
+    ):
         apply_list = List[otd.Connection]()
         apply_list.Add(otd.Connection(apply_node))
-        sensor_node = self.get_node(sensor_node_sub, sensor_node_id)  # ノードの取得
         sensor_list = List[otd.Connection]()
         sensor_list.Add(otd.Connection(sensor_node))
         heater = self.CreateHeater(apply_list, sensor_list)
@@ -617,7 +784,7 @@ class ThermalDesktop(otd.ThermalDesktop):
         heater.Name = name
         heater.Submodel.Name = submodel
         heater.EnabledExp.Value = enabled_exp
-        if layer != None:
+        if layer is not None:
             heater.Layer = layer
 
         # TODO ss_methodの指定
@@ -625,18 +792,157 @@ class ThermalDesktop(otd.ThermalDesktop):
         heater.SSPowerPer = 0
 
         # times, scalesの指定
-        if time_list != None or scale_list != None:
+        if time_list is not None or scale_list is not None:
             heater.UseTransientScaling = 1
-            times = Dimension.DimensionalList[Dimension.Time](time_list)
-            scales = List[float]()
-            for scale in scale_list:
-                scales.Add(scale)
+            times = Dimension.DimensionalList[Dimension.Time](list(time_list))
+            scales = to_net_list([float(s) for s in scale_list], float)
             heater.Times = times
             heater.Scales = scales
 
-        heater.Update()
+        with _span("Heater.Update"):
+            heater.Update()
+        self.snapshot.refresh("GetHeaters")
         return heater
 
+    def create_heaters(self, df_heaters):
+        """複数ヒーターの一括作成
+
+        ノードの検索は索引（node_lookup）で1回にまとめ、全行を事前にチェックしてから作成する。
+        チェックで問題のあった行、作成に失敗した行は作成せずに結果に記録する。
+
+        Args:
+            df_heaters (pandas.core.frame.DataFrame): 1行が1ヒーター。カラム名はcreate_heaterの引数名と同じ。
+                必須カラムは['apply_node_sub', 'apply_node_id', 'sensor_node_sub', 'sensor_node_id', 'value', 'on_temp', 'off_temp']。
+        Returns:
+            pandas.core.frame.DataFrame: 入力に'status'（"success"/"failed"）、'error'、'handle'、'original_object'を加えたもの。
+        """
+        node_columns = [
+            ("apply_node_sub", "apply_node_id"),
+            ("sensor_node_sub", "sensor_node_id"),
+        ]
+        required = [c for pair in node_columns for c in pair] + [
+            "value",
+            "on_temp",
+            "off_temp",
+        ]
+        optional = [
+            "name",
+            "submodel",
+            "enabled_exp",
+            "layer",
+            "time_list",
+            "scale_list",
+        ]
+
+        def check(spec):
+            return self._check_heater(
+                spec.get("time_list"), spec.get("scale_list")
+            )
+
+        def build(nodes, value, on_temp, off_temp, **kwargs):
+            return self._build_heater(
+                nodes[0], nodes[1], value, on_temp, off_temp, **kwargs
+            )
+
+        return self._create_batch(
+            df_heaters,
+            node_columns,
+            required,
+            optional,
+            check,
+            build,
+            "create_heaters",
+        )
+
+    def _create_batch(
+        self,
+        df_specs,
+        node_columns,
+        required,
+        optional,
+        check,
+        build,
+        method_name,
+    ):
+        """create_heaters、create_heatloadsの共通処理
+
+        1. 必須カラムの確認
+        2. 全行のノードの解決（索引を1回だけ作成）と値のチェック
+        3. チェックを通った行だけ build(nodes, **引数) で作成
+        """
+        missing = [c for c in required if c not in df_specs.columns]
+        if missing != []:
+            print(
+                f"MYERROR (in pyopentd.main.{method_name}): 必須カラム{missing}がありません。"
+            )
+            return
+        node_keys = [c for pair in node_columns for c in pair]
+        lookup = self.node_lookup
+        prepared = []
+        for row in df_specs.to_dict(orient="records"):
+            # 値が無い（NaN）のカラムは指定なしとして扱う
+            spec = {
+                key: val
+                for key, val in row.items()
+                if key in required + optional
+                and (
+                    isinstance(val, (list, tuple, np.ndarray))
+                    or not pd.isna(val)
+                )
+            }
+            errors = []
+            nodes = []
+            for sub_column, id_column in node_columns:
+                node = None
+                if sub_column in spec and id_column in spec:
+                    try:
+                        node = lookup.get(spec[sub_column], spec[id_column])
+                    except (TypeError, ValueError) as e:
+                        # ノード番号が整数でない場合など（その行だけを失敗とする）
+                        errors.append(f"{type(e).__name__}: {e}")
+                        nodes.append(None)
+                        continue
+                if node is None:
+                    errors.append(
+                        f"ノード{row[sub_column]}.{row[id_column]}が見つかりません。"
+                    )
+                nodes.append(node)
+            missing = [c for c in required if c not in spec]
+            if missing != []:
+                errors.append(f"{missing}が指定されていません。")
+            else:
+                try:
+                    error = check(spec)
+                except (TypeError, ValueError) as e:
+                    error = f"{type(e).__name__}: {e}"
+                if error != "":
+                    errors.append(error)
+            kwargs = {k: v for k, v in spec.items() if k not in node_keys}
+            prepared.append((nodes, kwargs, " ".join(errors)))
+
+        results = []
+        for nodes, kwargs, error in prepared:
+            entity = None
+            if error == "":
+                try:
+                    entity = build(nodes, **kwargs)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+            results.append(
+                [
+                    "success" if error == "" else "failed",
+                    error,
+                    None if entity is None else entity.Handle,
+                    entity,
+                ]
+            )
+        df_results = pd.DataFrame(
+            results,
+            columns=["status", "error", "handle", "original_object"],
+            index=df_specs.index,
+        )
+        return pd.concat([df_specs, df_results], axis=1)
+
     def get_symbol_names(self):
         symbols_list = []
         for symbol in self.GetSymbols():
@@ -690,32 +996,60 @@ class ThermalDesktop(otd.ThermalDesktop):
         else:
             symbol = self.CreateSymbol(name, str(value))
             symbol.Group = group
-            symbol.Update()
+            with _span("Symbol.Update"):
+                symbol.Update()
 
     def create_orbit(
-        self, df_orbit, orbit_name="new_orbit", solar_flux=None, albedo=None
+        self,
+        df_orbit,
+        orbit_name="new_orbit",
+        solar_flux=None,
+        albedo=None,
+        chunksize=None,
     ):
         """新規軌道作成
 
+        単位換算とチェックはNumPyで列ごとにまとめて行い、.NETのリストへはAddRangeでまとめて渡す。
+        chunksizeを指定すると、DataFrameからchunksize行ずつNumPy配列に取り出してチェック・変換し、.NETのリストに追加する。
+        そのため、Python側の一時オブジェクト（NumPy配列、Vector3dの配列）はchunksize行分に収まる
+        （.NETのリストは軌道全体を持つ。Vector3dは1点ずつ作成するしかないので、その個数は変わらない）。
+
         Args:
-            df_orbit (pandas.core.frame.DataFrame): 軌道のDataframe(カラムは['time', 'sun_x', 'sun_y', 'sun_z', 'earth_x', 'earth_y', 'earth_z', 'radius'])
+            df_orbit (pandas.core.frame.DataFrame): 軌道のDataframe(カラムは['Times', 'sun_x', 'sun_y', 'sun_z', 'planet_x', 'planet_y', 'planet_z', 'radius'])
             orbit_name (str): 軌道の名前
+            chunksize (int): 1度に変換する行数。Noneの場合は全行をまとめて変換する。
         """
         # カラム名チェック
-        column = [
-            "Times",
-            "sun_x",
-            "sun_y",
-            "sun_z",
-            "planet_x",
-            "planet_y",
-            "planet_z",
-            "radius",
-        ]
+        column = ORBIT_COLUMNS
         if df_orbit.columns.values.tolist() != column:
             print(
                 "MYERROR (in pyopentd.main.create_orbit): DataFrameのカラム名が正しくありません。['Times', 'sun_x', 'sun_y', 'sun_z', 'planet_x', 'planet_y', 'planet_z', 'radius']に変更して下さい。"
             )
+            return
+        n_rows = len(df_orbit)
+        if chunksize is None or chunksize <= 0:
+            chunksize = max(n_rows, 1)
+
+        def iter_chunks():
+            for start in range(0, n_rows, chunksize):
+                yield df_orbit.iloc[start : start + chunksize].to_numpy(
+                    dtype=np.float64
+                )
+
+        # 軌道を作成する前に、全行をチェックする（前のチャンクの最後の時刻と続けて比較する）
+        last_time = -np.inf
+        for chunk in iter_chunks():
+            if not np.isfinite(chunk).all():
+                print(
+                    "MYERROR (in pyopentd.main.create_orbit): DataFrameにNaNまたはinfが含まれています。"
+                )
+                return
+            if (np.diff(np.r_[last_time, chunk[:, 0]]) <= 0).any():
+                print(
+                    "MYERROR (in pyopentd.main.create_orbit): Timesが単調増加になっていません。"
+                )
+                return
+            last_time = chunk[-1, 0]
 
         # 新しい軌道の作成
         orbit = self.CreateOrbit(orbit_name)
@@ -727,26 +1061,17 @@ class ThermalDesktop(otd.ThermalDesktop):
         solar_vector_list = List[otd.Vector3d]()  # Solar Vectorの履歴
         planet_vector_list = List[otd.Vector3d]()  # Vector to Earthの履歴
         radius_list = List[float]()  # radiusの履歴
-        for index, row in df_orbit.iterrows():
-            solar_vector_list.Add(
-                otd.Vector3d(
-                    row["sun_x"] / 1000,
-                    row["sun_y"] / 1000,
-                    row["sun_z"] / 1000,
-                )
+        times = List[float]()  # 時刻の履歴（最後にDimensionalListに変換）
+        for chunk in iter_chunks():
+            solar_vector_list.AddRange(
+                _to_vector3d_array(chunk[:, 1:4] / _ORBIT_VECTOR_SCALE)
             )
-            planet_vector_list.Add(
-                otd.Vector3d(
-                    row["planet_x"] / 1000,
-                    row["planet_y"] / 1000,
-                    row["planet_z"] / 1000,
-                )
+            planet_vector_list.AddRange(
+                _to_vector3d_array(chunk[:, 4:7] / _ORBIT_VECTOR_SCALE)
             )
-            radius_list.Add(row["radius"])
-        time_list = list(df_orbit["Times"].values.astype(float))
-        time_list = otd.Dimension.DimensionalList[otd.Dimension.Time](
-            time_list
-        )
+            radius_list.AddRange(System.Array[float](chunk[:, 7].tolist()))
+            times.AddRange(System.Array[float](chunk[:, 0].tolist()))
+        time_list = otd.Dimension.DimensionalList[otd.Dimension.Time](times)
         # 軌道情報更新
         orbit.HrSunVecArray = solar_vector_list
         orbit.HrPlanetVecArray = planet_vector_list
@@ -756,9 +1081,96 @@ class ThermalDesktop(otd.ThermalDesktop):
             orbit.SolarFluxExp.Value = str(solar_flux)
         if not albedo is None:
             orbit.AlbedoExp.Value = str(albedo)
-        orbit.Update()
+        with _span("Orbit.Update") as record:
+            orbit.Update()
+            record["elements"] += 7 * n_rows
+            record["bytes"] += 7 * n_rows * 8
+        self.invalidate_orbit_cache(orbit_name)
+        self.snapshot.refresh("GetOrbits")
         return orbit
 
+    def delete_orbit(self, orbit_name):
+        """軌道の削除
+
+        Args:
+            orbit_name (str): 軌道の名前
+        """
+        self.DeleteOrbit(orbit_name)
+        self.invalidate_orbit_cache(orbit_name)
+        self.snapshot.refresh("GetOrbits")
+
+
+class SymbolEditor:
+    """SymbolEditor Class
+
+    ケースセットのシンボル（名前・値・コメント）の一括編集用のクラス。Case.edit_symbols()で作成する。
+    名前から位置への辞書を持つので、追加・変更はシンボル数によらず一定時間で行える。
+    変更はcommit()（withブロックを抜けたとき）に、.NETのリストの作り直し1回とUpdate()1回でまとめて反映される。
+
+    """
+
+    def __init__(self, case):
+        self.case = case
+        self.names = list(case.origin.SymbolNames)
+        self.values = list(case.origin.SymbolValues)
+        self.comments = list(case.origin.SymbolComments)
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def clear(self):
+        """全シンボルの削除"""
+        self.names = []
+        self.values = []
+        self.comments = []
+        self._index = {}
+
+    def set(self, name, value, comment=None):
+        """1変数の追加・変更"""
+        index = self._index.get(name)
+        if index is None:
+            self._index[name] = len(self.names)
+            self.names.append(name)
+            self.values.append(str(value))
+            self.comments.append("" if comment is None else comment)
+        else:
+            self.values[index] = str(value)
+            if comment is not None:
+                self.comments[index] = comment
+
+    def update(self, df_symbol):
+        """複数変数の追加・変更
+
+        Args:
+            df_symbol (pandas.core.frame.DataFrame): 'name'と'value'をカラムにもつDataframe。'comment'カラムは任意。
+        """
+        comments = (
+            df_symbol["comment"]
+            if "comment" in df_symbol.columns
+            else [None] * len(df_symbol)
+        )
+        for name, value, comment in zip(
+            df_symbol["name"], df_symbol["value"], comments
+        ):
+            self.set(name, value, comment)
+
+    def commit(self):
+        """変更の反映（.NETのリストの作成とUpdate()を1回ずつ行う）"""
+        with _span("CaseSet.SetSymbols") as record:
+            self.case.origin.SymbolNames = to_net_list(self.names)
+            self.case.origin.SymbolValues = to_net_list(self.values)
+            self.case.origin.SymbolComments = to_net_list(self.comments)
+            record["elements"] += 3 * len(self.names)
+            record["bytes"] += 2 * sum(
+                len(str(text))
+                for text in self.names + self.values + self.comments
+            )
+        self.case.update()
+
 
 class Case:
     """Case Class
@@ -770,6 +1182,7 @@ class Case:
 
     def __init__(self, case):
         self.origin = case
+        self._symbol_editor = None
 
     def update(self):
         self.origin.Update()
@@ -779,6 +1192,19 @@ class Case:
         self.origin.Run()
         return
 
+    async def run_async(self, timeout=None, executor=None):
+        """run()の非同期版
+
+        OpenTDの実行はスレッドプールで行うので、イベントループをブロックしない。
+
+        Args:
+            timeout (float): タイムアウト[s]。超えた場合はasyncio.TimeoutError。
+            executor (concurrent.futures.Executor): Noneの場合はpyopentdのスレッドプール。
+        Examples:
+            >>> await case.run_async(timeout=3600)
+        """
+        return await run_case_async(self, timeout, executor)
+
     def get_orbit_name(self):
         orbit_name = ""
         rad_tasks = self.origin.RadiationTasks
@@ -800,79 +1226,57 @@ class Case:
         df = pd.DataFrame(symbols, columns=["name", "value", "comment"])
         return df
 
+    @contextmanager
+    def edit_symbols(self):
+        """シンボルの一括編集
+
+        withブロックの中で呼んだadd_symbol、update_symbolsは、ブロックを抜けたときに1回の更新（Update()）でまとめて反映される。
+        ブロック内で例外が発生した場合は反映しない。
+
+        Yields:
+            pyopentd.SymbolEditor
+        Examples:
+            >>> with case.edit_symbols():
+            ...     for name, value in symbols.items():
+            ...         case.add_symbol(name, value)
+        """
+        if self._symbol_editor is not None:
+            # 入れ子の場合は外側のブロックでまとめて反映する
+            yield self._symbol_editor
+            return
+        editor = SymbolEditor(self)
+        self._symbol_editor = editor
+        try:
+            yield editor
+        finally:
+            self._symbol_editor = None
+        editor.commit()
+
     def update_symbols(self, td, df_symbol, reset_symbols=False):
         """複数変数の追加・変更
 
-        複数変数の追加・変更用のメソッド。1つの変数ならadd_symbolのほうが引数が分かりやすい（やってることは同じ）。多くの変数を追加するときに、add_symbolだと時間がかかりそうなので、このメソッドを作成。
+        複数変数の追加・変更用のメソッド。1つの変数ならadd_symbolのほうが引数が分かりやすい（やってることは同じ）。
+        edit_symbols()のブロック内で呼んだ場合は、ブロックを抜けたときにまとめて反映される。
 
         Args:
+            td (pyopentd.ThermalDesktop): 互換性のための引数（使用しない）
             df_symbol (pandas.core.frame.DataFrame): 変更したい変数のDataframe('name'と'value'をカラムにもつ)
             reset_symbols (bool): 現在の変数を全てリセットしてから、変数を更新する。
         """
-
-        global_symbol_names_list = td.get_symbol_names()
-
-        if reset_symbols:
-            symbol_name_list = []
-            symbol_value_list = []
-            symbol_comment_list = []
-        else:
-            symbol_name_list = self.origin.SymbolNames
-            symbol_value_list = self.origin.SymbolValues
-            symbol_comment_list = self.origin.SymbolComments
-
-        for index, row in df_symbol.iterrows():
-            if row["name"] in symbol_name_list:
-                index = symbol_name_list.index(row["name"])
-                symbol_value_list[index] = str(row["value"])
-            else:
-                # print("シンボルが見つかりませんでした、追加します。")
-                symbol_name_list.append(row["name"])
-                symbol_value_list.append(str(row["value"]))
-                symbol_comment_list.append("")
-        symbol_names = List[str]()
-        symbol_values = List[str]()
-        symbol_comments = List[str]()
-        for i in range(len(symbol_name_list)):
-            symbol_names.Add(symbol_name_list[i])
-            symbol_values.Add(symbol_value_list[i])
-            symbol_comments.Add(symbol_comment_list[i])
-        # 更新
-        self.origin.SymbolNames = symbol_names
-        self.origin.SymbolValues = symbol_values
-        self.origin.SymbolComments = symbol_comments
-        self.update()
+        with self.edit_symbols() as editor:
+            if reset_symbols:
+                editor.clear()
+            editor.update(df_symbol)
         return
 
     def add_symbol(self, name, value):
         """1変数の追加・変更
 
-        多くの変数を追加・変更する場合はupdate_symbolsの使用を検討してください。
+        多くの変数を追加・変更する場合はupdate_symbolsの使用か、edit_symbols()のブロック内で呼ぶことを検討してください。
 
         """
-        symbol_name_list = self.origin.SymbolNames
-        symbol_value_list = self.origin.SymbolValues
-        symbol_comment_list = self.origin.SymbolComments
-        if name in symbol_name_list:
-            index = symbol_name_list.index(name)
-            symbol_value_list[index] = str(value)
-        else:
-            # print("シンボルが見つかりませんでした、追加します。")
-            symbol_name_list.append(name)
-            symbol_value_list.append(str(value))
-            symbol_comment_list.append("")
-        symbol_names = List[str]()
-        symbol_values = List[str]()
-        symbol_comments = List[str]()
-        for i in range(len(symbol_name_list)):
-            symbol_names.Add(symbol_name_list[i])
-            symbol_values.Add(symbol_value_list[i])
-            symbol_comments.Add(symbol_comment_list[i])
-        # 更新
-        self.origin.SymbolNames = symbol_names
-        self.origin.SymbolValues = symbol_values
-        self.origin.SymbolComments = symbol_comments
-        self.update()
+        with self.edit_symbols() as editor:
+            editor.set(name, value)
         return
 
     def update_orbit(self, orbit_name):  # TODO ここの入力をorbitで対応できるようにする。
@@ -882,11 +1286,30 @@ class Case:
         self.update()
         return
 
+    def set_radiation_tasks(self, rad_tasks):
+        """輻射タスクの置き換え（他のケースセットのRadiationTasksをコピーする場合など）"""
+        self.origin.RadiationTasks = to_net_list(
+            list(rad_tasks), otd.RadiationTaskData
+        )
+        self.update()
+        return
+
     def change_sav_name(self, sav_name):
         self.origin.SindaOptions.SaveFilename = sav_name
         self.update()
         return
 
+    def get_sav_path(self, dwg_path):
+        """実行後の.savファイルのパスの取得
+
+        Args:
+            dwg_path (str): モデル（dwgファイル）のパス。.savファイルはその階層（run directoryを使う場合はその下）に出力される。
+        """
+        directory = os.path.dirname(os.path.abspath(dwg_path))
+        if self.origin.UseUserDirectory:
+            directory = os.path.join(directory, self.origin.UserDirectory)
+        return os.path.join(directory, self.origin.SindaOptions.SaveFilename)
+
     def add_radiation_task(
         self, calc_type, orbit_name="", analysis_group="BASE"
     ):
@@ -935,3 +1358,6 @@ class Case:
             self.origin.RadiationTasks = rad_task_list
         self.update()
         return
+
+
+_patch_if_active(sys.modules[__name__])
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+__all__ = ["interpolate_orbit", "align_orbit", "align_orbits"]
+
+
+def interpolate_orbit(df_orbit, times, period=None):
+    """軌道データを指定した時刻に周期的に線形補間する
+
+    軌道の時間格子は等間隔でなくてもよい。時刻は軌道の周期で折り返してから補間する。
+
+    Args:
+        df_orbit (pandas.core.frame.DataFrame): ThermalDesktop.get_orbitの出力（先頭列が'Times'）
+        times (array-like): 補間する時刻（SaveFile.timesなど）
+        period (float): 軌道周期[s]。Noneの場合は軌道データの最初と最後の時刻の差。
+    Returns:
+        pandas.core.frame.DataFrame: 'Times'以外の軌道のカラムを、timesの各時刻で補間したもの。
+    """
+    xp = df_orbit["Times"].to_numpy(dtype=np.float64)
+    fp = df_orbit.drop(columns="Times").to_numpy(dtype=np.float64)
+    columns = df_orbit.columns.drop("Times")
+    times = np.asarray(times, dtype=np.float64)
+    if len(xp) < 2:
+        return pd.DataFrame(np.repeat(fp, len(times), axis=0), columns=columns)
+    if period is None:
+        period = xp[-1] - xp[0]
+    if xp[-1] - xp[0] < period:
+        # 周期の終わりを最初の点で閉じる
+        xp = np.append(xp, xp[0] + period)
+        fp = np.vstack([fp, fp[:1]])
+    t = xp[0] + np.mod(times - xp[0], period)
+    i = np.clip(np.searchsorted(xp, t, side="right") - 1, 0, len(xp) - 2)
+    rate = ((t - xp[i]) / (xp[i + 1] - xp[i]))[:, np.newaxis]
+    values = (1 - rate) * fp[i] + rate * fp[i + 1]
+    return pd.DataFrame(values, columns=columns)
+
+
+def align_orbit(df_orbit, df_results, case_name=None, period=None):
+    """軌道データと結果の時系列データの結合
+
+    Args:
+        df_orbit (pandas.core.frame.DataFrame): ThermalDesktop.get_orbitの出力
+        df_results (pandas.core.frame.DataFrame or list): SaveFile.get_dataなどの出力（先頭列が'Times'）、またはそのリスト。
+            リストの場合、時刻は最初のDataFrameのものを使う。
+        case_name (str): 指定した場合、先頭に'case'列を追加する。
+        period (float): 軌道周期[s]
+    Returns:
+        pandas.core.frame.DataFrame: ['case', 'Times', 軌道のカラム, 結果のカラム]（sample_output.csvと同じ形式）
+    """
+    if isinstance(df_results, pd.DataFrame):
+        df_results = [df_results]
+    times = df_results[0]["Times"].to_numpy(dtype=np.float64)
+    df_times = pd.DataFrame({"Times": times})
+    df_attitude = interpolate_orbit(df_orbit, times, period)
+    frames = [df_times, df_attitude] + [
+        df.drop(columns="Times", errors="ignore").reset_index(drop=True)
+        for df in df_results
+    ]
+    df = pd.concat(frames, axis=1)
+    if case_name is not None:
+        df.insert(0, "case", case_name)
+    return df
+
+
+def align_orbits(cases, period=None):
+    """複数ケースの軌道データと結果の結合
+
+    Args:
+        cases (dict): ケース名をキー、(df_orbit, df_results)を値とする辞書
+        period (float): 軌道周期[s]。Noneの場合はケースごとの軌道データから求める。
+    Returns:
+        pandas.core.frame.DataFrame: 全ケースを縦に結合したもの。
+    """
+    frames = [
+        align_orbit(df_orbit, df_results, case_name, period)
+        for case_name, (df_orbit, df_results) in cases.items()
+    ]
+    return pd.concat(frames, axis=0, ignore_index=True)
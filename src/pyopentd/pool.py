@@ -0,0 +1,312 @@
+import time
+import itertools
+import threading
+from contextlib import contextmanager
+
+from .runner import connect_thermal_desktop
+
+__all__ = ["SessionPool", "Session"]
+
+
+def check_session(td):
+    """接続が使えるかの確認（SessionPoolのデフォルトのhealth_check）"""
+    try:
+        td.GetCaseSets()
+        return True
+    except Exception:
+        return False
+
+
+def close_session(td):
+    """接続の終了（SessionPoolのデフォルトのclose）。Thermal Desktopを終了する。"""
+    try:
+        td.Quit()
+    except Exception:
+        pass
+
+
+class Session:
+    """Session Class
+
+    SessionPoolが管理する1つの接続。
+
+    Attributes:
+        td: factoryが返した接続（pyopentd.ThermalDesktop）
+        dwg_path (str): 接続先のdwgファイル
+        n_runs (int): これまでに貸し出した回数
+        created_at (float): 作成時刻（time.monotonic）
+        checked_out_at (float): 貸し出した時刻（貸し出し中でなければNone）
+
+    """
+
+    _ids = itertools.count()
+
+    def __init__(self, td, dwg_path):
+        self.id = next(self._ids)
+        self.td = td
+        self.dwg_path = dwg_path
+        self.n_runs = 0
+        self.created_at = time.monotonic()
+        self.checked_out_at = None
+
+
+class SessionPool:
+    """SessionPool Class
+
+    ThermalDesktopの接続（起動に数十秒かかる）を使い回すためのプール。
+    dwgファイルごとに最大size個の接続を持ち、checkout()で貸し出し、checkin()で返してもらう。
+    貸し出す前にhealth_checkで確認し、使えない接続は作り直す。
+    max_runs回貸し出した接続や、lease_timeout[s]を過ぎても返ってこない（リークした）接続は、終了して作り直す。
+
+    factory、health_check、closeを差し替えれば、Thermal Desktop無しでテストできる。
+
+    Args:
+        dwg_paths (str or list): dwgファイルのパス（複数可）
+        size (int): dwgファイルごとの最大接続数
+        factory (callable): factory(dwg_path) -> td。接続の作成。
+        max_runs (int): 1つの接続を貸し出す回数の上限。Noneの場合は無制限。
+        lease_timeout (float): 貸し出してから返ってくるまでの期限[s]。過ぎたものはリークとみなす。Noneの場合は無制限。
+        health_check (callable): health_check(td) -> bool
+        close (callable): close(td)。接続の終了。
+        prefill (bool): Trueの場合、作成時に全ての接続を作っておく。
+
+    Examples:
+        >>> pool = pt.SessionPool("./td_model/sample.dwg", size=2, max_runs=50, prefill=True)
+        >>> with pool.lease() as td:
+        ...     td.get_caseset("Case Set 2", "orbit").run()
+        >>> pool.close()
+
+    """
+
+    def __init__(
+        self,
+        dwg_paths,
+        size=1,
+        factory=connect_thermal_desktop,
+        max_runs=None,
+        lease_timeout=None,
+        health_check=check_session,
+        close=close_session,
+        prefill=False,
+    ):
+        if isinstance(dwg_paths, str):
+            dwg_paths = [dwg_paths]
+        self.dwg_paths = list(dwg_paths)
+        self.size = size
+        self.factory = factory
+        self.max_runs = max_runs
+        self.lease_timeout = lease_timeout
+        self.health_check = health_check
+        self.close_func = close
+        self._idle = {path: [] for path in self.dwg_paths}
+        self._n_open = {path: 0 for path in self.dwg_paths}
+        self._leased = {}
+        self._closed = False
+        self._cond = threading.Condition()
+        self.counts = {
+            "created": 0,
+            "checkouts": 0,
+            "recycled": 0,
+            "leaked": 0,
+            "unhealthy": 0,
+        }
+        if prefill:
+            self.warm_up()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def warm_up(self):
+        """全てのdwgファイルについて、size個まで接続を作っておく。"""
+        for path in self.dwg_paths:
+            while True:
+                with self._cond:
+                    if self._n_open[path] >= self.size:
+                        break
+                    self._n_open[path] += 1
+                session = self._create(path)
+                with self._cond:
+                    self._idle[path].append(session)
+                    self._cond.notify()
+
+    def _create(self, path):
+        """接続の作成（呼ぶ前に_n_openを1つ確保しておく）"""
+        try:
+            td = self.factory(path)
+        except Exception:
+            with self._cond:
+                self._n_open[path] -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.counts["created"] += 1
+        return Session(td, path)
+
+    def _discard(self, session):
+        """接続の終了（呼ぶ前に_n_openから外しておく）"""
+        self.close_func(session.td)
+
+    def _reclaim_leaked(self):
+        """期限を過ぎた貸し出し中の接続を、プールの管理から外す（ロックを持った状態で呼ぶ）"""
+        if self.lease_timeout is None:
+            return []
+        now = time.monotonic()
+        leaked = [
+            session
+            for session in self._leased.values()
+            if now - session.checked_out_at > self.lease_timeout
+        ]
+        for session in leaked:
+            del self._leased[session.id]
+            self._n_open[session.dwg_path] -= 1
+            self.counts["leaked"] += 1
+        return leaked
+
+    def _candidates(self, dwg_path):
+        if dwg_path is None:
+            return self.dwg_paths
+        if dwg_path not in self._idle:
+            raise KeyError(f"{dwg_path}はこのプールのdwgファイルではありません。")
+        return [dwg_path]
+
+    def checkout(self, dwg_path=None, timeout=None):
+        """接続の貸し出し
+
+        空いている接続が無く、上限まで作成済みの場合は、返ってくるまで待つ。
+
+        Args:
+            dwg_path (str): 接続先のdwgファイル。Noneの場合はどれでもよい。
+            timeout (float): 待つ時間の上限[s]。Noneの場合は無制限。
+        Returns:
+            pyopentd.Session: 使い終わったらcheckin()で返す。
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            session, create_path, leaked = None, None, []
+            try:
+                with self._cond:
+                    while True:
+                        if self._closed:
+                            raise RuntimeError("SessionPoolは終了しています。")
+                        leaked += self._reclaim_leaked()
+                        paths = self._candidates(dwg_path)
+                        for path in paths:
+                            if self._idle[path] != []:
+                                session = self._idle[path].pop()
+                                break
+                        if session is None:
+                            for path in paths:
+                                if self._n_open[path] < self.size:
+                                    self._n_open[path] += 1
+                                    create_path = path
+                                    break
+                        if session is not None or create_path is not None:
+                            break
+                        remaining = (
+                            None
+                            if deadline is None
+                            else deadline - time.monotonic()
+                        )
+                        if remaining is not None and remaining <= 0:
+                            raise TimeoutError("空いている接続がありません。")
+                        if self.lease_timeout is not None:
+                            # リークの回収のため、期限の間隔で確認し直す
+                            remaining = min(
+                                remaining or self.lease_timeout,
+                                self.lease_timeout,
+                            )
+                        self._cond.wait(remaining)
+            finally:
+                # 管理から外したリークは、例外（タイムアウトなど）の場合も必ず終了する
+                for leaked_session in leaked:
+                    self._discard(leaked_session)
+            if create_path is not None:
+                session = self._create(create_path)
+            elif not self.health_check(session.td):
+                with self._cond:
+                    self._n_open[session.dwg_path] -= 1
+                    self.counts["unhealthy"] += 1
+                    self._cond.notify()
+                self._discard(session)
+                continue
+            with self._cond:
+                session.checked_out_at = time.monotonic()
+                self._leased[session.id] = session
+                self.counts["checkouts"] += 1
+            return session
+
+    def checkin(self, session, healthy=True):
+        """接続の返却
+
+        Args:
+            session (pyopentd.Session): checkout()で借りた接続
+            healthy (bool): Falseの場合は、接続を終了して作り直す。
+        """
+        with self._cond:
+            if self._leased.pop(session.id, None) is None:
+                # リークとして管理から外した（終了済みの）ものが後から返ってきた
+                recycle = False
+            else:
+                session.n_runs += 1
+                session.checked_out_at = None
+                recycle = (
+                    not healthy
+                    or self._closed
+                    or (self.max_runs is not None and session.n_runs >= self.max_runs)
+                )
+                if recycle:
+                    self._n_open[session.dwg_path] -= 1
+                    self.counts["recycled"] += 1
+                else:
+                    self._idle[session.dwg_path].append(session)
+                self._cond.notify()
+        if recycle:
+            self._discard(session)
+
+    @contextmanager
+    def lease(self, dwg_path=None, timeout=None):
+        """withブロックの間だけ接続を借りる
+
+        ブロック内で例外が発生した場合は、health_checkで確認し、使えなければ作り直す。
+
+        Yields:
+            td: 接続（pyopentd.ThermalDesktop）
+        """
+        session = self.checkout(dwg_path, timeout)
+        try:
+            yield session.td
+        except BaseException:
+            self.checkin(session, healthy=self.health_check(session.td))
+            raise
+        self.checkin(session)
+
+    def close(self):
+        """全ての接続の終了（貸し出し中のものは返ってきたときに終了する）"""
+        with self._cond:
+            self._closed = True
+            sessions = [s for idle in self._idle.values() for s in idle]
+            for path in self.dwg_paths:
+                self._n_open[path] -= len(self._idle[path])
+                self._idle[path] = []
+            self._cond.notify_all()
+        for session in sessions:
+            self._discard(session)
+
+    def get_stats(self):
+        """dwgファイルごとの接続数と、作成・貸し出し・作り直しなどの回数"""
+        with self._cond:
+            stats = dict(self.counts)
+            stats["sessions"] = {
+                path: {
+                    "open": self._n_open[path],
+                    "idle": len(self._idle[path]),
+                    "leased": sum(
+                        s.dwg_path == path for s in self._leased.values()
+                    ),
+                }
+                for path in self.dwg_paths
+            }
+        return stats
@@ -1,20 +1,213 @@
+import re
 import sys
-import clr
+from fnmatch import translate
 import numpy as np
 import pandas as pd
 from argparse import ArgumentParser
 
-sys.path.append(
-    "C:/Windows/Microsoft.NET/assembly/GAC_MSIL/OpenTDv62/v4.0_6.2.0.7__65e6d95ed5c2e178/"
-)
-clr.AddReference("OpenTDv62")
-sys.path.append(
-    "C:/Windows/Microsoft.NET/assembly/GAC_64/OpenTDv62.Results/v4.0_6.2.0.0__b62f614be6a1e14a/"
-)
-clr.AddReference("OpenTDv62.Results")
+from .backend import load_results
+
+load_results()
 
 from System.Collections.Generic import List
 import OpenTDv62 as otd
+import System
+from System.Runtime.InteropServices import Marshal
+
+from .cache import ResultCache
+from .downsample import select_rows, get_windows, aggregate_windows
+from .export import export_savefile
+from .instrument import _span, _patch_if_active
+from .lazy import LazyResult
+
+__all__ = ["SaveFile", "NodeIndex", "get_data_bulk"]
+
+
+def _copy_values(values, out, start=0):
+    """1系列分の値のうちstart行目からの部分をNumPy配列(out)へコピーする
+
+    .NETのdouble配列であればMarshal.Copyでメモリを直接コピーし、要素ごとのPythonオブジェクトを作らない。
+    それ以外（テスト用の代替オブジェクトなど）はarray-likeとして扱う。
+    """
+    if isinstance(values, System.Array):
+        Marshal.Copy(
+            values, start, System.IntPtr(out.ctypes.data), out.shape[0]
+        )
+    else:
+        out[:] = np.asarray(values, dtype=np.float64)[
+            start : start + out.shape[0]
+        ]
+
+
+def _is_temperature(node):
+    """ノード名の接頭辞（"AAA.T1"の"T"）が温度かどうか"""
+    option = re.match(r"[A-Za-z]*", node.rsplit(".", 1)[-1]).group()
+    return option.upper() == "T"
+
+
+def get_data_bulk(savefile, node_list, rows=None):
+    """時系列データ（結果）の一括取得
+
+    SaveFile.get_dataの高速版。GetDataで得た各系列を、あらかじめ確保したfloat64の1ブロックに直接コピーし、
+    温度の単位変換（K→℃）は温度列（接頭辞が"T"のノード）に対してまとめて1回だけ行う。
+    rowsを指定すると、その範囲の行だけをコピーする。
+
+    Args:
+        savefile: GetTimes()とGetData(node_list)を持つオブジェクト（SaveFileまたはその代替）
+        node_list (list): ノードのリスト（"AAA.T1"や"AAA.Q1"の形式）
+        rows (slice): 取得する行の範囲（select_rowsの戻り値など）。Noneの場合は全ての行。
+    Returns:
+        pandas.core.frame.DataFrame: 先頭列が"Times"の時系列データ。
+    Raises:
+        ValueError: GetDataの系列数・長さが、node_list・時刻数と一致しない場合。
+    """
+    node_list = list(node_list)
+    times = savefile.GetTimes().GetValues()
+    n_total = len(times)
+    if rows is None:
+        rows = slice(None)
+    start, stop, step = rows.indices(n_total)
+    if step < 1:
+        raise ValueError(f"rowsのstepは1以上を指定してください: {rows}")
+    n_times = max(stop - start, 0)
+    # 列ごとに連続したメモリになるようFortran順で確保する。
+    block = np.empty(
+        (n_times, len(node_list) + 1), dtype=np.float64, order="F"
+    )
+    _copy_values(times, block[:, 0], start)
+    data_td = savefile.GetData(node_list)
+    if data_td.Count != len(node_list):
+        raise ValueError(
+            f"GetDataの系列数({data_td.Count})がノード数({len(node_list)})と一致しません"
+        )
+    with _span("GetValues") as record:
+        for i in range(data_td.Count):
+            values = data_td[i].GetValues()
+            if len(values) != n_total:
+                raise ValueError(
+                    f"{node_list[i]}の長さ({len(values)})が時刻数({n_total})と一致しません"
+                )
+            _copy_values(values, block[:, i + 1], start)
+        record["elements"] += n_times * data_td.Count
+        record["bytes"] += n_times * data_td.Count * block.itemsize
+    t_columns = [
+        i + 1 for i, node in enumerate(node_list) if _is_temperature(node)
+    ]
+    if t_columns:
+        block[:, t_columns] -= 273.15
+    if step > 1:
+        block = block[::step]
+    return pd.DataFrame(block, columns=["Times"] + node_list, copy=False)
+
+
+class NodeIndex:
+    """NodeIndex Class
+
+    .savファイルのサブモデル・ノードの索引。SaveFile.node_indexで1度だけ作成され、ノード名の一覧取得や絞り込みで共有される。
+    列番号（position）は全ノードを get_node_names() と同じ順に並べたときの位置。
+
+    Args:
+        node_info (dict): サブモデル名をキー、ノードIDのリストを値とする辞書
+
+    """
+
+    def __init__(self, node_info):
+        self.submodels = list(node_info.keys())
+        self.node_ids = {
+            submodel: np.asarray(list(ids), dtype=np.int64)
+            for submodel, ids in node_info.items()
+        }
+        sizes = [len(ids) for ids in self.node_ids.values()]
+        self.submodel_of = np.repeat(
+            np.array(self.submodels, dtype=object), sizes
+        )
+        if self.submodels:
+            self.ids = np.concatenate(list(self.node_ids.values()))
+        else:
+            self.ids = np.array([], dtype=np.int64)
+        self.names = [
+            f"{submodel}.{node_id}"
+            for submodel, node_id in zip(self.submodel_of, self.ids)
+        ]
+        self._positions = {name: i for i, name in enumerate(self.names)}
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        self._submodel_slices = {
+            submodel: slice(offsets[i], offsets[i + 1])
+            for i, submodel in enumerate(self.submodels)
+        }
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _strip_option(name):
+        """ "AAA.T1"を"AAA.1"に変換する。"""
+        submodel, node = name.rsplit(".", 1)
+        return f"{submodel}.{node.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ')}"
+
+    def position(self, name):
+        """ノード名（"AAA.1"または"AAA.T1"）から列番号を取得。無い場合はNone。"""
+        position = self._positions.get(name)
+        if position is None:
+            position = self._positions.get(self._strip_option(name))
+        return position
+
+    def node(self, position):
+        """列番号から(サブモデル名, ノードID)を取得"""
+        return self.submodel_of[position], int(self.ids[position])
+
+    def positions(self, submodels=None, pattern=None, regex=None, option=""):
+        """条件に合うノードの列番号の取得
+
+        Args:
+            submodels (list): サブモデル名のリスト。"PANEL_*"のようなワイルドカードも使用可。
+            pattern (str): ノード名のワイルドカード（例: "PANEL_*.T*"）。optionを付けた名前に対して照合する。
+            regex (str): ノード名の正規表現。optionを付けた名前に対して照合する。
+            option (str): ノード名の接頭辞（"T"や"Q"）
+        Returns:
+            numpy.ndarray: 列番号の配列
+        """
+        if submodels is None:
+            positions = np.arange(len(self.names))
+        else:
+            if isinstance(submodels, str):
+                submodels = [submodels]
+            pattern_sub = re.compile(
+                "|".join(translate(submodel) for submodel in submodels)
+            )
+            positions = np.concatenate(
+                [np.array([], dtype=np.int64)]
+                + [
+                    np.arange(len(self.names))[self._submodel_slices[sub]]
+                    for sub in self.submodels
+                    if pattern_sub.match(sub)
+                ]
+            )
+        matchers = []
+        if pattern is not None:
+            matchers.append(re.compile(translate(pattern)).match)
+        if regex is not None:
+            matchers.append(re.compile(regex).search)
+        if matchers:
+            positions = np.array(
+                [
+                    i
+                    for i in positions
+                    if all(
+                        match(f"{self.submodel_of[i]}.{option}{self.ids[i]}")
+                        for match in matchers
+                    )
+                ],
+                dtype=np.int64,
+            )
+        return positions
+
+    def select(self, submodels=None, pattern=None, regex=None, option=""):
+        """条件に合うノード名のリストの取得（引数はpositionsと同じ）"""
+        return [
+            f"{self.submodel_of[i]}.{option}{self.ids[i]}"
+            for i in self.positions(submodels, pattern, regex, option)
+        ]
 
 
 class SaveFile(otd.Results.Dataset.SaveFile):
@@ -22,11 +215,21 @@ class SaveFile(otd.Results.Dataset.SaveFile):
 
     OpenTDv62.Results.Dataset.SaveFileを継承したクラス。OpenTDv62.Results.Dataset.SaveFileクラスについては、マニュアル(OpenTD 62 Class Reference.chm)を参照。
 
+    Args:
+        sav_path (str): .savファイルのパス
+        cache (bool): Trueの場合、get_dataの結果をParquetのサイドカーファイルにキャッシュし、2回目以降はキャッシュから読み込む。
+        cache_dir (str): キャッシュの保存先。Noneの場合は"<sav_path>.pyopentd_cache"。
+
     """
 
-    def __init__(self, sav_path):
+    def __init__(self, sav_path, cache=False, cache_dir=None):
         super().__init__(sav_path)
+        self.sav_path = sav_path
         self.times = self.GetTimes().GetValues()[:]
+        self._node_index = None
+        self.cache = None
+        if cache:
+            self.cache = ResultCache(sav_path, cache_dir)
 
     def get_submodels(self):
         return self.GetThermalSubmodels()
@@ -34,35 +237,63 @@ class SaveFile(otd.Results.Dataset.SaveFile):
     def get_node_ids(self, submodel_name):
         return self.GetNodeIds(submodel_name)
 
+    @property
+    def node_index(self):
+        """サブモデル・ノードの索引（pyopentd.NodeIndex）。初回アクセス時に1度だけ作成する。"""
+        if self._node_index is None:
+            info = {}
+            for submodel in self.GetThermalSubmodels():
+                node_id_list = self.GetNodeIds(submodel)
+                if len(node_id_list) == 0:
+                    continue
+                info[f"{submodel}"] = node_id_list
+            self._node_index = NodeIndex(info)
+        return self._node_index
+
     def get_node_info(self):
-        info = {}
-        submodel_list = self.GetThermalSubmodels()
-        for i in range(len(submodel_list)):
-            node_id_list = self.GetNodeIds(submodel_list[i])
-            if node_id_list == []:
-                continue
-            info[f"{submodel_list[i]}"] = node_id_list
-        return info
+        return dict(self.node_index.node_ids)
 
     def get_node_names(self, submodel_name="all", option=""):
-        node_names = []
-        submodel_list = self.GetThermalSubmodels()
-        for submodel in submodel_list:
-            node_id_list = self.GetNodeIds(submodel)
-            for node_id in node_id_list:
-                node_names.append(f"{submodel}.{option}{node_id}")
-        return node_names
-
-    def get_data(self, node_list):
+        """ノード名のリストの取得
+
+        Args:
+            submodel_name (str or list): サブモデル名（ワイルドカード可）またはそのリスト。"all"の場合は全サブモデル。
+            option (str): ノード名の接頭辞（"T"や"Q"）
+        """
+        if submodel_name == "all":
+            submodel_name = None
+        return self.node_index.select(submodels=submodel_name, option=option)
+
+    def select_nodes(
+        self, pattern=None, submodels=None, regex=None, option="T"
+    ):
+        """条件に合うノード名のリストの取得
+
+        Args:
+            pattern (str): ノード名のワイルドカード（例: "PANEL_*.T*"）
+            submodels (list): サブモデル名のリスト（ワイルドカード可）
+            regex (str): ノード名の正規表現
+            option (str): ノード名の接頭辞（"T"や"Q"）
+        Examples:
+            >>> df = savefile.get_data(savefile.select_nodes("PANEL_*.T*"))
+        """
+        return self.node_index.select(submodels, pattern, regex, option)
+
+    def get_data(self, node_list, bulk=True):
         """時系列データ（結果）の取得
 
         Args:
             node_list (list): ノードのリスト
+            bulk (bool): Trueの場合はget_data_bulkで一括取得する。Falseの場合は従来の要素ごとの変換を行う。
         Returns:
             pandas.core.frame.DataFrame: 時系列データ。ノードリストの情報に加えて、時間情報も追加されている。
         Note:
             node_listの要素は、"AAA.1"ではなく、"AAA.T1"や"AAA.Q1"という形式で指定する。
         """
+        if self.cache is not None:
+            return self._get_data_cached(node_list)
+        if bulk:
+            return get_data_bulk(self, node_list)
         data_td = self.GetData(node_list)
         data = []
         for i in range(data_td.Count):
@@ -75,6 +306,115 @@ class SaveFile(otd.Results.Dataset.SaveFile):
         df_times = pd.DataFrame(times, columns=["Times"])
         return pd.concat([df_times, df], axis=1)
 
+    def _get_data_cached(self, node_list):
+        """キャッシュに無い列だけを.savファイルから読み込み、キャッシュに追加する。"""
+        node_list = list(node_list)
+        df, missing = self.cache.load(node_list)
+        if missing:
+            df_new = get_data_bulk(self, missing)
+            self.cache.store(df_new)
+            if df is None:
+                df = df_new
+            else:
+                df = pd.concat([df, df_new.drop(columns="Times")], axis=1)
+        return df[["Times"] + node_list]
+
+    def query(
+        self,
+        node_list=None,
+        option="T",
+        pattern=None,
+        submodels=None,
+        time=None,
+        last=None,
+        stride=None,
+        window=None,
+        agg="mean",
+        origin=None,
+        chunk_size=256,
+    ):
+        """時間範囲・間引き・区間ごとの集計を指定した時系列データの取得
+
+        ノードはchunk_size個ずつ読み込み、その都度、時間範囲の切り出し・間引き・集計を行って結果の配列に書き込む。
+        そのため、メモリ使用量は全ノード×全時刻ではなく、返す結果の大きさ程度に収まる。
+
+        Args:
+            node_list (list): ノードのリスト（"AAA.T1"の形式）。Noneの場合はoption、pattern、submodelsで選択する。
+            option (str): ノード名の接頭辞（"T"や"Q"）
+            pattern (str): ノード名のワイルドカード（例: "PANEL_*.T*"）
+            submodels (list): サブモデル名のリスト（ワイルドカード可）
+            time (tuple): (開始時刻, 終了時刻)。どちらもNoneで端を表す。両端を含む。
+            last (float): 最後のlast秒間（例えば最後の1周回）。timeより優先する。
+            stride (int): stride行ごとに1行を残す（間引き）。
+            window (float): 集計する区間の幅[s]（軌道周期や固定の幅）。Noneの場合は集計しない。
+            agg (str or list): 区間ごとの集計方法。"min"、"max"、"mean"、"first"、"last"またはそのリスト。
+            origin (float): 区間の基準時刻。Noneの場合は選択した範囲の最初の時刻。
+            chunk_size (int): .savファイルから一度に読み込むノード数
+        Returns:
+            pandas.core.frame.DataFrame: 先頭列が"Times"の時系列データ。集計した場合の"Times"は区間の開始時刻。
+            aggがリストの場合は、集計方法をキー、DataFrameを値とする辞書。
+        Examples:
+            >>> df = savefile.query(pattern="PANEL_*.T*", last=period)
+            >>> dfs = savefile.query(submodels=["PANEL_*"], window=period, agg=["min", "max"])
+            >>> df_max = dfs["max"]
+        """
+        if node_list is None:
+            node_list = self.select_nodes(pattern, submodels, option=option)
+        node_list = list(node_list)
+        times = np.asarray(self.times, dtype=np.float64)
+        rows = select_rows(times, time, last, stride)
+        times = times[rows]
+        aggs = [agg] if isinstance(agg, str) else list(agg)
+        if window is None:
+            out_times = times
+            out = {None: np.empty((len(times), len(node_list)))}
+        else:
+            starts, out_times = get_windows(times, window, origin)
+            out = {a: np.empty((len(out_times), len(node_list))) for a in aggs}
+        for i in range(0, len(node_list), chunk_size):
+            chunk = node_list[i : i + chunk_size]
+            values = self.get_data(chunk).values[rows, 1:]
+            columns = slice(i, i + len(chunk))
+            if window is None:
+                out[None][:, columns] = values
+            else:
+                for a in aggs:
+                    out[a][:, columns] = aggregate_windows(values, starts, a)
+        frames = {}
+        for a, data in out.items():
+            df = pd.DataFrame(data, columns=node_list)
+            df.insert(0, "Times", out_times)
+            frames[a] = df
+        if window is None or isinstance(agg, str):
+            return next(iter(frames.values()))
+        return frames
+
+    def get_lazy(self, option="T", mmap_path=None, chunk_size=256):
+        """必要な部分だけ読み込む結果オブジェクト（LazyResult）の取得
+
+        Args:
+            option (str): "T"（温度）や"Q"（熱入力）
+            mmap_path (str): メモリマップファイルのパス。Noneの場合は一時ファイル。
+            chunk_size (int): .savファイルから一度に読み込むノード数
+        Returns:
+            pyopentd.LazyResult
+        Examples:
+            >>> lazy = savefile.get_lazy("T")
+            >>> df = lazy.last(orbit_period, submodels=["PANEL_*"])
+        """
+        return LazyResult(self, option, mmap_path, chunk_size)
+
+    def export(self, path, option="T", **kwargs):
+        """結果の圧縮ファイル（Parquet・HDF5）への書き出し
+
+        引数はpyopentd.export_savefileと同じ。全ノード×全時刻の配列をメモリに載せずに、時間方向のチャンクごとに書き出す。
+
+        Examples:
+            >>> savefile.export("./result.parquet", option=["T", "Q"], dtype="float32")
+            >>> savefile.export("./result.h5", pattern="PANEL_*.T*", time=(t_end - period, None))
+        """
+        return export_savefile(self, path, option=option, **kwargs)
+
     def get_all_temperature(self):
         """全ノードの温度データ取得"""
         node_list = self.get_node_names(option="T")
@@ -88,3 +428,6 @@ class SaveFile(otd.Results.Dataset.SaveFile):
         """
         node_list = self.get_node_names(option="Q")
         return self.get_data(node_list)
+
+
+_patch_if_active(sys.modules[__name__])
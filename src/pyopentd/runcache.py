@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+
+__all__ = ["RunCache"]
+
+# キーに含めるケースセットの実行設定（Case.origin）と輻射タスクの項目
+CASE_FIELDS = ["SteadyState", "Transient", "UseRestartFile", "RestartFile"]
+RADIATION_TASK_FIELDS = [
+    "AnalGroup",
+    "TypeCalc",
+    "OrbitName",
+    "RkSubmodel",
+    "HrSubmodel",
+]
+
+
+def _get_case_settings(case):
+    """ケースセット自身の実行設定（定常・過渡、終了時刻、リスタートファイル、輻射タスク）"""
+    origin = case.origin
+    settings = {name: str(getattr(origin, name, "")) for name in CASE_FIELDS}
+    settings["timend"] = str(origin.SindaControl.timendExp.Value)
+    settings["radiation_tasks"] = [
+        {name: str(getattr(task, name, "")) for name in RADIATION_TASK_FIELDS}
+        for task in origin.RadiationTasks
+    ]
+    return settings
+
+
+def _get_live_state(td):
+    """モデルの現在の状態（グローバルシンボルとヒーター・ヒートロード・ノード・形状の一覧）
+
+    dwgファイルに保存していない変更も反映するよう、保持している一覧は使わずにモデルから取得し直す。
+    """
+    frames = {
+        "symbols": td.get_symbols(),
+        "heaters": td.get_heaters(refresh=True),
+        "heatloads": td.get_heatloads(refresh=True),
+        "nodes": td.get_nodes(refresh=True),
+        "geometries": td.get_geometries(refresh=True),
+    }
+    return {
+        name: df.drop(columns="original_object", errors="ignore").to_csv(
+            index=False
+        )
+        for name, df in frames.items()
+    }
+
+
+def _file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class RunCache:
+    """RunCache Class
+
+    同じ入力のケースの実行結果（.savファイル）を再利用するためのキャッシュ。
+    キーは、ケースのシンボル（名前と値）、軌道データ、ケースセットの実行設定（定常・過渡、終了時刻、リスタートファイル、輻射タスク）、
+    create_casesetのオプション、シミュレーションしないサブモデル、モデルの現在の状態（グローバルシンボル、ヒーター・ヒートロード・
+    ノード・形状の一覧）、モデル（dwgファイル）のハッシュから作る。モデルの状態は毎回取得し直すので、保存していない変更も反映される。同じキーの結果があればCase.run()を呼ばずにその.savファイルを返す。
+
+    Args:
+        cache_dir (str): .savファイルを保存するディレクトリ
+        max_bytes (int): キャッシュの合計サイズの上限[byte]。超えた分は最後に使われたのが古いものから削除する。
+        max_age (float): 最後に使われてからの期限[s]。過ぎたものは削除する。
+
+    Examples:
+        >>> run_cache = pt.RunCache("./run_cache", max_bytes=50 * 1024**3)
+        >>> sav_path = run_cache.run(td, case)
+        >>> run_cache.get_stats()
+
+    """
+
+    def __init__(self, cache_dir, max_bytes=None, max_age=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._model_digests = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get_model_digest(self, dwg_path):
+        """モデルファイルのハッシュ（パス・サイズ・更新時刻が同じ間は計算し直さない）"""
+        stat = os.stat(dwg_path)
+        key = (os.path.abspath(dwg_path), stat.st_size, stat.st_mtime_ns)
+        if key not in self._model_digests:
+            self._model_digests[key] = _file_digest(dwg_path)
+        return self._model_digests[key]
+
+    def make_key(self, td, case, caseset_options=None):
+        """ケースの実効的な入力からキーを作成
+
+        Args:
+            td (pyopentd.ThermalDesktop): ケースのあるモデル
+            case (pyopentd.Case): 実行するケース
+            caseset_options (dict): create_casesetに渡したオプション
+        Returns:
+            str: キー（SHA-256）
+        """
+        h = hashlib.sha256()
+        df_symbol = case.get_symbols().sort_values("name")
+        for name, value in zip(df_symbol["name"], df_symbol["value"]):
+            h.update(f"symbol:{name}={value}\n".encode("utf-8"))
+        orbit_name = case.get_orbit_name()
+        if orbit_name != "":
+            h.update(f"orbit:{orbit_name}\n".encode("utf-8"))
+            # 保持している軌道は古い可能性があるので、モデルから取得し直す
+            df_orbit = td.get_orbit(orbit_name, use_cache=False)
+            h.update(df_orbit.to_numpy().tobytes())
+        settings = json.dumps(_get_case_settings(case), sort_keys=True)
+        h.update(f"settings:{settings}\n".encode("utf-8"))
+        options = json.dumps(
+            caseset_options or {}, sort_keys=True, default=str
+        )
+        h.update(f"options:{options}\n".encode("utf-8"))
+        not_built = case.origin.SubmodelsNotBuilt
+        not_built = (
+            [] if not_built is None else sorted(str(s) for s in not_built)
+        )
+        h.update(f"not_built:{not_built}\n".encode("utf-8"))
+        for name, text in _get_live_state(td).items():
+            h.update(f"{name}:{text}\n".encode("utf-8"))
+        h.update(
+            f"model:{self.get_model_digest(td.dwg_path)}\n".encode("utf-8")
+        )
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.sav")
+
+    def get(self, key):
+        """キャッシュされた.savファイルのパスの取得。無い場合はNone。"""
+        self.evict()
+        path = self._path(key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        self.hits += 1
+        os.utime(path)  # 最後に使われた時刻の更新
+        return path
+
+    def put(self, key, sav_path):
+        """.savファイルをキャッシュにコピーし、そのパスを返す。
+
+        コピーした.savファイルは、max_bytesより大きくても削除しない（他のエントリから削除する）。
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        shutil.copyfile(sav_path, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+        return path
+
+    def run(self, td, case, caseset_options=None):
+        """キャッシュを使ったケースの実行
+
+        同じ入力の結果がキャッシュにあればCase.run()を呼ばずにそれを返す。無ければ実行して結果をキャッシュする。
+
+        Returns:
+            str: .savファイル（キャッシュ内）のパス
+        """
+        key = self.make_key(td, case, caseset_options)
+        path = self.get(key)
+        if path is not None:
+            return path
+        case.run()
+        return self.put(key, case.get_sav_path(td.dwg_path))
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".sav"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def evict(self, keep=None):
+        """期限切れ・サイズ超過のエントリの削除
+
+        Args:
+            keep (str): 削除しないエントリのパス（追加したばかりのものなど）
+        """
+        entries = [e for e in self._entries() if e[2] != keep]
+        if self.max_age is not None:
+            now = time.time()
+            for entry in [e for e in entries if now - e[0] > self.max_age]:
+                os.remove(entry[2])
+                entries.remove(entry)
+        if self.max_bytes is not None:
+            total = sum(size for _, size, _ in entries)
+            if keep is not None:
+                total += os.path.getsize(keep)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                os.remove(path)
+                total -= size
+
+    def get_stats(self):
+        """ヒット・ミスの回数とキャッシュの大きさ"""
+        entries = self._entries()
+        n_requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / n_requests if n_requests else 0.0,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
@@ -0,0 +1,176 @@
+import os
+import time
+import shutil
+import tempfile
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+
+__all__ = ["BatchRunner", "connect_thermal_desktop", "run_caseset"]
+
+# ワーカープロセスごとの状態（ThermalDesktopの接続と実行ディレクトリ）
+_worker = {}
+
+
+def connect_thermal_desktop(dwg_path):
+    """ワーカープロセスでのThermalDesktopへの接続（BatchRunnerのデフォルトのconnect）"""
+    from .main import ThermalDesktop
+
+    return ThermalDesktop(dwg_path, visible=False)
+
+
+def run_caseset(td, job):
+    """ケースセットの実行（BatchRunnerのデフォルトのrunner）
+
+    Args:
+        td: connectが返した接続（pyopentd.ThermalDesktop）
+        job (dict): "group_name"と"caseset_name"を持つ辞書。"output_dir"があれば、出力先をそのディレクトリにする。
+    Returns:
+        dict: 結果に追加する情報（.savファイル名"sav_name"とそのパス"sav_path"）
+    """
+    case = td.get_caseset(job["caseset_name"], job["group_name"])
+    if job.get("output_dir"):
+        case.origin.UseUserDirectory = 1
+        case.origin.UserDirectory = job["output_dir"]
+        case.update()
+    case.run()
+    return {
+        "sav_name": case.origin.SindaOptions.SaveFilename,
+        "sav_path": case.get_sav_path(td.dwg_path),
+    }
+
+
+def _init_worker(dwg_path, work_dir, connect, copy_model):
+    run_dir = os.path.join(work_dir, f"worker_{os.getpid()}")
+    if copy_model:
+        model_dir = os.path.dirname(os.path.abspath(dwg_path))
+        shutil.copytree(model_dir, run_dir, dirs_exist_ok=True)
+        dwg_path = os.path.join(run_dir, os.path.basename(dwg_path))
+    else:
+        os.makedirs(run_dir, exist_ok=True)
+    _worker["run_dir"] = run_dir
+    # モデルをコピーしない場合は、同じdwgファイルを開く他のワーカーと出力が混ざらないよう、出力先を実行ディレクトリにする
+    _worker["output_dir"] = None if copy_model else os.path.abspath(run_dir)
+    _worker["td"] = connect(dwg_path)
+
+
+def _run_job(runner, job):
+    start = time.perf_counter()
+    if _worker["output_dir"] is not None:
+        job = {**job, "output_dir": _worker["output_dir"]}
+    try:
+        output = runner(_worker["td"], job)
+        status = "success"
+        error = ""
+    except Exception:
+        output = None
+        status = "failed"
+        error = traceback.format_exc()
+    return {
+        "status": status,
+        "wall_time": time.perf_counter() - start,
+        "error": error,
+        "pid": os.getpid(),
+        "run_dir": _worker["run_dir"],
+        "output": output,
+    }
+
+
+class BatchRunner:
+    """BatchRunner Class
+
+    複数のケースセットを複数のワーカープロセスで並列に実行するクラス。
+    各ワーカーは自分専用のThermalDesktopの接続と実行ディレクトリ（work_dir/worker_<pid>）を持つ。
+    デフォルト（copy_model=False）では、全ワーカーが同じdwgファイルを開き、各ケースの出力先（run directory）を
+    ワーカーの実行ディレクトリにする（runnerにはjob["output_dir"]として渡す）。モデルはコピーしない。
+    copy_model=Trueの場合は、dwgファイルのあるディレクトリごと実行ディレクトリにコピーしてから接続する。
+
+    Note:
+        同じdwgファイルを複数のThermal Desktopで開くと、AutoCADのファイルロックにより2つ目以降は読み取り専用で開かれる。
+        ケースセットの作成・変更はメモリ上のモデルに対して行われるので実行はできるが、runnerでモデルを保存してはいけない。
+        モデルを保存する必要がある場合や、読み取り専用で開けない場合は、copy_model=Trueを使う。
+
+    connectとrunnerを差し替えることで、Linux上で疑似ソルバーを使ってテストすることもできる。
+    どちらもワーカープロセスに渡すので、モジュールのトップレベルで定義された関数である必要がある。
+
+    Args:
+        dwg_path (str): dwgファイルのパス
+        n_workers (int): ワーカープロセス数。Noneの場合はCPU数。
+        work_dir (str): 実行ディレクトリの親ディレクトリ。Noneの場合は一時ディレクトリ。
+        runner (callable): runner(td, job) -> dict。1ケースの実行。
+        connect (callable): connect(dwg_path) -> td。ワーカーごとの接続。
+        copy_model (bool): モデルのディレクトリをワーカーごとにコピーするかどうか（デフォルトはコピーしない）
+
+    Examples:
+        >>> runner = pt.BatchRunner("./td_model/sample.dwg", n_workers=4)
+        >>> df_result = runner.run(td.get_casesets())
+
+    """
+
+    def __init__(
+        self,
+        dwg_path,
+        n_workers=None,
+        work_dir=None,
+        runner=run_caseset,
+        connect=connect_thermal_desktop,
+        copy_model=False,
+    ):
+        self.dwg_path = dwg_path
+        self.n_workers = n_workers or os.cpu_count()
+        if work_dir is None:
+            work_dir = tempfile.mkdtemp(prefix="pyopentd_runs_")
+        self.work_dir = work_dir
+        self.runner = runner
+        self.connect = connect
+        self.copy_model = copy_model
+
+    @staticmethod
+    def _to_jobs(jobs):
+        """get_casesets()のDataFrameまたは辞書のリストをジョブのリストに変換する。"""
+        if isinstance(jobs, pd.DataFrame):
+            jobs = jobs.drop(columns="original_object", errors="ignore")
+            return jobs.to_dict(orient="records")
+        return [dict(job) for job in jobs]
+
+    def run(self, jobs, callback=None):
+        """ケースセットの並列実行
+
+        Args:
+            jobs (pandas.core.frame.DataFrame or list): get_casesets()の出力、またはジョブ（dict）のリスト
+            callback (callable): 1ケース終わるごとにcallback(result)を呼ぶ。
+        Returns:
+            pandas.core.frame.DataFrame: ジョブの内容に、終了状態（status）、実行時間（wall_time）、エラー内容（error）などを加えたもの。
+        """
+        jobs = self._to_jobs(jobs)
+        os.makedirs(self.work_dir, exist_ok=True)
+        results = [None] * len(jobs)
+        with ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            initializer=_init_worker,
+            initargs=(
+                self.dwg_path,
+                self.work_dir,
+                self.connect,
+                self.copy_model,
+            ),
+        ) as executor:
+            futures = {
+                executor.submit(_run_job, self.runner, job): i
+                for i, job in enumerate(jobs)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    result = future.result()
+                except Exception:
+                    # ワーカーの初期化（接続）に失敗した場合など
+                    result = {
+                        "status": "failed",
+                        "wall_time": None,
+                        "error": traceback.format_exc(),
+                    }
+                results[i] = {**jobs[i], **result}
+                if callback is not None:
+                    callback(results[i])
+        return pd.DataFrame(results)
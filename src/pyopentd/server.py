@@ -0,0 +1,629 @@
+import io
+import os
+import hmac
+import json
+import time
+import uuid
+import shutil
+import tempfile
+import ipaddress
+import threading
+import urllib.request
+import urllib.error
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from .pool import SessionPool
+from .sweep import run_sweep_point
+
+__all__ = ["JobServer", "JobClient"]
+
+
+# クライアントが指定できるジョブの項目（point_id、groupなどはサーバー側で決める）
+JOB_KEYS = [
+    "caseset_options",
+    "symbols",
+    "orbit",
+    "orbit_name",
+    "base",
+    "pattern",
+    "option",
+]
+
+# caseset_optionsで指定できるcreate_casesetの引数（run_dir、restart_fileなど、サーバー上のパスを指定するものは不可）
+CASESET_OPTION_KEYS = ["steady", "transient", "time_end", "sumodels_not_built"]
+
+
+def encode_result(df, dtype="float32", file=None):
+    """結果のDataFrame（先頭列が"Times"）をバイナリ（圧縮したnpz）に変換する
+
+    Args:
+        df (pandas.core.frame.DataFrame): 先頭列が"Times"の時系列データ
+        dtype (str): ノードの値の型。"float32"にするとサイズが半分になる（時刻は常にfloat64）。
+        file (str or file): 書き込み先。Noneの場合はbytesを返す。
+    Returns:
+        bytes: fileがNoneの場合
+    """
+    buffer = io.BytesIO() if file is None else file
+    np.savez_compressed(
+        buffer,
+        times=df["Times"].to_numpy(dtype=np.float64),
+        values=df.iloc[:, 1:].to_numpy(dtype=dtype),
+        nodes=np.array(df.columns[1:], dtype=str),
+    )
+    if file is None:
+        return buffer.getvalue()
+
+
+def decode_result(data):
+    """encode_resultの逆変換（dataはbytes、ファイルのパス、またはファイルオブジェクト）"""
+    if isinstance(data, bytes):
+        data = io.BytesIO(data)
+    with np.load(data) as npz:
+        df = pd.DataFrame(npz["values"], columns=npz["nodes"].tolist())
+        df.insert(0, "Times", npz["times"])
+    return df
+
+
+def run_job(td, job):
+    """1ジョブの実行（JobServerのデフォルトのrunner）
+
+    軌道データ（job["orbit"]）があれば"<point_id>"という名前で軌道を作成してから、run_sweep_pointと同じ手順で実行する。
+    出力はjob["output_dir"]（サーバーが決めるジョブごとのディレクトリ）に書き出す。
+    作成したケースセット・軌道、.savファイルと出力のディレクトリは、結果を読み込んだ後（失敗した場合も）削除する。
+    """
+    os.makedirs(job["output_dir"], exist_ok=True)
+    orbit_name = None
+    if job.get("orbit") is not None:
+        df_orbit = pd.DataFrame(**job["orbit"])
+        orbit_name = job["point_id"]
+        if td.create_orbit(df_orbit, orbit_name) is None:
+            raise ValueError("軌道データが正しくありません。")
+        job = {**job, "orbit_name": orbit_name}
+    try:
+        return run_sweep_point(td, job)
+    finally:
+        if td.GetCaseSet(job["point_id"], job["group"]):
+            case = td.get_caseset(job["point_id"], job["group"])
+            sav_path = case.get_sav_path(td.dwg_path)
+            if os.path.exists(sav_path):
+                os.remove(sav_path)
+            td.DeleteCaseSet(job["point_id"], job["group"])
+        if orbit_name is not None:
+            td.delete_orbit(orbit_name)
+        shutil.rmtree(job["output_dir"], ignore_errors=True)
+
+
+def is_loopback(host):
+    """hostがループバック（同じマシンからしか接続できない）アドレスかどうか"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class Job:
+    """JobServerのジョブ（1ケース）"""
+
+    def __init__(self, spec, priority=0, client="", seq=0):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.spec = spec
+        self.priority = priority
+        self.client = client
+        self.seq = seq
+        self.status = "queued"
+        self.error = ""
+        self.result_path = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "priority": self.priority,
+            "client": self.client,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class JobServer:
+    """JobServer Class
+
+    ケースの実行を受け付けるHTTPサーバー。ThermalDesktopの接続はSessionPoolで使い回す。
+    ジョブは優先度（priorityの大きい順、同じなら受付順）で実行し、同時実行数は全体（max_concurrent）と
+    クライアントごと（max_per_client）に制限できる。結果はencode_resultの形式（圧縮したnpz）でwork_dirに保存し、
+    ファイルから少しずつ返す（サーバーのメモリには持たない）。ジョブの出力（.savファイルなど）は
+    work_dirの下のジョブごとのディレクトリに書き出し、結果を読み込んだら削除する。
+
+    tokenを指定した場合、全てのリクエストに"Authorization: Bearer <token>"ヘッダーが必要（無い場合は401）。
+    ループバック以外のアドレス（"0.0.0.0"など）で待ち受ける場合はtokenの指定が必須。
+
+    API:
+        POST /jobs                ジョブの投入。JSONで、caseset_options、symbols、orbit（DataFrameのto_dict(orient="split")）、
+                                  orbit_name、base、pattern、option、priority、clientを指定する（それ以外の項目は400）。
+                                  caseset_optionsの項目はCASESET_OPTION_KEYSのいずれか。
+                                  clientを省略した場合は接続元のアドレスをクライアント名とする。{"job_id": ...}を返す。
+        GET /jobs                 全ジョブの状態
+        GET /jobs/<id>            ジョブの状態（queued, running, success, failed, cancelled）
+        GET /jobs/<id>/result     結果（application/octet-stream）。終わっていなければ409。
+        DELETE /jobs/<id>         待機中のジョブの取り消し
+
+    Args:
+        pool (pyopentd.SessionPool): 接続のプール
+        runner (callable): runner(td, job) -> {"result": DataFrame}。job["output_dir"]に出力し、実行後に削除する。
+        host (str): 待ち受けるアドレス
+        port (int): 待ち受けるポート（0の場合は空いているポート）
+        max_concurrent (int): 同時実行数。Noneの場合はプールの接続数の合計。
+        max_per_client (int): クライアントごとの同時実行数。Noneの場合は無制限。
+        dtype (str): 結果の値の型
+        max_finished (int): 保持する終了済みジョブ（と結果）の数。超えた分は古いものから削除する。
+        work_dir (str): 結果とジョブの出力を置くディレクトリ。Noneの場合は一時ディレクトリ（shutdownで削除する）。
+        token (str): クライアントと共有するトークン。Noneの場合は認証しない（ループバックのみ）。
+
+    Examples:
+        >>> pool = pt.SessionPool("./td_model/sample.dwg", size=2, prefill=True)
+        >>> server = pt.JobServer(pool, host="0.0.0.0", port=8000, max_per_client=1, token=token)
+        >>> server.serve_forever()
+
+        Thermal Desktopの無い環境では、benchmarks/fake_opentd.pyをinstall()してから同じように起動できる。
+
+    """
+
+    def __init__(
+        self,
+        pool,
+        runner=run_job,
+        host="127.0.0.1",
+        port=8000,
+        max_concurrent=None,
+        max_per_client=None,
+        dtype="float32",
+        max_finished=1000,
+        work_dir=None,
+        token=None,
+    ):
+        if token is None and not is_loopback(host):
+            raise ValueError(
+                f"ループバック以外のアドレス（{host}）で待ち受ける場合はtokenを指定してください。"
+            )
+        self.pool = pool
+        self.runner = runner
+        if max_concurrent is None:
+            max_concurrent = pool.size * len(pool.dwg_paths)
+        self.max_concurrent = max_concurrent
+        self.max_per_client = max_per_client
+        self.dtype = dtype
+        self.max_finished = max_finished
+        self.token = token
+        self._own_work_dir = work_dir is None
+        if work_dir is None:
+            work_dir = tempfile.mkdtemp(prefix="pyopentd_server_")
+        os.makedirs(work_dir, exist_ok=True)
+        self.work_dir = work_dir
+        self.jobs = {}
+        self._finished = []
+        self._queue = []
+        self._running = {}
+        self._seq = 0
+        self._stopped = False
+        self._serving = False
+        self._cond = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._work, daemon=True)
+            for _ in range(max_concurrent)
+        ]
+        for worker in self._workers:
+            worker.start()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.job_server = self
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def submit(self, spec, priority=0, client=""):
+        """ジョブの投入（HTTPを経由しない場合）
+
+        Args:
+            spec (dict): ジョブの内容。キーはJOB_KEYSのいずれか。
+        Returns:
+            str: ジョブのID
+        """
+        if not isinstance(spec, dict):
+            raise ValueError("ジョブの内容は辞書で指定してください。")
+        unknown = set(spec) - set(JOB_KEYS)
+        if unknown:
+            raise ValueError(f"指定できない項目があります: {sorted(unknown)}")
+        options = spec.get("caseset_options", {})
+        if not isinstance(options, dict):
+            raise ValueError("caseset_optionsは辞書で指定してください。")
+        unknown = set(options) - set(CASESET_OPTION_KEYS)
+        if unknown:
+            raise ValueError(
+                f"caseset_optionsに指定できない項目があります: {sorted(unknown)}"
+            )
+        with self._cond:
+            self._seq += 1
+            job = Job(spec, priority, client, self._seq)
+            job.spec = {
+                "caseset_options": {},
+                "base": None,
+                "symbols": {},
+                "orbit": None,
+                "orbit_name": None,
+                "pattern": None,
+                "option": "T",
+                **spec,
+                "point_id": f"job_{job.job_id}",
+                "group": "server",
+                "output_dir": os.path.join(self.work_dir, f"job_{job.job_id}"),
+            }
+            if job.spec["base"] is not None:
+                job.spec["base"] = tuple(job.spec["base"])
+            self.jobs[job.job_id] = job
+            self._queue.append(job)
+            self._cond.notify_all()
+        return job.job_id
+
+    def cancel(self, job_id):
+        """待機中のジョブの取り消し。取り消せた場合はTrue。"""
+        with self._cond:
+            job = self.jobs[job_id]
+            if job.status != "queued":
+                return False
+            self._queue.remove(job)
+            job.status = "cancelled"
+            self._finish(job)
+            return True
+
+    def _finish(self, job):
+        """終了したジョブの記録。max_finishedを超えた古いジョブは削除する（ロックを持った状態で呼ぶ）"""
+        job.finished_at = time.time()
+        self._finished.append(job.job_id)
+        while len(self._finished) > self.max_finished:
+            old = self.jobs.pop(self._finished.pop(0), None)
+            if old is not None and old.result_path is not None:
+                _remove(old.result_path)
+
+    def _next_job(self):
+        """実行できるジョブのうち、優先度の最も高いもの（ロックを持った状態で呼ぶ）"""
+        candidates = [
+            job
+            for job in self._queue
+            if self.max_per_client is None
+            or self._running.get(job.client, 0) < self.max_per_client
+        ]
+        if candidates == []:
+            return None
+        job = min(candidates, key=lambda job: (-job.priority, job.seq))
+        self._queue.remove(job)
+        return job
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = None
+                while not self._stopped:
+                    job = self._next_job()
+                    if job is not None:
+                        break
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                job.status = "running"
+                job.started_at = time.time()
+                self._running[job.client] = self._running.get(job.client, 0) + 1
+            try:
+                with self.pool.lease() as td:
+                    output = self.runner(td, job.spec)
+                result_path = os.path.join(self.work_dir, f"{job.job_id}.npz")
+                encode_result(output["result"], self.dtype, result_path)
+                job.result_path = result_path
+                job.status = "success"
+            except Exception as e:
+                job.error = repr(e)
+                job.status = "failed"
+            with self._cond:
+                self._finish(job)
+                self._running[job.client] -= 1
+                self._cond.notify_all()
+
+    def start(self):
+        """別スレッドでの待ち受けの開始"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def serve_forever(self):
+        self._serving = True
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self._serving = False
+
+    def shutdown(self):
+        """待ち受けの終了（実行中のジョブは最後まで実行する）"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._serving:
+            self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._own_work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        body = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_file(self, path):
+        """ファイルを少しずつ送る（結果全体をメモリに載せない）"""
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return self._send(404, {"error": "result not found"})
+        with f:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+            self.end_headers()
+            shutil.copyfileobj(f, self.wfile, 1 << 20)
+
+    def _authorized(self):
+        """tokenの確認。一致しない場合は401を返してFalse。"""
+        token = self.server.job_server.token
+        if token is None:
+            return True
+        header = self.headers.get("Authorization", "")
+        if hmac.compare_digest(header.encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+            return True
+        self._send(401, {"error": "unauthorized"})
+        return False
+
+    def _get_job(self, job_id):
+        job = self.server.job_server.jobs.get(job_id)
+        if job is None:
+            self._send(404, {"error": f"job {job_id} not found"})
+        return job
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self.path.rstrip("/") != "/jobs":
+            return self._send(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            spec = json.loads(self.rfile.read(length))
+            if not isinstance(spec, dict):
+                raise ValueError("body must be a JSON object")
+            priority = int(spec.pop("priority", 0))
+            client = str(spec.pop("client", self.client_address[0]))
+            job_id = self.server.job_server.submit(spec, priority, client)
+        except (ValueError, TypeError) as e:
+            return self._send(400, {"error": repr(e)})
+        self._send(201, {"job_id": job_id})
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        parts = self.path.strip("/").split("/")
+        server = self.server.job_server
+        if parts == ["jobs"]:
+            with server._cond:
+                jobs = [job.to_dict() for job in server.jobs.values()]
+            return self._send(200, jobs)
+        if len(parts) < 2 or parts[0] != "jobs":
+            return self._send(404, {"error": "not found"})
+        job = self._get_job(parts[1])
+        if job is None:
+            return
+        if len(parts) == 2:
+            return self._send(200, job.to_dict())
+        if parts[2] == "result":
+            if job.status != "success":
+                return self._send(409, job.to_dict())
+            return self._send_file(job.result_path)
+        self._send(404, {"error": "not found"})
+
+    def do_DELETE(self):
+        if not self._authorized():
+            return
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "jobs":
+            return self._send(404, {"error": "not found"})
+        job = self._get_job(parts[1])
+        if job is None:
+            return
+        cancelled = self.server.job_server.cancel(job.job_id)
+        self._send(200 if cancelled else 409, job.to_dict())
+
+
+class JobClient:
+    """JobClient Class
+
+    JobServerのクライアント。
+
+    Args:
+        url (str): サーバーのURL（例: "http://solver-box:8000"）
+        client (str): クライアント名（クライアントごとの同時実行数の制限に使う）。空の場合はサーバー側で接続元のアドレスを使う。
+        token (str): サーバーのtoken
+
+    Examples:
+        >>> client = pt.JobClient("http://solver-box:8000", client="laptop", token=token)
+        >>> job_id = client.submit({"steady": 0, "transient": 1, "time_end": 54000},
+        ...                        symbols={"HTR_POWER": 2}, orbit=df_orbit, base=("Case Set 2", "orbit"))
+        >>> df = client.result(job_id)
+
+    """
+
+    def __init__(self, url, client="", token=None):
+        self.url = url.rstrip("/")
+        self.client = client
+        self.token = token
+
+    def _open(self, method, path, body=None):
+        data = None if body is None else json.dumps(body).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.token is not None:
+            headers["Authorization"] = f"Bearer {self.token}"
+        request = urllib.request.Request(
+            self.url + path, data=data, method=method, headers=headers
+        )
+        return urllib.request.urlopen(request)
+
+    def _request(self, method, path, body=None):
+        with self._open(method, path, body) as response:
+            return json.loads(response.read())
+
+    def submit(
+        self,
+        caseset_options,
+        symbols=None,
+        orbit=None,
+        orbit_name=None,
+        base=None,
+        pattern=None,
+        option="T",
+        priority=0,
+    ):
+        """ジョブの投入
+
+        Args:
+            caseset_options (dict): create_casesetの引数（steady, transient, time_endなど）
+            symbols (dict): シンボル名と値
+            orbit (pandas.core.frame.DataFrame): 軌道データ（create_orbitと同じ形式）
+            orbit_name (str): 使う軌道の名前（orbitを指定した場合は無視し、ジョブ用に作成した軌道を使う）
+            base (tuple): シンボルと輻射タスクを引き継ぐケースセットの(caseset_name, group_name)
+            pattern (str): 結果として返すノード名のワイルドカード
+            option (str): 結果として返すノード名の接頭辞（"T"や"Q"）
+            priority (int): 優先度（大きいほど先に実行）
+        Returns:
+            str: ジョブのID
+        """
+        body = {
+            "caseset_options": caseset_options,
+            "symbols": symbols or {},
+            "orbit": None if orbit is None else orbit.to_dict(orient="split"),
+            "orbit_name": orbit_name,
+            "base": base,
+            "pattern": pattern,
+            "option": option,
+            "priority": priority,
+        }
+        if self.client:
+            body["client"] = self.client
+        if body["orbit"] is not None:
+            del body["orbit"]["index"]
+        return self._request("POST", "/jobs", body)["job_id"]
+
+    def status(self, job_id=None):
+        """ジョブの状態（job_idがNoneの場合は全ジョブのDataFrame）"""
+        if job_id is None:
+            return pd.DataFrame(self._request("GET", "/jobs"))
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def cancel(self, job_id):
+        """待機中のジョブの取り消し。取り消せた場合はTrue。"""
+        try:
+            self._request("DELETE", f"/jobs/{job_id}")
+            return True
+        except urllib.error.HTTPError as e:
+            if e.code == 409:
+                return False
+            raise
+
+    def result(self, job_id, wait=True, poll_interval=5.0, timeout=None):
+        """結果の取得
+
+        Args:
+            wait (bool): Trueの場合は終わるまで待つ。Falseの場合、終わっていなければNone。
+            poll_interval (float): 状態を確認する周期[s]
+            timeout (float): 待つ時間の上限[s]
+        Returns:
+            pandas.core.frame.DataFrame: 先頭列が"Times"の時系列データ
+        """
+        start = time.monotonic()
+        while True:
+            status = self.status(job_id)
+            if status["status"] == "success":
+                # 結果は一時ファイルに少しずつ受け取ってから読み込む
+                with self._open("GET", f"/jobs/{job_id}/result") as response:
+                    with tempfile.TemporaryFile() as f:
+                        shutil.copyfileobj(response, f, 1 << 20)
+                        f.seek(0)
+                        return decode_result(f)
+            if status["status"] in ["failed", "cancelled"]:
+                raise RuntimeError(f"job {job_id} {status['status']}: {status['error']}")
+            if not wait:
+                return None
+            if timeout is not None and time.monotonic() - start > timeout:
+                raise TimeoutError(f"job {job_id} is {status['status']}")
+            time.sleep(poll_interval)
+
+
+def main(argv=None):
+    parser = ArgumentParser(description="pyopentdのジョブサーバー")
+    parser.add_argument("dwg_paths", nargs="+")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--sessions", type=int, default=1, help="dwgファイルごとの接続数")
+    parser.add_argument("--max-runs", type=int, default=None)
+    parser.add_argument("--max-per-client", type=int, default=None)
+    parser.add_argument("--work-dir", default=None, help="結果とジョブの出力を置くディレクトリ")
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("PYOPENTD_SERVER_TOKEN"),
+        help="クライアントと共有するトークン（環境変数PYOPENTD_SERVER_TOKENでも指定可）。ループバック以外で待ち受ける場合は必須。",
+    )
+    args = parser.parse_args(argv)
+    if args.token is None and not is_loopback(args.host):
+        parser.error(f"--host {args.host} で待ち受ける場合は--tokenを指定してください。")
+
+    pool = SessionPool(
+        args.dwg_paths, size=args.sessions, max_runs=args.max_runs, prefill=True
+    )
+    server = JobServer(
+        pool,
+        host=args.host,
+        port=args.port,
+        max_per_client=args.max_per_client,
+        work_dir=args.work_dir,
+        token=args.token,
+    )
+    print(f"listening on {server.url}")
+    try:
+        server.serve_forever()
+    finally:
+        server.shutdown()
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+from operator import attrgetter
+import pandas as pd
+
+__all__ = ["ModelSnapshot", "EntityTable"]
+
+
+class EntityTable:
+    """EntityTable Class
+
+    モデル中の1種類のエンティティ（ノード、ヒーターなど）の一覧。
+    一覧の取得（GetNodes()など）は最初に必要になったときに1回だけ行い、各プロパティも列ごとに必要になったときに1回だけ取得する。
+
+    Args:
+        fetch (callable): エンティティのリストを返す関数（ThermalDesktop.GetNodesなど）
+
+    """
+
+    def __init__(self, fetch):
+        self._fetch = fetch
+        self._objects = None
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.objects)
+
+    @property
+    def objects(self):
+        """エンティティのリスト"""
+        if self._objects is None:
+            self._objects = list(self._fetch())
+        return self._objects
+
+    def column(self, name, getter=None):
+        """1列分のプロパティの取得
+
+        Args:
+            name (str): 列の名前（キャッシュのキー）
+            getter (callable): getter(entity) -> 値。Noneの場合はnameと同じ名前の属性。
+        Returns:
+            list: 各エンティティの値
+        """
+        if name not in self._columns:
+            if getter is None:
+                getter = attrgetter(name)
+            self._columns[name] = [getter(obj) for obj in self.objects]
+        return self._columns[name]
+
+    def to_frame(self, spec, columns=None):
+        """DataFrameの作成
+
+        Args:
+            spec (list): (列名, getter)のリスト
+            columns (list): 作成する列名のリスト。Noneの場合はspecの全列。指定しない列のプロパティは取得しない。
+        Returns:
+            pandas.core.frame.DataFrame
+        """
+        getters = dict(spec)
+        if columns is None:
+            columns = [name for name, _ in spec]
+        data = {name: self.column(name, getters[name]) for name in columns}
+        return pd.DataFrame(data, columns=columns)
+
+    def invalidate(self):
+        """保持している一覧とプロパティの破棄（次回アクセス時に取得し直す）"""
+        self._objects = None
+        self._columns = {}
+
+
+class ModelSnapshot:
+    """ModelSnapshot Class
+
+    モデルの一覧（インベントリ）のスナップショット。ThermalDesktop.snapshotとして使う。
+    エンティティの種類（OpenTDの一覧取得メソッド名、"GetNodes"など）ごとにEntityTableを持ち、
+    pyopentdのcreate系メソッドは対応する種類を自動で破棄する。pyopentdを経由せずにモデルを変更した場合はrefresh()を呼ぶ。
+
+    Args:
+        td (pyopentd.ThermalDesktop): 対象のモデル
+
+    Examples:
+        >>> handles = td.snapshot["GetHeaters"].column("Handle")
+        >>> td.snapshot.refresh("GetHeaters")
+
+    """
+
+    def __init__(self, td):
+        self.td = td
+        self._tables = {}
+
+    def __getitem__(self, method_name):
+        if method_name not in self._tables:
+            self._tables[method_name] = EntityTable(
+                getattr(self.td, method_name)
+            )
+        return self._tables[method_name]
+
+    def refresh(self, *method_names):
+        """指定した種類（省略した場合は全種類）の破棄"""
+        if method_names == ():
+            method_names = list(self._tables.keys())
+        for method_name in method_names:
+            if method_name in self._tables:
+                self._tables[method_name].invalidate()
@@ -0,0 +1,184 @@
+import os
+import time
+import threading
+
+__all__ = ["SaveFileReader", "StreamingRun", "tail_results"]
+
+
+class SaveFileReader:
+    """SaveFileReader Class
+
+    tail_resultsのデフォルトのreader。呼ばれるたびに.savファイルを開き、start行目以降（まだ返していない時刻）だけを
+    get_data_bulkでコピーする。ノード名の一覧は最初に読んだときに1度だけ作成し、開いたSaveFileは読み終わったら閉じる。
+
+    Args:
+        node_list (list): 読み込むノードのリスト（"AAA.T1"の形式）。Noneの場合はoptionの全ノード。
+        option (str): ノード名の接頭辞（"T"や"Q"）
+
+    """
+
+    def __init__(self, node_list=None, option="T"):
+        self.node_list = None if node_list is None else list(node_list)
+        self.option = option
+
+    def __call__(self, path, start=0):
+        """start行目以降の時系列データ（先頭列が"Times"のDataFrame）"""
+        from .result import otd, get_data_bulk, NodeIndex
+
+        savefile = otd.Results.Dataset.SaveFile(path)
+        try:
+            if self.node_list is None:
+                info = {}
+                for submodel in savefile.GetThermalSubmodels():
+                    node_ids = savefile.GetNodeIds(submodel)
+                    if len(node_ids) > 0:
+                        info[f"{submodel}"] = node_ids
+                self.node_list = NodeIndex(info).select(option=self.option)
+            return get_data_bulk(savefile, self.node_list, slice(start, None))
+        finally:
+            dispose = getattr(savefile, "Dispose", None)
+            if dispose is not None:
+                dispose()
+
+
+def tail_results(
+    path,
+    reader=None,
+    poll_interval=10.0,
+    timeout=None,
+    is_running=None,
+    skip_existing=False,
+):
+    """実行中に出力されるファイルを監視し、新しい時刻の結果を順に返すジェネレータ
+
+    ファイルのサイズ・更新時刻が変わるたびに、readerで前回までに返した行より後の行だけを読み込んで返す。
+    受け取る側でbreakすれば（ジェネレータを閉じれば）監視は終わる。
+
+    Args:
+        path (str): 監視するファイル（.savファイルなど）
+        reader (callable): reader(path, start) -> start行目以降の、先頭列が"Times"のDataFrame。
+            Noneの場合はSaveFileReader()。ファイルが書き込み途中で読めない場合は例外を出してよい（次の周期で読み直す）。
+        poll_interval (float): 監視の周期[s]
+        timeout (float): 新しい結果が来ないまま経過したら終了する時間[s]。Noneの場合は無制限。
+        is_running (callable): Falseを返したら、最後にもう一度読んでから終了する（実行中のスレッドの監視など）。
+        skip_existing (bool): Trueの場合、開始時点で既にあるファイル（前回の実行結果など）は、更新されるまで読まない。
+    Yields:
+        pandas.core.frame.DataFrame: 新しく増えた時刻の行
+    Examples:
+        >>> for df_chunk in pt.tail_results(sav_path, poll_interval=60):
+        ...     if df_chunk.iloc[:, 1:].max().max() > 200:
+        ...         break  # 発散しているので監視をやめる
+    """
+    # ジェネレータは最初のnext()まで実行されないので、開始時点のファイルの状態はここで取得する
+    last_stat = _get_stat(path) if skip_existing else None
+    if reader is None:
+        reader = SaveFileReader()
+    return _tail(path, reader, poll_interval, timeout, is_running, last_stat)
+
+
+def _get_stat(path):
+    if not os.path.exists(path):
+        return None
+    st = os.stat(path)
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _tail(path, reader, poll_interval, timeout, is_running, last_stat):
+    n_read = 0
+    last_update = time.monotonic()
+    while True:
+        running = is_running is None or is_running()
+        stat = _get_stat(path)
+        if stat is not None and stat != last_stat:
+            try:
+                df = reader(path, n_read)
+            except Exception:
+                df = None  # 書き込み途中など。次の周期で読み直す
+            if df is not None:
+                last_stat = stat
+                if len(df) > 0:
+                    n_read += len(df)
+                    last_update = time.monotonic()
+                    yield df.reset_index(drop=True)
+        if not running:
+            return
+        if timeout is not None and time.monotonic() - last_update > timeout:
+            return
+        time.sleep(poll_interval)
+
+
+class StreamingRun:
+    """StreamingRun Class
+
+    ケースをバックグラウンドのスレッドで実行しながら、出力ファイルをtail_resultsで監視するクラス。
+    iterすると、新しい時刻の結果がDataFrameで順に返る。実行が終わると、残りの結果を返して終了する。
+
+    Note:
+        途中で監視をやめても、実行中のSINDA/FLUINT自体は止まらない（OpenTDに中断の手段がないため）。
+
+    Args:
+        case (pyopentd.Case): 実行するケース
+        path (str): 監視するファイル。Noneの場合は case.get_sav_path(dwg_path)。
+        dwg_path (str): モデルのパス（pathがNoneの場合に使用）
+        reader (callable): tail_resultsと同じ
+        poll_interval (float): 監視の周期[s]
+
+    Examples:
+        >>> run = pt.StreamingRun(case, dwg_path=td.dwg_path, poll_interval=60)
+        >>> for df_chunk in run:
+        ...     print(df_chunk["Times"].iloc[-1], df_chunk.iloc[:, 1:].max().max())
+        >>> run.join()
+
+    """
+
+    def __init__(
+        self,
+        case,
+        path=None,
+        dwg_path=None,
+        reader=None,
+        poll_interval=10.0,
+    ):
+        self.case = case
+        if path is None:
+            path = case.get_sav_path(dwg_path)
+        self.path = path
+        self.reader = reader
+        self.poll_interval = poll_interval
+        self.error = None
+        self._thread = None
+
+    def _run(self):
+        try:
+            self.case.run()
+        except Exception as e:
+            self.error = e
+
+    def start(self):
+        """実行の開始"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def __iter__(self):
+        # 前回の実行結果が残っている場合に備えて、開始前からあるファイルは更新されるまで読まない
+        results = tail_results(
+            self.path,
+            self.reader,
+            self.poll_interval,
+            is_running=self.is_running,
+            skip_existing=True,
+        )
+        self.start()
+        return results
+
+    def join(self, timeout=None):
+        """実行の終了を待つ。実行中に例外が発生していた場合はそれを出す。"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self.error is not None:
+            raise self.error
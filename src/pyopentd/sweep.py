@@ -0,0 +1,351 @@
+import os
+import json
+import hashlib
+import itertools
+import numpy as np
+import pandas as pd
+
+from .runner import BatchRunner, connect_thermal_desktop
+
+__all__ = ["Sweep", "SweepStore", "full_factorial", "latin_hypercube"]
+
+# ケースの設定のハッシュ（spec_hash）に含めるジョブの項目
+SPEC_KEYS = [
+    "group",
+    "symbols",
+    "orbit_name",
+    "caseset_options",
+    "base",
+    "pattern",
+    "option",
+]
+
+# manifest.csvの列（symbolsはシンボル名と値のJSON）
+MANIFEST_COLUMNS = [
+    "point_id",
+    "status",
+    "spec_hash",
+    "wall_time",
+    "error",
+    "orbit_name",
+    "symbols",
+]
+
+
+def full_factorial(levels):
+    """全因子計画の作成
+
+    Args:
+        levels (dict): シンボル名（または"orbit_name"）をキー、水準のリストを値とする辞書
+    Returns:
+        pandas.core.frame.DataFrame: 1行が1ケース
+    """
+    names = list(levels.keys())
+    rows = list(itertools.product(*[levels[name] for name in names]))
+    return pd.DataFrame(rows, columns=names)
+
+
+def latin_hypercube(ranges, n_points, seed=None):
+    """ラテン超方格計画の作成
+
+    Args:
+        ranges (dict): シンボル名をキー、(下限, 上限)を値とする辞書
+        n_points (int): ケース数
+        seed (int): 乱数のシード
+    Returns:
+        pandas.core.frame.DataFrame: 1行が1ケース
+    """
+    rng = np.random.default_rng(seed)
+    design = {}
+    for name, (low, high) in ranges.items():
+        # 各区間から1点ずつ選び、区間の順番を並べ替える
+        samples = (rng.permutation(n_points) + rng.random(n_points)) / n_points
+        design[name] = low + samples * (high - low)
+    return pd.DataFrame(design)
+
+
+def run_sweep_point(td, job):
+    """1ケースの実行（Sweepがワーカープロセスで使うrunner）
+
+    1. create_caseset でケースセットを作成（baseが指定されていれば、そのシンボルと輻射タスクを引き継ぐ）
+    2. update_symbols、update_orbit で値を設定
+    3. change_sav_name でケースごとの.savファイル名を設定して実行
+    4. .savファイルから結果を読み込んで返す
+    """
+    from .result import SaveFile
+
+    point_id = job["point_id"]
+    options = dict(job["caseset_options"])
+    if job.get("output_dir"):
+        options["run_dir"] = job["output_dir"]
+    case = td.create_caseset(point_id, job["group"], force_reset=True, **options)
+    if job["base"] is not None:
+        base = td.get_caseset(*job["base"])
+        case.set_radiation_tasks(base.origin.RadiationTasks)
+        case.update_symbols(td, base.get_symbols())
+    symbols = job["symbols"]
+    if symbols:
+        df_symbol = pd.DataFrame(
+            {"name": list(symbols.keys()), "value": list(symbols.values())}
+        )
+        case.update_symbols(td, df_symbol)
+    if job["orbit_name"] is not None:
+        case.update_orbit(job["orbit_name"])
+    case.change_sav_name(f"{point_id}.sav")
+    case.run()
+
+    savefile = SaveFile(case.get_sav_path(td.dwg_path))
+    if job["pattern"] is None:
+        node_list = savefile.get_node_names(option=job["option"])
+    else:
+        node_list = savefile.select_nodes(job["pattern"], option=job["option"])
+    return {"result": savefile.get_data(node_list)}
+
+
+def _to_builtin(value):
+    """NumPyの数値をJSONに書けるPythonの数値に変換する"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def get_spec_hash(job):
+    """ジョブの設定（シンボル・軌道・ケースセットの設定など、SPEC_KEYSの項目）のハッシュ"""
+    spec = {key: job.get(key) for key in SPEC_KEYS}
+    text = json.dumps(spec, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _run_and_store(td, job):
+    """job["runner"]で1ケースを実行し、結果をワーカープロセスから直接job["result_path"]に保存する。"""
+    output = job["runner"](td, job)
+    output["result"].to_pickle(job["result_path"])
+    return {}
+
+
+class SweepStore:
+    """SweepStore Class
+
+    パラメトリックスイープの結果の保存先。ディレクトリの中に、ケースごとの結果（results/<point_id>.pkl）と、
+    全ケースの設定と状態をまとめた一覧（manifest.csv）を持つ。
+    manifest.csvには1ケース終わるごとに1行を追記する（同じpoint_idの行が複数ある場合は最後の行が有効）。
+    各行には設定のハッシュ（spec_hash）を持ち、設計表の行を変えた場合は同じpoint_idでも実行し直す。
+
+    Args:
+        store_dir (str): 保存先のディレクトリ
+
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self.result_dir = os.path.join(store_dir, "results")
+        self.manifest_path = os.path.join(store_dir, "manifest.csv")
+        os.makedirs(self.result_dir, exist_ok=True)
+
+    def _read_manifest(self):
+        """manifest.csvの全行（point_idごとに最後の行だけを残す）"""
+        if not os.path.exists(self.manifest_path):
+            return pd.DataFrame(columns=MANIFEST_COLUMNS)
+        df = pd.read_csv(
+            self.manifest_path,
+            dtype={
+                "point_id": str,
+                "spec_hash": str,
+                "orbit_name": str,
+                "symbols": str,
+            },
+        )
+        df = df.drop_duplicates("point_id", keep="last")
+        return df.reset_index(drop=True)
+
+    def get_manifest(self):
+        """全ケースの状態（シンボルは1列ずつに展開する）"""
+        df = self._read_manifest()
+        symbols = pd.DataFrame(
+            [json.loads(text) for text in df["symbols"].fillna("{}")],
+            index=df.index,
+        )
+        return pd.concat([df.drop(columns="symbols"), symbols], axis=1)
+
+    def get_completed(self):
+        """正常に終了し、結果が保存されているケース
+
+        Returns:
+            dict: point_idをキー、実行したときの設定のハッシュ（spec_hash）を値とする辞書
+        """
+        df = self._read_manifest()
+        df = df[df["status"] == "success"]
+        return {
+            point_id: spec_hash
+            for point_id, spec_hash in zip(df["point_id"], df["spec_hash"])
+            if os.path.exists(self.get_result_path(point_id))
+        }
+
+    def get_result_path(self, point_id):
+        return os.path.join(self.result_dir, f"{point_id}.pkl")
+
+    def save(self, record):
+        """1ケース分の状態をmanifest.csvに追記する（結果はワーカーがget_result_pathに保存する）
+
+        Args:
+            record (dict): MANIFEST_COLUMNSの項目。symbolsはシンボル名と値の辞書。
+        """
+        record = dict(record)
+        record["symbols"] = json.dumps(
+            {k: _to_builtin(v) for k, v in record["symbols"].items()},
+            default=str,
+        )
+        df = pd.DataFrame([record], columns=MANIFEST_COLUMNS)
+        exists = os.path.exists(self.manifest_path)
+        df.to_csv(self.manifest_path, mode="a", header=not exists, index=False)
+
+    def load(self, point_ids=None):
+        """結果の読み込み
+
+        Args:
+            point_ids (list): 読み込むケース。Noneの場合は正常終了した全ケース。
+        Returns:
+            pandas.core.frame.DataFrame: 先頭列に'point_id'を加えて、全ケースを縦に結合したもの。
+        """
+        if point_ids is None:
+            point_ids = sorted(self.get_completed())
+        frames = []
+        for point_id in point_ids:
+            df = pd.read_pickle(self.get_result_path(point_id))
+            df.insert(0, "point_id", point_id)
+            frames.append(df)
+        if frames == []:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+
+class Sweep:
+    """Sweep Class
+
+    パラメトリックスイープの実行クラス。設計表（1行が1ケース）の各行について、ケースセットを作成し、
+    シンボル・軌道を設定して実行し、結果をSweepStoreにまとめる。
+    各ケースはBatchRunnerで並列に実行する（ワーカーごとにThermalDesktopの接続と出力先のディレクトリを持つ）。
+    途中で中断した場合も、もう一度run()を呼べば正常終了済みのケースは飛ばして続きから実行する
+    （設計表の行やケースセットの設定を変えたケースは、設定のハッシュが変わるので実行し直す）。
+
+    Args:
+        dwg_path (str): dwgファイルのパス
+        design (pandas.core.frame.DataFrame): 設計表。カラムはシンボル名。"orbit_name"カラムがあれば軌道名として扱う。
+            "point_id"カラムがあればケース名に使い、無ければ"point_0000"のような名前を付ける。
+        store_dir (str): 結果の保存先
+        caseset_options (dict): create_casesetの引数（steady, transient, time_endなど）
+        base (tuple): シンボルと輻射タスクを引き継ぐケースセットの(caseset_name, group_name)
+        group (str): 作成するケースセットのグループ名
+        pattern (str): 結果として保存するノード名のワイルドカード（例: "PANEL_*.T*"）。Noneの場合は全ノード。
+        option (str): 結果として保存するノード名の接頭辞（"T"や"Q"）
+        n_workers (int): 並列数
+        work_dir (str): ワーカーの実行ディレクトリの親ディレクトリ
+        runner (callable): 1ケースの実行。BatchRunnerと同じ形式で、{"result": DataFrame}を返す。
+        connect (callable): ワーカーごとの接続。BatchRunnerと同じ形式。
+
+    Examples:
+        >>> design = pt.full_factorial({"HTR_POWER": [1, 2, 3], "orbit_name": ["hot", "cold"]})
+        >>> sweep = pt.Sweep(dwg_path, design, "./sweep", {"steady": 0, "transient": 1, "time_end": 54000},
+        ...                  base=("Case Set 2", "orbit"), n_workers=4)
+        >>> df_status = sweep.run()
+        >>> df = sweep.store.load()
+
+    """
+
+    def __init__(
+        self,
+        dwg_path,
+        design,
+        store_dir,
+        caseset_options,
+        base=None,
+        group="sweep",
+        pattern=None,
+        option="T",
+        n_workers=1,
+        work_dir=None,
+        runner=run_sweep_point,
+        connect=connect_thermal_desktop,
+    ):
+        self.dwg_path = dwg_path
+        self.design = design.reset_index(drop=True)
+        self.store = SweepStore(store_dir)
+        self.caseset_options = caseset_options
+        self.base = base
+        self.group = group
+        self.pattern = pattern
+        self.option = option
+        self.n_workers = n_workers
+        self.work_dir = work_dir
+        self.runner = runner
+        self.connect = connect
+
+    def get_jobs(self):
+        """設計表からジョブ（dict）のリストを作成"""
+        symbol_columns = [
+            c
+            for c in self.design.columns
+            if c not in ["point_id", "orbit_name"]
+        ]
+        jobs = []
+        for i, row in enumerate(self.design.to_dict(orient="records")):
+            point_id = str(row.get("point_id", f"point_{i:04d}"))
+            orbit_name = row.get("orbit_name")
+            if not isinstance(orbit_name, str):
+                orbit_name = None
+            job = {
+                "point_id": point_id,
+                "group": self.group,
+                "symbols": {c: _to_builtin(row[c]) for c in symbol_columns},
+                "orbit_name": orbit_name,
+                "caseset_options": self.caseset_options,
+                "base": self.base,
+                "pattern": self.pattern,
+                "option": self.option,
+                "runner": self.runner,
+                "result_path": self.store.get_result_path(point_id),
+            }
+            job["spec_hash"] = get_spec_hash(job)
+            jobs.append(job)
+        return jobs
+
+    def _save(self, result):
+        record = {
+            "point_id": result["point_id"],
+            "status": result["status"],
+            "spec_hash": result["spec_hash"],
+            "wall_time": result["wall_time"],
+            "error": result["error"],
+            "orbit_name": result["orbit_name"],
+            "symbols": result["symbols"],
+        }
+        self.store.save(record)
+
+    def run(self, callback=None):
+        """スイープの実行（同じ設定で正常終了済みのケースは飛ばす）
+
+        Args:
+            callback (callable): 1ケース終わるごとにcallback(result)を呼ぶ。
+        Returns:
+            pandas.core.frame.DataFrame: 全ケースの状態（manifest）
+        """
+        completed = self.store.get_completed()
+        jobs = [
+            job
+            for job in self.get_jobs()
+            if completed.get(job["point_id"]) != job["spec_hash"]
+        ]
+        if jobs != []:
+            batch = BatchRunner(
+                self.dwg_path,
+                n_workers=min(self.n_workers, len(jobs)),
+                work_dir=self.work_dir,
+                runner=_run_and_store,
+                connect=self.connect,
+            )
+
+            def on_done(result):
+                self._save(result)
+                if callback is not None:
+                    callback(result)
+
+            batch.run(jobs, callback=on_done)
+        return self.store.get_manifest()
@@ -1,20 +1,17 @@
 import sys
-import clr
 import numpy as np
 import pandas as pd
 from argparse import ArgumentParser
 
-sys.path.append(
-    "C:/Windows/Microsoft.NET/assembly/GAC_MSIL/OpenTDv62/v4.0_6.2.0.7__65e6d95ed5c2e178/"
-)
-clr.AddReference("OpenTDv62")
-sys.path.append(
-    "C:/Windows/Microsoft.NET/assembly/GAC_64/OpenTDv62.Results/v4.0_6.2.0.0__b62f614be6a1e14a/"
-)
-clr.AddReference("OpenTDv62.Results")
+from .backend import load_opentd
+
+load_opentd()
 
 from System.Collections.Generic import List
 import OpenTDv62 as otd
+import System
+
+__all__ = ["get_properties", "to_net_list"]
 
 
 def get_properties(obj):
@@ -26,3 +23,17 @@ def get_properties(obj):
         if str(type(val)) == "<class 'OpenTDv62.ExpressionArrayClassData'>":
             print(val.expression)
     return
+
+
+def to_net_list(values, item_type=System.String):
+    """Pythonのリストを.NETのList[item_type]に一括変換する
+
+    要素ごとにAdd()を呼ぶ代わりに、.NETの配列を作ってAddRange()で1回で追加する。
+    item_typeがSystem.Stringの場合は各要素をstrに変換する。
+    """
+    values = list(values)
+    if item_type is System.String:
+        values = [str(value) for value in values]
+    net_list = List[item_type]()
+    net_list.AddRange(System.Array[item_type](values))
+    return net_list
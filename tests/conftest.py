@@ -0,0 +1,50 @@
+"""テストの共通設定
+
+OpenTD（pythonnet）の代わりに benchmarks/fake_opentd.py の代替を使うので、Windows・Thermal Desktopは不要。
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import fake_opentd  # noqa: E402
+
+fake_opentd.install()
+
+
+@pytest.fixture
+def model():
+    """小さなモデルと.savファイル（テストごとに作り直す）"""
+    model = fake_opentd.FakeModel(
+        n_submodels=2,
+        nodes_per_submodel=10,
+        n_times=50,
+        n_heaters=5,
+        n_heatloads=5,
+        n_geometries=5,
+        n_orbit_points=20,
+        n_symbols=5,
+    )
+    fake_opentd.set_model(model)
+    return model
+
+
+@pytest.fixture
+def td(model, tmp_path):
+    import pyopentd as pt
+
+    dwg_path = tmp_path / "model.dwg"
+    dwg_path.write_text("model")
+    return pt.ThermalDesktop(str(dwg_path), visible=False)
+
+
+@pytest.fixture
+def savefile(model):
+    import pyopentd as pt
+
+    return pt.SaveFile("result.sav")
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import pyopentd as pt
+
+
+class StandInCase:
+    """run()だけを持つCaseの代替（指定した時間だけブロックする）"""
+
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, name, seconds, error=None):
+        self.name = name
+        self.seconds = seconds
+        self.error = error
+
+    def run(self):
+        cls = type(self)
+        with cls.lock:
+            cls.running += 1
+            cls.peak = max(cls.peak, cls.running)
+        time.sleep(self.seconds)
+        with cls.lock:
+            cls.running -= 1
+        if self.error is not None:
+            raise self.error
+
+
+@pytest.fixture
+def two_workers():
+    pt.set_max_workers(2)
+    StandInCase.running = StandInCase.peak = 0
+    yield
+    pt.set_max_workers(4)
+
+
+async def collect(cases, **kwargs):
+    return [item async for item in pt.as_completed_cases(cases, **kwargs)]
+
+
+def test_as_completed_cases_order_and_errors(two_workers):
+    """終わった順に返し、例外はケースごとに返す（他のケースは止めない）"""
+    cases = [
+        StandInCase("slow", 0.3),
+        StandInCase("failed", 0.05, RuntimeError("boom")),
+        StandInCase("fast", 0.1),
+    ]
+    results = asyncio.run(collect(cases))
+    assert [case.name for case, _ in results] == ["failed", "fast", "slow"]
+    errors = {case.name: error for case, error in results}
+    assert isinstance(errors["failed"], RuntimeError)
+    assert errors["fast"] is None and errors["slow"] is None
+
+
+def test_max_workers_limits_concurrency(two_workers):
+    cases = [StandInCase(str(i), 0.05) for i in range(6)]
+    results = asyncio.run(collect(cases))
+    assert len(results) == 6
+    assert StandInCase.peak == 2
+
+
+def test_timeout(two_workers):
+    async def main():
+        return await pt.run_case_async(StandInCase("slow", 0.3), timeout=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(main())
+    results = asyncio.run(collect([StandInCase("slow", 0.3)], timeout=0.05))
+    assert isinstance(results[0][1], asyncio.TimeoutError)
+
+
+def test_case_run_async(td):
+    case = td.create_caseset("case", "group", 1, 0)
+
+    async def main():
+        return await case.run_async(timeout=10)
+
+    assert asyncio.run(main()) is case
+
+
+def test_load_and_get_data_async(model):
+    async def main():
+        savefile = await pt.load_savefile_async("result.sav")
+        node_list = savefile.get_node_names(option="T")[:3]
+        df = await pt.get_data_async(savefile, node_list)
+        return savefile, node_list, df
+
+    savefile, node_list, df = asyncio.run(main())
+    assert isinstance(savefile, pt.SaveFile)
+    np.testing.assert_allclose(df.values, savefile.get_data(node_list).values)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+
+def test_create_heaters_bad_node_id(td):
+    """ノード番号が整数でない行だけが失敗し、他の行は作成される"""
+    df = pd.DataFrame(
+        {
+            "apply_node_sub": ["SUB000", "SUB000", "SUB000"],
+            "apply_node_id": [1, "x", 2],
+            "sensor_node_sub": ["SUB000", "SUB000", "SUB000"],
+            "sensor_node_id": [1, 1, 2],
+            "value": 1.0,
+            "on_temp": 0.0,
+            "off_temp": 5.0,
+        }
+    )
+    n_heaters = len(td.GetHeaters())
+    result = td.create_heaters(df)
+    assert result["status"].tolist() == ["success", "failed", "success"]
+    assert "ValueError" in result["error"][1]
+    assert len(td.GetHeaters()) == n_heaters + 2
+
+
+def test_create_heaters_scaling_arrays(td):
+    """time_list・scale_listにnumpy配列を渡しても、過渡スケーリングが設定される"""
+    df = pd.DataFrame(
+        {
+            "apply_node_sub": ["SUB000", "SUB000"],
+            "apply_node_id": [1, 2],
+            "sensor_node_sub": ["SUB000", "SUB000"],
+            "sensor_node_id": [1, 2],
+            "value": 1.0,
+            "on_temp": 0.0,
+            "off_temp": 5.0,
+            "layer": [None, 3],
+            "time_list": [np.array([0.0, 10.0]), None],
+            "scale_list": [np.array([1.0, 0.5]), None],
+        }
+    )
+    result = td.create_heaters(df)
+    assert result["status"].tolist() == ["success", "success"]
+    scaled, plain = result["original_object"]
+    assert scaled.UseTransientScaling == 1
+    assert [float(t.GetValueSI()) for t in scaled.Times] == [0.0, 10.0]
+    assert list(scaled.Scales) == [1.0, 0.5]
+    assert not hasattr(plain, "Times")
+    assert plain.Layer == 3
@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from pyopentd.cache import ResultCache
+
+
+def _df(value):
+    return pd.DataFrame({"Times": [0.0, 1.0], "AAA.T1": [value, value]})
+
+
+def test_shared_cache_dir(tmp_path):
+    """cache_dirを共有しても、他の.savファイルのキャッシュを消さない"""
+    cache_dir = str(tmp_path / "cache")
+    (tmp_path / "a.sav").write_text("a")
+    (tmp_path / "b.sav").write_text("b")
+    cache_a = ResultCache(str(tmp_path / "a.sav"), cache_dir)
+    cache_b = ResultCache(str(tmp_path / "b.sav"), cache_dir)
+
+    cache_a.store(_df(1.0))
+    cache_b.store(_df(2.0))
+    df, missing = cache_a.load(["AAA.T1"])
+    assert missing == []
+    assert df["AAA.T1"].tolist() == [1.0, 1.0]
+
+    cache_b.clear()
+    df, missing = cache_a.load(["AAA.T1"])
+    assert missing == []
+    assert cache_b.load(["AAA.T1"]) == (None, ["AAA.T1"])
+
+
+def test_stale_key_removed(tmp_path):
+    """.savファイルが更新されると、同じ.savファイルの古いキャッシュだけを削除する"""
+    cache_dir = str(tmp_path / "cache")
+    sav_path = tmp_path / "a.sav"
+    sav_path.write_text("a")
+    (tmp_path / "b.sav").write_text("b")
+    ResultCache(str(sav_path), cache_dir).store(_df(1.0))
+    other = ResultCache(str(tmp_path / "b.sav"), cache_dir)
+    other.store(_df(2.0))
+
+    sav_path.write_text("a, updated")
+    cache = ResultCache(str(sav_path), cache_dir)
+    cache.store(_df(3.0))
+    assert len(cache._get_paths()) == 1
+    assert other.load(["AAA.T1"])[1] == []
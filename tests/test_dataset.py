@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+import pyopentd as pt
+import pyopentd.result
+
+
+def test_time_range_copies_only_selected_rows(model, monkeypatch):
+    """時間範囲外の行は.savファイルからコピーしない"""
+    ds = pt.SaveFileDataset({"a": "a.sav", "b": "b.sav"}, max_workers=2)
+    nodes = ds.get_node_names(pattern="SUB001.T*")[:3]
+    times = np.asarray(ds.savefiles["a"].times)
+    start, end = times[10], times[19]
+
+    copied = []
+    copy_values = pyopentd.result._copy_values
+
+    def record(values, out, start=0):
+        copied.append(len(out))
+        return copy_values(values, out, start)
+
+    monkeypatch.setattr(pyopentd.result, "_copy_values", record)
+    df = ds.select(nodes=nodes, time_range=(start, end), long=False)
+    # ケースごとに時刻とノードの列を、範囲内の10行分だけコピーする
+    assert copied == [10] * 2 * (len(nodes) + 1)
+
+    full = ds.savefiles["a"].get_data(nodes)
+    expected = full[(full["Times"] >= start) & (full["Times"] <= end)]
+    pd.testing.assert_frame_equal(
+        df.loc["a"].reset_index(),
+        expected.reset_index(drop=True),
+    )
+
+
+def test_time_range_open_ends(model):
+    ds = pt.SaveFileDataset(["a.sav"])
+    times = np.asarray(ds.savefiles["a.sav"].times)
+    nodes = ds.get_node_names()[:2]
+    df = ds.select(nodes=nodes, time_range=(None, times[4]), long=False)
+    assert len(df) == 5
+    df = ds.select(nodes=nodes, time_range=(times[-3], None), long=False)
+    assert len(df) == 3
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+import pyopentd as pt
+
+
+def test_select_rows():
+    times = np.arange(10.0)
+    assert pt.select_rows(times) == slice(0, 10, None)
+    assert pt.select_rows(times, time=(2.0, 5.0)) == slice(2, 6, None)
+    assert pt.select_rows(times, time=(2.5, None)) == slice(3, 10, None)
+    assert pt.select_rows(times, time=(None, 4.5), stride=2) == slice(0, 5, 2)
+    # lastはtimeより優先する
+    assert pt.select_rows(times, time=(0.0, 1.0), last=3.0) == slice(6, 10)
+    assert pt.select_rows(times, time=(8.0, 2.0)) == slice(8, 8, None)
+    with pytest.raises(ValueError):
+        pt.select_rows(times, stride=0)
+
+
+def test_windows_and_aggregation():
+    """区間は基準時刻からwindowごと、データの無い区間は飛ばす"""
+    times = np.array([0.0, 1.0, 2.0, 3.5, 4.0, 9.0])
+    starts, window_times = pt.get_windows(times, 2.0)
+    assert starts.tolist() == [0, 2, 4, 5]
+    assert window_times.tolist() == [0.0, 2.0, 4.0, 8.0]
+    starts_origin, _ = pt.get_windows(times, 2.0, origin=-1.0)
+    assert starts_origin.tolist() == [0, 1, 3, 5]
+
+    values = np.arange(12.0).reshape(6, 2)
+    np.testing.assert_allclose(
+        pt.aggregate_windows(values, starts, "mean"),
+        [[1.0, 2.0], [5.0, 6.0], [8.0, 9.0], [10.0, 11.0]],
+    )
+    np.testing.assert_allclose(
+        pt.aggregate_windows(values, starts, "min")[:, 0], [0, 4, 8, 10]
+    )
+    np.testing.assert_allclose(
+        pt.aggregate_windows(values, starts, "max")[:, 0], [2, 6, 8, 10]
+    )
+    np.testing.assert_allclose(
+        pt.aggregate_windows(values, starts, "first")[:, 1], [1, 5, 9, 11]
+    )
+    np.testing.assert_allclose(
+        pt.aggregate_windows(values, starts, "last")[:, 1], [3, 7, 9, 11]
+    )
+    with pytest.raises(ValueError):
+        pt.aggregate_windows(values, starts, "median")
+    with pytest.raises(ValueError):
+        pt.get_windows(times, 0.0)
+
+
+def test_query_matches_get_data(savefile):
+    """ノードをchunk_size個ずつ読み込んでも、全体を読み込んで切り出した結果と同じ"""
+    node_list = savefile.get_node_names(option="T")
+    full = savefile.get_data(node_list)
+    times = full["Times"].to_numpy()
+    start, end = times[5], times[30]
+    df = savefile.query(time=(start, end), stride=3, chunk_size=7)
+    expected = full.iloc[5:31:3].reset_index(drop=True)
+    assert df.columns.tolist() == full.columns.tolist()
+    np.testing.assert_allclose(df.values, expected.values)
+
+    df = savefile.query(pattern="SUB001.T*", last=times[-1] - times[-5])
+    assert len(df) == 5
+    assert df.columns[1:].tolist() == savefile.select_nodes("SUB001.T*")
+
+
+def test_query_windows(savefile):
+    node_list = savefile.get_node_names(option="Q", submodel_name="SUB000")
+    full = savefile.get_data(node_list)
+    times = full["Times"].to_numpy()
+    window = (times[-1] - times[0]) / 4
+    dfs = savefile.query(
+        node_list, window=window, agg=["min", "max", "mean"], chunk_size=3
+    )
+    assert sorted(dfs) == ["max", "mean", "min"]
+    bins = np.floor((times - times[0]) / window)
+    grouped = full.drop(columns="Times").groupby(bins)
+    np.testing.assert_allclose(dfs["max"].values[:, 1:], grouped.max().values)
+    np.testing.assert_allclose(
+        dfs["mean"].values[:, 1:], grouped.mean().values
+    )
+    np.testing.assert_allclose(
+        dfs["min"]["Times"], times[0] + np.unique(bins) * window
+    )
+    df = savefile.query(node_list, window=window, agg="last")
+    np.testing.assert_allclose(df.values[:, 1:], grouped.last().values)
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+
+def test_export_parquet(savefile, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "result.parquet")
+    savefile.export(path, option=["T", "Q"], time_chunk=16, node_chunk=7)
+    df = pq.read_table(path).to_pandas()
+    df_ref = savefile.get_data(df.columns[1:].tolist())
+    assert pq.ParquetFile(path).num_row_groups == 4
+    assert np.allclose(df.values, df_ref.values, atol=1e-3)
+
+
+def test_export_hdf5_empty_window(savefile, tmp_path):
+    """時間範囲やノードの選択が空でも書き出せる"""
+    h5py = pytest.importorskip("h5py")
+    path = str(tmp_path / "empty_time.h5")
+    savefile.export(path, time=(1e12, None))
+    with h5py.File(path, "r") as h5:
+        assert h5["values"].shape == (0, len(savefile.get_node_names(option="T")))
+
+    path = str(tmp_path / "empty_nodes.h5")
+    savefile.export(path, pattern="NOPE*")
+    with h5py.File(path, "r") as h5:
+        assert h5["values"].shape == (len(savefile.times), 0)
+
+
+def test_export_hdf5_window(savefile, tmp_path):
+    h5py = pytest.importorskip("h5py")
+    path = str(tmp_path / "window.h5")
+    times = savefile.times
+    savefile.export(path, time=(times[5], times[20]), time_chunk=4)
+    with h5py.File(path, "r") as h5:
+        nodes = [name.decode() for name in h5["nodes"][:]]
+        values = h5["values"][:]
+        assert np.allclose(h5["times"][:], times[5:21])
+    df_ref = savefile.get_data(nodes)
+    assert np.allclose(values, df_ref.values[5:21, 1:], atol=1e-3)
+
+
+def test_export_reads_only_selection(savefile, tmp_path, monkeypatch):
+    """選択したノードだけを読み込み、一時ファイルを残さない"""
+    pytest.importorskip("pyarrow.parquet")
+    staging = tmp_path / "staging"
+    staging.mkdir()
+    monkeypatch.setattr("tempfile.tempdir", str(staging))
+    requested = []
+    get_data = savefile.GetData
+
+    def record(names):
+        requested.extend(names)
+        return get_data(names)
+
+    monkeypatch.setattr(savefile, "GetData", record)
+    nodes = savefile.select_nodes("SUB001.T*")[:4]
+    savefile.export(str(tmp_path / "a.parquet"), nodes=nodes, node_chunk=3)
+    assert sorted(requested) == sorted(nodes)
+    assert list(staging.iterdir()) == []
@@ -0,0 +1,53 @@
+import pyopentd as pt
+
+
+def test_get_geometries_table(td):
+    """全種類の形状が1つの表になり、その種類に無い項目は欠損値になる"""
+    df = td.get_geometries()
+    assert len(df) == 5 * len(pt.GEOMETRY_TYPES)
+    assert df["type"].value_counts().to_dict() == {
+        t: 5 for t in pt.GEOMETRY_TYPES
+    }
+    assert list(df.columns[:1]) == ["type"]
+    assert list(df.columns[-1:]) == ["original_object"]
+    bricks = df[df["type"] == "solid_brick"]
+    assert bricks["radius"].isna().all()
+    assert (bricks["z_max"] == 1.0).all()
+    cylinders = df[df["type"] == "cylinder"]
+    assert (cylinders["radius"] == 1.0).all()
+    assert cylinders["z_max"].isna().all()
+
+
+def test_get_geometries_fields(td, monkeypatch):
+    """指定した項目だけを取得し、一覧は種類ごとに1回だけ取得する"""
+    calls = []
+    get_rectangles = td.GetRectangles
+
+    def wrapper():
+        calls.append(1)
+        return get_rectangles()
+
+    monkeypatch.setattr(td, "GetRectangles", wrapper)
+    df = td.get_thin_shells(fields=["handle", "top_thickness"])
+    assert list(df.columns) == ["type", "handle", "top_thickness"]
+    assert set(df["type"]) == {"rectangle", "polygon", "cylinder"}
+    td.get_geometries(["rectangle"], fields=["comment"])
+    assert len(calls) == 1
+    td.get_geometries(["rectangle"], fields=["comment"], refresh=True)
+    assert len(calls) == 2
+
+
+def test_get_geometries_unknown_type(td, capsys):
+    assert td.get_geometries(["sphere"]) is None
+    assert "MYERROR" in capsys.readouterr().out
+
+
+def test_get_solid_bricks_legacy_columns(td):
+    """種類ごとのメソッドは以前の列名のまま返す"""
+    df = td.get_solid_bricks()
+    assert "y_mMax" in df.columns and "z_mMax" in df.columns
+    assert "y_max" not in df.columns
+    assert list(df.columns[-1:]) == ["original_object"]
+    df = td.get_solid_bricks(columns=["z_mMax", "handle"])
+    assert list(df.columns) == ["z_mMax", "handle"]
+    assert len(df) == 5
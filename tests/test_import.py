@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+from importlib import import_module
+
+import pyopentd as pt
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODE = """
+import sys, json
+sys.path[:0] = {paths!r}
+import fake_opentd
+fake_opentd.install()
+import pyopentd as pt
+before = sorted(sys.modules)
+pt.SaveFile
+after = sorted(sys.modules)
+print(json.dumps([before, after, pt.get_loaded_assemblies()]))
+"""
+
+
+def _run(code):
+    paths = [os.path.join(ROOT, "src"), os.path.join(ROOT, "benchmarks")]
+    out = subprocess.run(
+        [sys.executable, "-c", code.format(paths=paths)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.splitlines()[-1])
+
+
+def test_import_is_lazy():
+    """import pyopentdではサブモジュール・pandasを読み込まず、SaveFileはresultだけを読み込む"""
+    before, after, assemblies = _run(CODE)
+    assert "pandas" not in before
+    assert [m for m in before if m.startswith("pyopentd.")] == [
+        "pyopentd.backend"
+    ]
+    assert "pyopentd.result" in after
+    assert "pyopentd.main" not in after
+    assert "pyopentd.server" not in after
+    assert assemblies == ["OpenTDv62.Results"]
+
+
+def test_lazy_table_matches_all():
+    """_LAZY_MODULESの名前は各モジュールの__all__と同じ"""
+    for module, names in pt._LAZY_MODULES.items():
+        assert import_module(f"pyopentd.{module}").__all__ == names
+    assert "encode_result" not in dir(pt)
+    assert not hasattr(pt, "run_sweep_point")
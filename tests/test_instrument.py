@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+import pyopentd as pt
+from pyopentd.main import ThermalDesktop
+
+
+def test_records_calls_by_caller(td, savefile):
+    """OpenTDの呼び出しを、それを呼んだpyopentdのメソッドに紐づけて記録する"""
+    node_list = savefile.get_node_names(option="T")[:4]
+    with pt.Instrumentation() as prof:
+        td.get_heaters()
+        td.get_heaters()
+        savefile.get_data(node_list)
+        td.create_heater("SUB000", 1, "SUB000", 2, 1.0, 0.0, 5.0)
+    df = prof.get_records()
+    heaters = df[df["call"] == "GetHeaters"]
+    # 2回目はsnapshotの一覧を使うので、GetHeaters()は1回
+    assert len(heaters) == 1
+    assert heaters["caller"].iloc[0] == "ThermalDesktop.get_heaters"
+    assert heaters["elements"].iloc[0] == 5
+    get_data = df[df["call"] == "GetData"].iloc[0]
+    assert get_data["caller"] == "SaveFile.get_data"
+    values = df[df["call"] == "GetValues"].iloc[0]
+    assert values["elements"] == 4 * len(savefile.times)
+    assert values["bytes"] == 8 * values["elements"]
+    # エンティティのUpdate()は呼び出し側で記録する
+    assert "Heater.Update" in set(df["call"])
+
+    summary = prof.get_summary(by=("caller",))
+    assert set(summary.columns) >= {"count", "total_time", "elements"}
+    assert "ThermalDesktop.get_heaters" in set(summary["caller"])
+
+
+def test_stop_restores_methods(td):
+    original = ThermalDesktop.__dict__.get("GetHeaters")
+    prof = pt.Instrumentation().start()
+    assert ThermalDesktop.__dict__.get("GetHeaters") is not original
+    prof.stop()
+    assert ThermalDesktop.__dict__.get("GetHeaters") is original
+    td.get_heaters(refresh=True)
+    assert prof.records == []
+
+
+def test_single_active(td):
+    with pt.Instrumentation():
+        with pytest.raises(RuntimeError):
+            pt.Instrumentation().start()
+    with pt.Instrumentation():
+        pass
+
+
+def test_records_errors(td):
+    with pt.Instrumentation() as prof:
+        with pytest.raises(KeyError):
+            td.GetNode("missing")
+    record = prof.get_records().iloc[-1]
+    assert record["call"] == "GetNode"
+    assert record["error"] is not None
+
+
+def test_chrome_trace(td, tmp_path):
+    with pt.Instrumentation() as prof:
+        td.get_nodes(refresh=True)
+    path = tmp_path / "trace.json"
+    trace = prof.to_chrome_trace(str(path))
+    assert json.loads(path.read_text()) == trace
+    event = trace["traceEvents"][0]
+    assert event["name"] == "GetNodes" and event["ph"] == "X"
+    assert event["args"]["caller"] == "ThermalDesktop.get_nodes"
@@ -0,0 +1,49 @@
+import gc
+import os
+
+
+def test_empty_selection(savefile):
+    """該当するノードが無い場合は、Timesだけを返す"""
+    with savefile.get_lazy("T") as lazy:
+        assert lazy.select_columns(nodes=["NOPE.T1"]).dtype.kind == "i"
+        df = lazy.sel(nodes=["NOPE.T1"])
+        assert df.columns.tolist() == ["Times"]
+        assert len(df) == len(savefile.times)
+
+
+def test_pattern(savefile):
+    nodes = savefile.select_nodes("SUB001.T*")
+    with savefile.get_lazy("T") as lazy:
+        df = lazy.sel(pattern="SUB001.T*")
+        assert df.columns.tolist() == ["Times"] + nodes
+        df_last = lazy.last(0.0, pattern="SUB001.T*")
+        assert len(df_last) == 1
+        df_all = savefile.get_data(nodes)
+        assert (df.values == df_all.values).all()
+
+
+def test_temporary_file_removed(savefile):
+    lazy = savefile.get_lazy("T")
+    lazy.sel(submodels=["SUB000"])
+    path = lazy.mmap_path
+    assert os.path.exists(path)
+    del lazy
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+def test_file_holds_only_requested_columns(savefile):
+    """メモリマップのファイルは、要求した列の分だけ大きくなる"""
+    n_times = len(savefile.times)
+    with savefile.get_lazy("T") as lazy:
+        assert os.path.getsize(lazy.mmap_path) == 0
+        df = lazy.sel(submodels=["SUB001"], time=(0.0, None))
+        n_columns = len(df.columns) - 1
+        assert os.path.getsize(lazy.mmap_path) == n_times * n_columns * 8
+        # 読み込み済みの列は追記しない
+        lazy.sel(nodes=df.columns[1:3].tolist())
+        assert os.path.getsize(lazy.mmap_path) == n_times * n_columns * 8
+        df_both = lazy.sel(submodels=["SUB000", "SUB001"])
+        assert lazy.shape[1] == len(df_both.columns) - 1
+        expected = savefile.get_data(df_both.columns[1:].tolist())
+        assert (df_both.values == expected.values).all()
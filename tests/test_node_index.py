@@ -0,0 +1,82 @@
+import numpy as np
+
+from pyopentd.result import NodeIndex
+
+
+def make_index():
+    return NodeIndex(
+        {"PANEL_A": [1, 2, 3], "PANEL_B": [10, 20], "BUS": [1, 5]}
+    )
+
+
+def test_names_and_positions():
+    index = make_index()
+    assert len(index) == 7
+    assert index.names == [
+        "PANEL_A.1",
+        "PANEL_A.2",
+        "PANEL_A.3",
+        "PANEL_B.10",
+        "PANEL_B.20",
+        "BUS.1",
+        "BUS.5",
+    ]
+    assert index.position("PANEL_B.20") == 4
+    # 接頭辞付きの名前でも引ける
+    assert index.position("BUS.T5") == 6
+    assert index.position("BUS.Q1") == 5
+    assert index.position("BUS.T9") is None
+    assert index.node(3) == ("PANEL_B", 10)
+
+
+def test_select():
+    index = make_index()
+    assert index.select(submodels=["PANEL_*"], option="T") == [
+        "PANEL_A.T1",
+        "PANEL_A.T2",
+        "PANEL_A.T3",
+        "PANEL_B.T10",
+        "PANEL_B.T20",
+    ]
+    assert index.select(submodels="BUS", option="Q") == ["BUS.Q1", "BUS.Q5"]
+    assert index.select(pattern="*.T1*", option="T") == [
+        "PANEL_A.T1",
+        "PANEL_B.T10",
+        "BUS.T1",
+    ]
+    assert index.select(regex=r"\.T[23]$", option="T") == [
+        "PANEL_A.T2",
+        "PANEL_A.T3",
+    ]
+    assert index.select(
+        submodels=["PANEL_B"], pattern="*.T2*", option="T"
+    ) == ["PANEL_B.T20"]
+    assert index.select(submodels=["NOPE"]) == []
+    np.testing.assert_array_equal(index.positions(submodels=["BUS"]), [5, 6])
+
+
+def test_empty():
+    index = NodeIndex({})
+    assert len(index) == 0
+    assert index.select(option="T") == []
+    assert index.select(submodels=["A*"]) == []
+
+
+def test_savefile_index_built_once(savefile, monkeypatch):
+    """索引は初回アクセス時に1度だけ作成し、ノード名の取得・絞り込みで共有する"""
+    calls = []
+    get_submodels = savefile.GetThermalSubmodels
+
+    def wrapper():
+        calls.append(1)
+        return get_submodels()
+
+    monkeypatch.setattr(savefile, "GetThermalSubmodels", wrapper)
+    names = savefile.get_node_names(option="T")
+    assert len(names) == 20
+    assert savefile.get_node_names("SUB001", option="Q") == [
+        f"SUB001.Q{i}" for i in range(1, 11)
+    ]
+    assert savefile.select_nodes("SUB000.T1*") == ["SUB000.T1", "SUB000.T10"]
+    assert list(savefile.get_node_info()) == ["SUB000", "SUB001"]
+    assert len(calls) == 1
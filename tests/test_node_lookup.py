@@ -0,0 +1,52 @@
+import fake_opentd
+
+
+def count_get_nodes(td, monkeypatch):
+    calls = []
+    get_nodes = td.GetNodes
+
+    def wrapper():
+        calls.append(1)
+        return get_nodes()
+
+    monkeypatch.setattr(td, "GetNodes", wrapper)
+    return calls
+
+
+def add_node(td, submodel, id):
+    node = fake_opentd._Node(submodel, id, td._new_handle())
+    td._nodes.append(node)
+    td._nodes_by_handle[node.Handle] = node
+    return node
+
+
+def test_get_node_uses_lookup(td, monkeypatch):
+    calls = count_get_nodes(td, monkeypatch)
+    for i in range(1, 11):
+        assert td.get_node("SUB001", i).Id == i
+    assert len(calls) == 1
+
+
+def test_get_node_missing_rebuilds_once(td, monkeypatch, capsys):
+    """見つからないノードが続いても、索引の作り直しは1回だけ"""
+    calls = count_get_nodes(td, monkeypatch)
+    for i in range(100, 110):
+        assert td.get_node("SUB000", i) is None
+    assert len(calls) == 2
+    assert "MYERROR" in capsys.readouterr().out
+
+
+def test_get_node_finds_added_node(td, monkeypatch):
+    """索引作成後に追加されたノードは、作り直した索引で見つかる"""
+    calls = count_get_nodes(td, monkeypatch)
+    assert td.get_node("SUB000", 1) is not None
+    node = add_node(td, "SUB000", 100)
+    assert td.get_node("SUB000", 100) is node
+    assert len(calls) == 2
+
+    # 作り直した後に追加したノードは、索引を破棄するまで見つからない
+    node = add_node(td, "SUB000", 101)
+    assert td.get_node("SUB000", 101) is None
+    td.invalidate_node_lookup()
+    assert td.get_node("SUB000", 101) is node
+    assert len(calls) == 3
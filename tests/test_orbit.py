@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+import pyopentd as pt
+
+
+def make_orbit(n_rows=20, period=5400.0, altitude=7000.0):
+    times = np.linspace(0, period, n_rows)
+    theta = 2 * np.pi * times / period
+    return pd.DataFrame(
+        {
+            "Times": times,
+            "sun_x": np.zeros(n_rows),
+            "sun_y": np.zeros(n_rows),
+            "sun_z": np.ones(n_rows),
+            "planet_x": np.zeros(n_rows),
+            "planet_y": altitude * np.sin(theta),
+            "planet_z": -altitude * np.cos(theta),
+            "radius": np.full(n_rows, 1.078),
+        }
+    )
+
+
+def test_get_orbit_inverts_create_orbit(td):
+    """get_orbitはcreate_orbitの逆変換（長さ1への正規化はしない）"""
+    df_orbit = make_orbit()
+    td.create_orbit(df_orbit, "roundtrip")
+    df = td.get_orbit("roundtrip")
+    assert df.columns.tolist() == pt.ORBIT_COLUMNS
+    np.testing.assert_allclose(df.values, df_orbit.values)
+
+
+def test_get_orbit_existing(td, model):
+    """fake_opentdの既存の軌道（成分を1/1000で保存）は長さ1のベクトルになる"""
+    name = td.GetOrbits()[0].Name
+    df = td.get_orbit(name)
+    assert len(df) == model.n_orbit_points
+    norms = np.linalg.norm(df[["planet_x", "planet_y", "planet_z"]], axis=1)
+    np.testing.assert_allclose(norms, 1.0)
+    np.testing.assert_allclose(df["sun_z"], 1.0)
+
+
+def test_create_orbit_chunked(td):
+    df_orbit = make_orbit(n_rows=25)
+    orbit = td.create_orbit(df_orbit, "chunked", chunksize=7)
+    assert len(orbit.HrSunVecArray) == 25
+    np.testing.assert_allclose(td.get_orbit("chunked").values, df_orbit.values)
+
+
+def test_create_orbit_checks_across_chunks(td):
+    """チャンクの境界をまたいで時刻が戻る場合も、軌道を作成せずにエラー"""
+    df_orbit = make_orbit(n_rows=10)
+    df_orbit.loc[5, "Times"] = df_orbit.loc[4, "Times"]
+    assert td.create_orbit(df_orbit, "bad", chunksize=5) is None
+    df_orbit = make_orbit(n_rows=10)
+    df_orbit.loc[8, "sun_x"] = np.nan
+    assert td.create_orbit(df_orbit, "bad", chunksize=5) is None
+    assert "bad" not in [orbit.Name for orbit in td.GetOrbits()]
+
+
+def test_interpolate_orbit_periodic():
+    """格子点では元の値、間は線形補間、周期で折り返す（不等間隔でもよい）"""
+    df_orbit = pd.DataFrame(
+        {
+            "Times": [0.0, 10.0, 40.0],
+            "a": [0.0, 1.0, 4.0],
+            "b": [1.0, 1.0, 1.0],
+        }
+    )
+    df = pt.interpolate_orbit(
+        df_orbit, [0.0, 5.0, 10.0, 25.0, 40.0, 45.0], period=50.0
+    )
+    assert df.columns.tolist() == ["a", "b"]
+    # 40〜50は最初の点（t=50はt=0と同じ）に向かって補間する
+    np.testing.assert_allclose(df["a"], [0.0, 0.5, 1.0, 2.5, 4.0, 2.0])
+    np.testing.assert_allclose(df["b"], 1.0)
+    df_shifted = pt.interpolate_orbit(
+        df_orbit, [50.0, 55.0, 135.0, -5.0], period=50.0
+    )
+    np.testing.assert_allclose(df_shifted["a"], [0.0, 0.5, 3.5, 2.0])
+
+
+def test_interpolate_orbit_single_point():
+    df_orbit = pd.DataFrame({"Times": [0.0], "a": [3.0]})
+    df = pt.interpolate_orbit(df_orbit, [0.0, 100.0, 200.0])
+    assert df["a"].tolist() == [3.0, 3.0, 3.0]
+
+
+def test_align_orbit(td, savefile):
+    """結果の時刻に軌道を補間して、['case', 'Times', 軌道, 結果]の形式で結合する"""
+    df_orbit = make_orbit(period=float(savefile.times[-1]))
+    td.create_orbit(df_orbit, "align")
+    df_orbit = td.get_orbit("align")
+    df_t = savefile.get_data(savefile.get_node_names(option="T")[:2])
+    df_q = savefile.get_data(savefile.get_node_names(option="Q")[:2])
+    df = pt.align_orbit(df_orbit, [df_t, df_q], case_name="hot")
+    assert df.columns.tolist() == (
+        ["case"]
+        + pt.ORBIT_COLUMNS
+        + df_t.columns[1:].tolist()
+        + df_q.columns[1:].tolist()
+    )
+    assert (df["case"] == "hot").all()
+    np.testing.assert_allclose(df["Times"], savefile.times)
+    np.testing.assert_allclose(df["sun_z"], 1.0)
+    # 結果の時刻は軌道の時刻と異なるが、円軌道上の点として補間される（半径は線形補間分だけ小さい）
+    radius = np.hypot(df["planet_y"], df["planet_z"])
+    assert (radius <= 7000.0 + 1e-6).all() and (radius > 6900.0).all()
+
+
+def test_align_orbits(savefile):
+    df_orbit = make_orbit()
+    df_t = savefile.get_data(savefile.get_node_names(option="T")[:2])
+    df = pt.align_orbits({"hot": (df_orbit, df_t), "cold": (df_orbit, [df_t])})
+    assert len(df) == 2 * len(df_t)
+    assert df["case"].tolist() == ["hot"] * len(df_t) + ["cold"] * len(df_t)
+    assert df.index.tolist() == list(range(len(df)))
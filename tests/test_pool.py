@@ -0,0 +1,59 @@
+import time
+
+import pytest
+
+import pyopentd as pt
+
+
+class FakeConnection:
+    def __init__(self, dwg_path):
+        self.dwg_path = dwg_path
+        self.closed = False
+
+
+def _make_pool(dwg_paths, **kwargs):
+    return pt.SessionPool(
+        dwg_paths,
+        factory=FakeConnection,
+        health_check=lambda td: not td.closed,
+        close=lambda td: setattr(td, "closed", True),
+        **kwargs,
+    )
+
+
+def test_leaked_session_closed_on_timeout():
+    """リークとして回収した接続は、その後にタイムアウトしても終了する"""
+    pool = _make_pool(["a.dwg", "b.dwg"], size=1, lease_timeout=10)
+    leaked = pool.checkout("a.dwg")
+    busy = pool.checkout("b.dwg")
+    leaked.checked_out_at -= 60  # aだけ期限切れにする
+    with pytest.raises(TimeoutError):
+        pool.checkout("b.dwg", timeout=0.01)
+    assert leaked.td.closed
+    assert pool.get_stats()["leaked"] >= 1
+    pool.checkin(busy)
+    pool.close()
+
+
+def test_leaked_session_closed_on_error():
+    pool = _make_pool(["a.dwg"], size=1, lease_timeout=0.05)
+    leaked = pool.checkout()
+    time.sleep(0.1)
+    with pytest.raises(KeyError):
+        pool.checkout("unknown.dwg")
+    assert leaked.td.closed
+    # 後から返ってきても二重に終了・再利用しない
+    pool.checkin(leaked)
+    assert pool.get_stats()["sessions"]["a.dwg"]["idle"] == 0
+    pool.close()
+
+
+def test_lease_reuses_session():
+    pool = _make_pool(["a.dwg"], size=1)
+    with pool.lease() as td1:
+        pass
+    with pool.lease() as td2:
+        pass
+    assert td1 is td2
+    assert pool.get_stats()["created"] == 1
+    pool.close()
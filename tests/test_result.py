@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from pyopentd.result import get_data_bulk
+
+
+class _Series:
+    def __init__(self, values):
+        self.values = values
+
+    def GetValues(self):
+        return self.values
+
+
+class _List(list):
+    @property
+    def Count(self):
+        return len(self)
+
+
+class StandInSaveFile:
+    """GetTimes()とGetData()だけを持つSaveFileの代替（Kelvinの温度を返す）"""
+
+    def __init__(self, times, series):
+        self.times = times
+        self.series = series
+
+    def GetTimes(self):
+        return _Series(self.times)
+
+    def GetData(self, names):
+        return _List(_Series(self.series[name]) for name in names)
+
+
+def test_bulk_matches_stand_in():
+    """値のコピーと、温度列（接頭辞T）だけのK→℃変換"""
+    savefile = StandInSaveFile(
+        [0.0, 1.0, 2.0],
+        {
+            "AAA.T1": [273.15, 283.15, 293.15],
+            "BUS.TOP.Q5": [1.0, 2.0, 3.0],
+        },
+    )
+    df = get_data_bulk(savefile, ["AAA.T1", "BUS.TOP.Q5"])
+    assert list(df.columns) == ["Times", "AAA.T1", "BUS.TOP.Q5"]
+    np.testing.assert_allclose(df["Times"], [0.0, 1.0, 2.0])
+    np.testing.assert_allclose(df["AAA.T1"], [0.0, 10.0, 20.0])
+    # サブモデル名に".T"を含んでも、熱入力は変換しない
+    np.testing.assert_allclose(df["BUS.TOP.Q5"], [1.0, 2.0, 3.0])
+
+
+def test_bulk_rows():
+    """rowsの範囲だけをコピーする"""
+    savefile = StandInSaveFile(
+        [0.0, 1.0, 2.0, 3.0, 4.0], {"AAA.Q1": [0.0, 1.0, 2.0, 3.0, 4.0]}
+    )
+    df = get_data_bulk(savefile, ["AAA.Q1"], rows=slice(1, 5, 2))
+    assert df["Times"].tolist() == [1.0, 3.0]
+    assert df["AAA.Q1"].tolist() == [1.0, 3.0]
+
+
+def test_bulk_rejects_short_series():
+    """系列の長さが時刻数と違う場合は、未初期化の値を返さずにエラー"""
+    savefile = StandInSaveFile([0.0, 1.0, 2.0], {"AAA.T1": [300.0, 301.0]})
+    with pytest.raises(ValueError):
+        get_data_bulk(savefile, ["AAA.T1"])
+
+
+def test_bulk_rejects_missing_series():
+    """GetDataの系列数がノード数より少ない場合はエラー"""
+    savefile = StandInSaveFile([0.0], {"AAA.T1": [300.0]})
+    savefile.GetData = lambda names: _List([_Series([300.0])])
+    with pytest.raises(ValueError):
+        get_data_bulk(savefile, ["AAA.T1", "AAA.T2"])
+
+
+def test_bulk_matches_get_data(savefile):
+    """fake_opentdの.savファイルで、従来のget_dataと同じ結果"""
+    node_list = savefile.get_node_names(option="T")[:5] + ["SUB001.Q3"]
+    expected = savefile.get_data(node_list, bulk=False)
+    np.testing.assert_allclose(
+        get_data_bulk(savefile, node_list).values, expected.values
+    )
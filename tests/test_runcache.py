@@ -0,0 +1,50 @@
+import os
+
+import pyopentd as pt
+
+
+def test_put_larger_than_max_bytes(tmp_path):
+    """max_bytesより大きい.savファイルでも、追加したものは削除しない"""
+    run_cache = pt.RunCache(str(tmp_path / "cache"), max_bytes=10)
+    sav_path = tmp_path / "big.sav"
+    sav_path.write_bytes(b"x" * 100)
+
+    first = run_cache.put("first", str(sav_path))
+    assert os.path.exists(first)
+    second = run_cache.put("second", str(sav_path))
+    assert os.path.exists(second)
+    assert not os.path.exists(first)
+
+
+def test_run_returns_existing_path(td, tmp_path):
+    run_cache = pt.RunCache(str(tmp_path / "cache"), max_bytes=1)
+    case = td.create_caseset("c", "g", 1, 0, force_reset=True)
+    sav_path = case.get_sav_path(td.dwg_path)
+    with open(sav_path, "wb") as f:
+        f.write(b"x" * 100)
+    assert os.path.exists(run_cache.run(td, case))
+
+
+def test_key_uses_case_settings(td, tmp_path):
+    """create_casesetのオプションを渡さなくても、ケースセット自身の設定の違いでキーが変わる"""
+    run_cache = pt.RunCache(str(tmp_path / "cache"))
+    case = td.create_caseset("c", "g", 1, 0, force_reset=True)
+    key = run_cache.make_key(td, case)
+    case.origin.Transient = 1
+    case.origin.SindaControl.timendExp.Value = "5400"
+    assert run_cache.make_key(td, case) != key
+
+
+def test_key_uses_live_model_state(td, tmp_path):
+    """dwgファイルに保存していないグローバルシンボル・ヒーターの変更でキーが変わる"""
+    run_cache = pt.RunCache(str(tmp_path / "cache"))
+    case = td.create_caseset("c", "g", 1, 0, force_reset=True)
+    key = run_cache.make_key(td, case)
+    assert run_cache.make_key(td, case) == key
+
+    td.GetSymbols()[0].Value = "10"
+    key_symbol = run_cache.make_key(td, case)
+    assert key_symbol != key
+
+    td.GetHeaters()[0].Value = 99.0
+    assert run_cache.make_key(td, case) != key_symbol
@@ -0,0 +1,41 @@
+import os
+import time
+
+import pyopentd as pt
+from pyopentd.runner import run_caseset
+
+
+def create_and_run(td, job):
+    """ワーカーの接続にケースセットを作成してから実行する（ワーカーに渡すのでトップレベルで定義）"""
+    td.create_caseset(
+        job["caseset_name"], job["group_name"], 1, 0, force_reset=True
+    )
+    time.sleep(0.2)  # 両方のワーカーにジョブが配られるように
+    return run_caseset(td, job)
+
+
+def test_workers_write_to_own_run_dir(model, tmp_path):
+    dwg_path = tmp_path / "model" / "model.dwg"
+    dwg_path.parent.mkdir()
+    dwg_path.write_text("model")
+    work_dir = tmp_path / "runs"
+    jobs = [{"group_name": "g", "caseset_name": f"case{i}"} for i in range(4)]
+    df = pt.BatchRunner(
+        str(dwg_path),
+        n_workers=2,
+        work_dir=str(work_dir),
+        runner=create_and_run,
+    ).run(jobs)
+
+    assert (df["status"] == "success").all(), df["error"].tolist()
+    assert df["run_dir"].nunique() == 2
+    for row in df.itertuples():
+        assert row.run_dir == str(work_dir / f"worker_{row.pid}")
+        # .savファイルはワーカーの実行ディレクトリに出力される
+        sav_path = row.output["sav_path"]
+        assert os.path.dirname(sav_path) == os.path.abspath(row.run_dir)
+        assert os.path.basename(sav_path) == row.output["sav_name"]
+    assert df["output"].map(lambda o: o["sav_path"]).nunique() == 4
+    # モデルはコピーしない
+    for run_dir in df["run_dir"].unique():
+        assert os.listdir(run_dir) == []
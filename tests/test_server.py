@@ -0,0 +1,155 @@
+import json
+import os
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pyopentd as pt
+
+
+@pytest.fixture
+def server(model, tmp_path):
+    dwg_path = tmp_path / "model.dwg"
+    dwg_path.write_text("model")
+    pool = pt.SessionPool(
+        str(dwg_path),
+        size=1,
+        factory=lambda path: pt.ThermalDesktop(path, visible=False),
+    )
+    server = pt.JobServer(pool, port=0, max_finished=3).start()
+    yield server
+    server.shutdown()
+    pool.close()
+
+
+def _post(server, body):
+    request = urllib.request.Request(
+        server.url + "/jobs",
+        data=json.dumps(body).encode("utf-8"),
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def _make_orbit(n_rows=10):
+    times = np.linspace(0, 5400, n_rows)
+    return pd.DataFrame(
+        {
+            "Times": times,
+            "sun_x": 0.0,
+            "sun_y": 0.0,
+            "sun_z": 1.0,
+            "planet_x": 0.0,
+            "planet_y": np.sin(times),
+            "planet_z": np.cos(times),
+            "radius": 1.078,
+        }
+    )
+
+
+def test_spec_cannot_override_point_id(server):
+    """クライアントはpoint_id・groupを指定できない（既存のケースセットを消せない）"""
+    td = server.pool.checkout()
+    td.td.create_caseset("Important", "server", 1, 0, force_reset=True)
+    server.pool.checkin(td)
+
+    spec = {"point_id": "Important", "group": "server"}
+    with pytest.raises(ValueError):
+        server.submit(spec)
+    assert _post(server, spec) == 400
+    assert _post(server, [1, 2]) == 400
+
+    session = server.pool.checkout()
+    assert session.td.GetCaseSet("Important", "server") is not None
+    server.pool.checkin(session)
+
+
+def test_job_orbit_deleted(server):
+    client = pt.JobClient(server.url)
+    job_id = client.submit({"steady": 1, "transient": 0}, orbit=_make_orbit())
+    df = client.result(job_id, poll_interval=0.01, timeout=10)
+    assert df.columns[0] == "Times"
+    # クライアント名を省略した場合は接続元のアドレス
+    assert server.jobs[job_id].client == "127.0.0.1"
+
+    session = server.pool.checkout()
+    names = [orbit.Name for orbit in session.td.GetOrbits()]
+    server.pool.checkin(session)
+    assert not any(name.startswith("job_") for name in names)
+
+
+def test_finished_jobs_bounded(server):
+    client = pt.JobClient(server.url, client="me")
+    job_ids = [client.submit({"steady": 1, "transient": 0}) for _ in range(5)]
+    client.result(job_ids[-1], poll_interval=0.01, timeout=10)
+    assert len(server.jobs) <= 3
+    assert job_ids[0] not in server.jobs
+
+
+def test_caseset_options_restricted(server):
+    """run_dir・restart_fileなど、サーバー上のパスは指定できない"""
+    for key in ["run_dir", "restart_file"]:
+        spec = {"caseset_options": {"steady": 1, "transient": 0, key: "C:/"}}
+        with pytest.raises(ValueError):
+            server.submit(spec)
+        assert _post(server, spec) == 400
+
+
+def test_job_outputs_removed(server):
+    """結果はwork_dirのファイルに置き、ジョブの出力ディレクトリは削除する"""
+    output_dirs = []
+
+    def runner(td, job):
+        os.makedirs(job["output_dir"])
+        with open(os.path.join(job["output_dir"], "job.out"), "w") as f:
+            f.write("out")
+        output_dirs.append(job["output_dir"])
+        return pt.server.run_job(td, job)
+
+    server.runner = runner
+    client = pt.JobClient(server.url)
+    job_id = client.submit({"steady": 1, "transient": 0}, pattern="SUB000.*")
+    df = client.result(job_id, poll_interval=0.01, timeout=10)
+    assert len(df.columns) == 11
+    job = server.jobs[job_id]
+    assert os.path.dirname(job.result_path) == server.work_dir
+    assert not hasattr(job, "result")
+    assert not os.path.exists(output_dirs[0])
+
+
+def test_finished_results_removed(server):
+    client = pt.JobClient(server.url, client="me")
+    job_ids = [client.submit({"steady": 1, "transient": 0}) for _ in range(5)]
+    client.result(job_ids[-1], poll_interval=0.01, timeout=10)
+    results = [f for f in os.listdir(server.work_dir) if f.endswith(".npz")]
+    assert len(results) <= 3
+
+
+def test_token_required(model, tmp_path):
+    pool = pt.SessionPool(
+        str(tmp_path / "model.dwg"),
+        size=1,
+        factory=lambda path: pt.ThermalDesktop(path, visible=False),
+    )
+    with pytest.raises(ValueError):
+        pt.JobServer(pool, host="0.0.0.0", port=0)
+    server = pt.JobServer(pool, port=0, token="secret").start()
+    try:
+        assert _post(server, {}) == 401
+        with pytest.raises(urllib.error.HTTPError):
+            pt.JobClient(server.url, token="wrong").status()
+        client = pt.JobClient(server.url, token="secret")
+        job_id = client.submit({"steady": 1, "transient": 0})
+        df = client.result(job_id, poll_interval=0.01, timeout=10)
+        assert df.columns[0] == "Times"
+    finally:
+        server.shutdown()
+        pool.close()
+    assert not os.path.exists(server.work_dir)
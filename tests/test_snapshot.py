@@ -0,0 +1,80 @@
+import pyopentd as pt
+
+
+class Item:
+    def __init__(self, i):
+        self.Id = i
+        self.Name = f"item{i}"
+
+
+def counting_fetch(calls, n=3):
+    def fetch():
+        calls.append("fetch")
+        return [Item(i) for i in range(n)]
+
+    return fetch
+
+
+def test_entity_table_fetches_once():
+    """一覧は1回だけ取得し、プロパティは列ごとに必要になったときに1回だけ取得する"""
+    calls = []
+    table = pt.EntityTable(counting_fetch(calls))
+    assert calls == []
+
+    def get_name(item):
+        calls.append("Name")
+        return item.Name
+
+    spec = [("id", lambda item: item.Id), ("name", get_name)]
+    df = table.to_frame(spec, columns=["id"])
+    assert list(df.columns) == ["id"]
+    assert calls == ["fetch"]
+    df = table.to_frame(spec)
+    df = table.to_frame(spec)
+    assert df["name"].tolist() == ["item0", "item1", "item2"]
+    assert calls == ["fetch"] + ["Name"] * 3
+    assert len(table) == 3
+
+    table.invalidate()
+    assert table.column("Id") == [0, 1, 2]
+    assert calls.count("fetch") == 2
+
+
+def test_model_snapshot_refresh(td, monkeypatch):
+    calls = []
+    for method_name in ["GetHeaters", "GetHeatLoads"]:
+        fetch = getattr(td, method_name)
+        monkeypatch.setattr(
+            td,
+            method_name,
+            lambda fetch=fetch, name=method_name: calls.append(name)
+            or fetch(),
+        )
+    snapshot = pt.ModelSnapshot(td)
+    assert len(snapshot["GetHeaters"]) == 5
+    assert len(snapshot["GetHeatLoads"]) == 5
+    snapshot.refresh("GetHeaters")
+    assert len(snapshot["GetHeaters"]) == 5
+    assert len(snapshot["GetHeatLoads"]) == 5
+    assert calls == ["GetHeaters", "GetHeatLoads", "GetHeaters"]
+    snapshot.refresh()
+    assert snapshot["GetHeaters"].objects and snapshot["GetHeatLoads"].objects
+    assert len(calls) == 5
+
+
+def test_get_heaters_uses_snapshot(td, monkeypatch):
+    """get_heatersは一覧を保持し、create_heaterで追加すると取得し直す"""
+    calls = []
+    get_heaters = td.GetHeaters
+    monkeypatch.setattr(
+        td, "GetHeaters", lambda: calls.append(1) or get_heaters()
+    )
+    df = td.get_heaters(columns=["handle"])
+    assert list(df.columns) == ["handle"]
+    assert len(td.get_heaters()) == 5
+    assert len(calls) == 1
+    td.create_heater("SUB000", 1, "SUB000", 2, 1.0, 0.0, 5.0)
+    assert len(td.get_heaters()) == 6
+    assert len(calls) == 2
+    assert len(td.get_heaters(refresh=True)) == 6
+    assert len(calls) == 3
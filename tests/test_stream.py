@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+import pyopentd as pt
+from pyopentd.stream import SaveFileReader
+
+
+class GrowingFile:
+    """監視の周期ごとに行が増える合成の結果ファイル（CSV）"""
+
+    def __init__(self, path, n_rows, rows_per_poll):
+        self.path = str(path)
+        self.data = pd.DataFrame(
+            {
+                "Times": np.arange(n_rows, dtype=float),
+                "AAA.T1": np.arange(n_rows) * 2.0,
+            }
+        )
+        self.rows_per_poll = rows_per_poll
+        self.n_written = 0
+        self.starts = []
+
+    def grow(self):
+        """is_runningとして呼ばれるたびに行を追記する。書き終えたらFalse。"""
+        if self.n_written < len(self.data):
+            chunk = self.data.iloc[
+                self.n_written : self.n_written + self.rows_per_poll
+            ]
+            chunk.to_csv(
+                self.path, mode="a", header=self.n_written == 0, index=False
+            )
+            self.n_written += len(chunk)
+        return self.n_written < len(self.data)
+
+    def read(self, path, start):
+        self.starts.append(start)
+        return pd.read_csv(path).iloc[start:]
+
+
+def test_tail_yields_only_new_rows(tmp_path):
+    growing = GrowingFile(tmp_path / "result.csv", n_rows=10, rows_per_poll=3)
+    chunks = list(
+        pt.tail_results(
+            growing.path,
+            growing.read,
+            poll_interval=0.0,
+            is_running=growing.grow,
+        )
+    )
+    assert [len(df) for df in chunks] == [3, 3, 3, 1]
+    assert growing.starts == [0, 3, 6, 9]
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks, ignore_index=True), growing.data
+    )
+
+
+def test_tail_early_break(tmp_path):
+    growing = GrowingFile(tmp_path / "result.csv", n_rows=100, rows_per_poll=5)
+    for df in pt.tail_results(
+        growing.path, growing.read, poll_interval=0.0, is_running=growing.grow
+    ):
+        if df["Times"].iloc[-1] >= 9:
+            break
+    # breakした後は読み込まない
+    assert growing.starts == [0, 5]
+    assert growing.n_written == 10
+
+
+def test_savefile_reader_reads_from_start(savefile):
+    reader = SaveFileReader(option="T")
+    df = reader("result.sav", start=45)
+    assert len(df) == 5
+    expected = savefile.get_data(reader.node_list)
+    np.testing.assert_allclose(df.values, expected.values[45:])
+    assert reader("result.sav", start=len(savefile.times)).shape[0] == 0
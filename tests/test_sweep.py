@@ -0,0 +1,42 @@
+import pandas as pd
+
+import pyopentd as pt
+
+
+def _run(tmp_path, design):
+    dwg_path = tmp_path / "model" / "model.dwg"
+    dwg_path.parent.mkdir(exist_ok=True)
+    dwg_path.write_text("model")
+    sweep = pt.Sweep(
+        str(dwg_path),
+        design,
+        str(tmp_path / "store"),
+        {"steady": 1, "transient": 0},
+        pattern="SUB000.*",
+        work_dir=str(tmp_path / "runs"),
+    )
+    done = []
+    df = sweep.run(callback=lambda result: done.append(result["point_id"]))
+    return sweep, df, done
+
+
+def test_sweep_resume_by_spec_hash(model, tmp_path):
+    design = pd.DataFrame({"point_id": ["001", "002"], "HTR": [1.0, 2.0]})
+    sweep, df, done = _run(tmp_path, design)
+    assert sorted(done) == ["001", "002"]
+    assert df["point_id"].tolist() == ["001", "002"]
+    assert (df["status"] == "success").all()
+    assert df["HTR"].tolist() == [1.0, 2.0]
+    assert len(sweep.store.load()) == 2 * len(pt.SaveFile("x.sav").times)
+
+    # 同じ設定のケースは飛ばす
+    _, _, done = _run(tmp_path, design)
+    assert done == []
+
+    # 設計表の行を変えたケースだけ実行し直す（manifest.csvには追記する）
+    design.loc[1, "HTR"] = 3.0
+    sweep, df, done = _run(tmp_path, design)
+    assert done == ["002"]
+    assert df["HTR"].tolist() == [1.0, 3.0]
+    with open(sweep.store.manifest_path) as f:
+        assert len(f.readlines()) == 1 + 3
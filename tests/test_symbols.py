@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+import pyopentd as pt
+
+
+@pytest.fixture
+def case(td, monkeypatch):
+    case = td.create_caseset("case", "group", 1, 0)
+    case.updates = []
+    monkeypatch.setattr(case.origin, "Update", lambda: case.updates.append(1))
+    return case
+
+
+def test_update_symbols_single_update(case):
+    """追加・変更をまとめて1回のUpdate()で反映する"""
+    case.update_symbols(
+        None, pd.DataFrame({"name": ["A", "B"], "value": [1, 2]})
+    )
+    case.update_symbols(
+        None,
+        pd.DataFrame(
+            {"name": ["B", "C"], "value": [3.5, "A*2"], "comment": ["b", "c"]}
+        ),
+    )
+    df = case.get_symbols()
+    assert df["name"].tolist()[-3:] == ["A", "B", "C"]
+    assert df.set_index("name").loc[["A", "B", "C"], "value"].tolist() == [
+        "1",
+        "3.5",
+        "A*2",
+    ]
+    assert df.set_index("name").loc["C", "comment"] == "c"
+    assert len(case.updates) == 2
+
+
+def test_update_symbols_reset(case):
+    case.add_symbol("OLD", 1)
+    case.update_symbols(
+        None, pd.DataFrame({"name": ["NEW"], "value": [2]}), reset_symbols=True
+    )
+    assert case.get_symbols()["name"].tolist() == ["NEW"]
+
+
+def test_edit_symbols_batches_updates(case):
+    """withブロックの中の変更は、抜けたときに1回だけ反映する（入れ子も外側で1回）"""
+    with case.edit_symbols() as editor:
+        for i in range(100):
+            case.add_symbol(f"S{i}", i)
+        with case.edit_symbols():
+            case.add_symbol("S0", "changed")
+        assert isinstance(editor, pt.SymbolEditor)
+        assert "S99" in editor
+        assert case.updates == []
+    assert len(case.updates) == 1
+    df = case.get_symbols().set_index("name")
+    assert df.loc["S0", "value"] == "changed"
+    assert df.loc["S99", "value"] == "99"
+
+
+def test_edit_symbols_error_discards(case):
+    """ブロック内で例外が発生した場合は反映しない"""
+    names = case.get_symbols()["name"].tolist()
+    with pytest.raises(RuntimeError):
+        with case.edit_symbols():
+            case.add_symbol("X", 1)
+            raise RuntimeError
+    assert case.get_symbols()["name"].tolist() == names
+    assert case.updates == []
+
+
+def test_symbol_editor_keeps_comments(case):
+    case.update_symbols(
+        None, pd.DataFrame({"name": ["A"], "value": [1], "comment": ["keep"]})
+    )
+    case.add_symbol("A", 2)
+    df = case.get_symbols().set_index("name")
+    assert df.loc["A", "value"] == "2"
+    assert df.loc["A", "comment"] == "keep"